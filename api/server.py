@@ -0,0 +1,283 @@
+import sys
+import os
+current_file = os.path.abspath(__file__)
+api_dir = os.path.dirname(current_file)
+root_dir = os.path.dirname(api_dir)
+if root_dir not in sys.path:
+    sys.path.insert(0, root_dir)
+# api/server.py
+"""
+HTTP API over the same services as the Streamlit app (fetch pipeline, profiling,
+validation, submission queue), for automation from other pipelines.
+
+    uvicorn api.server:app --host 127.0.0.1 --port 8000
+
+- every endpoint except /health requires the X-API-Key header (API_KEY)
+- fetch runs as a background job (services.jobs), parsing in the parse executor
+- blocking calls (SharePoint listing, validation) run in a bounded thread pool
+- at most API_MAX_CONCURRENT requests are served at once, others wait up to
+  API_QUEUE_TIMEOUT_SECONDS and then get 429
+- GET /jobs/{job_id}/events streams progress as NDJSON until the job finishes
+"""
+import os
+import hmac
+import json
+import math
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from typing import Dict, List, Optional
+import numpy as np
+import pandas as pd
+from fastapi import Depends, FastAPI, Header, HTTPException
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel, Field
+from services.config import (
+    SITE_ID, DRIVE_ID, API_MAX_CONCURRENT, API_WORKERS, API_QUEUE_TIMEOUT_SECONDS, API_KEY
+)
+
+app = FastAPI(title="Excel Ingestion Self-Service API")
+
+# Bounded pool for blocking calls made directly by request handlers
+_executor = ThreadPoolExecutor(max_workers=API_WORKERS, thread_name_prefix='api')
+_request_slots = asyncio.Semaphore(API_MAX_CONCURRENT)
+
+
+async def require_api_key(x_api_key: Optional[str] = Header(default=None)):
+    """Shared-secret check (FastAPI dependency): endpoints read SharePoint and write the ExcelConfig sheet"""
+    if not API_KEY:
+        raise HTTPException(status_code=503, detail="API_KEY is not configured on the server")
+    if x_api_key is None or not hmac.compare_digest(x_api_key.encode('utf-8'), API_KEY.encode('utf-8')):
+        raise HTTPException(status_code=401, detail="Invalid or missing X-API-Key")
+
+
+async def limit_concurrency():
+    """Request-level concurrency limit (FastAPI dependency)"""
+    try:
+        await asyncio.wait_for(_request_slots.acquire(), timeout=API_QUEUE_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=429, detail="Too many concurrent requests, retry later",
+                            headers={'Retry-After': str(API_QUEUE_TIMEOUT_SECONDS)})
+    try:
+        yield
+    finally:
+        _request_slots.release()
+
+
+async def run_blocking(fn, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, lambda: fn(*args, **kwargs))
+
+
+def to_jsonable(value):
+    """columns_info / reports -> plain JSON (numpy scalars, timestamps, NaN -> null)"""
+    if isinstance(value, dict):
+        return {str(k): to_jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple, set)):
+        return [to_jsonable(v) for v in value]
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and (math.isnan(value) or math.isinf(value)):
+        return None
+    if isinstance(value, (datetime, date, pd.Timestamp)):
+        return value.isoformat()
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if value is pd.NaT:
+        return None
+    return str(value)
+
+
+def json_response(payload, status_code: int = 200) -> Response:
+    return Response(json.dumps(to_jsonable(payload)), status_code=status_code, media_type='application/json')
+
+
+# ============================================
+# REQUEST MODELS
+# ============================================
+class ResolveRequest(BaseModel):
+    folder_path: str
+    file_pattern: str
+
+
+class FetchRequest(BaseModel):
+    folder_path: str
+    file_name: str = Field(description="File name or regex pattern, as in Step 1")
+    extension: str = '.xlsx'
+    sheet_name: Optional[str] = None
+    header_row: int = 0
+    delimiter: str = ','
+    approx_profile: bool = True
+
+
+class ValidateRequest(BaseModel):
+    job_id: str
+    type_mapping: Dict[str, str]
+
+
+class SubmitRequest(BaseModel):
+    user_input: Dict = Field(description="type_mapping, key_columns, excluded_columns, ingestion_method, dest_config, ...")
+    form_values: Dict = Field(description="file_name, sp_url, folder_path, sheet_name, delimiter, header_row, ...")
+    columns: List[str] = Field(default_factory=list, description="Source columns in file order")
+
+
+# ============================================
+# HELPERS
+# ============================================
+def _get_job(job_id: str):
+    from services.jobs import get_job_manager
+
+    job = get_job_manager().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    return job
+
+
+def _job_result(job_id: str) -> Dict:
+    job = _get_job(job_id)
+    if job.status != 'done':
+        raise HTTPException(status_code=409, detail=f"Job is {job.status}")
+    return job.result
+
+
+# ============================================
+# ENDPOINTS
+# ============================================
+@app.get('/health')
+async def health():
+    return {'status': 'ok'}
+
+
+@app.post('/files/resolve', dependencies=[Depends(require_api_key), Depends(limit_concurrency)])
+async def resolve_file(request: ResolveRequest):
+    """File metadata for a folder + pattern (no download)"""
+    from services.service_cache import get_sharepoint_service
+
+    sp_service = get_sharepoint_service(SITE_ID, DRIVE_ID)
+    try:
+        file_meta = await run_blocking(
+            sp_service.get_file_metadata, FolderPath=request.folder_path.strip(), FilePattern=request.file_pattern.strip()
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return json_response({k: v for k, v in file_meta.items() if k != 'download_url'})
+
+
+def _api_fetch(job, user_input: Dict) -> Dict:
+    """run_fetch without the raw grid / opened workbook (no session reuses them here)"""
+    from services.fetch_pipeline import run_fetch
+
+    result = run_fetch(job, user_input)
+    result.pop('raw_grid', None)
+    result.pop('workbook', None)
+    return result
+
+
+@app.post('/fetch', status_code=202, dependencies=[Depends(require_api_key), Depends(limit_concurrency)])
+async def start_fetch(request: FetchRequest):
+    """Start the fetch pipeline (download + parse + profile) as a background job"""
+    from services.jobs import get_job_manager
+
+    job = get_job_manager().submit("fetch", _api_fetch, request.model_dump())
+    return json_response({'job_id': job.job_id, 'status': job.status}, status_code=202)
+
+
+@app.get('/jobs/{job_id}', dependencies=[Depends(require_api_key)])
+async def job_status(job_id: str):
+    snapshot = _get_job(job_id).snapshot()
+    snapshot.pop('traceback', None)
+    return json_response(snapshot)
+
+
+@app.delete('/jobs/{job_id}', dependencies=[Depends(require_api_key)])
+async def cancel_job(job_id: str):
+    from services.jobs import get_job_manager
+
+    _get_job(job_id)
+    return {'cancelled': get_job_manager().cancel(job_id)}
+
+
+@app.get('/jobs/{job_id}/events', dependencies=[Depends(require_api_key)])
+async def job_events(job_id: str, interval: float = 1.0):
+    """Progress snapshots as NDJSON, one line per change, until the job finishes"""
+    job = _get_job(job_id)
+
+    async def stream():
+        last = None
+        while True:
+            finished = job.finished  # read first: the last snapshot must include the final state
+            snapshot = job.snapshot()
+            snapshot.pop('traceback', None)
+            snapshot.pop('elapsed', None)
+            if snapshot != last:
+                yield json.dumps(to_jsonable(snapshot)) + '\n'
+                last = snapshot
+            if finished:
+                break
+            await asyncio.sleep(max(interval, 0.2))
+
+    return StreamingResponse(stream(), media_type='application/x-ndjson')
+
+
+@app.get('/jobs/{job_id}/preview', dependencies=[Depends(require_api_key)])
+async def job_preview(job_id: str, limit: int = 100):
+    """Representative sample rows of the fetched file (index = original row number)"""
+    result = _job_result(job_id)
+    df_preview = result['df_preview'].head(limit)
+    payload = json.loads(df_preview.to_json(orient='split', date_format='iso', default_handler=str))
+    payload['total_rows'] = result['file_meta'].get('total_rows')
+    return json_response(payload)
+
+
+@app.get('/jobs/{job_id}/profile', dependencies=[Depends(require_api_key)])
+async def job_profile(job_id: str):
+    """columns_info (with suggested types) + key column candidates"""
+    from services.validation import rank_key_candidates
+
+    result = _job_result(job_id)
+    columns_info = result['columns_info']
+    total_rows = result['file_meta'].get('total_rows') or 0
+    return json_response({
+        'file': {k: v for k, v in result['file_meta'].items() if k != 'download_url'},
+        'columns': columns_info,
+        'key_candidates': rank_key_candidates(columns_info, total_rows),
+        'from_cache': result['from_cache'],
+    })
+
+
+@app.post('/validate', dependencies=[Depends(require_api_key), Depends(limit_concurrency)])
+async def validate_mapping(request: ValidateRequest):
+    """Trial-cast the mapped columns over the whole fetched file"""
+    from services.validation import validate_type_mapping
+
+    result = _job_result(request.job_id)
+    source_missing = HTTPException(status_code=409, detail="Full-file copy not available, fetch the file again")
+    if not result.get('source_path') or not os.path.exists(result['source_path']):
+        raise source_missing
+    try:
+        report = await run_blocking(validate_type_mapping, result['source_path'], request.type_mapping)
+    except FileNotFoundError:
+        # Evicted from the profile cache while validating
+        raise source_missing
+    return json_response({'ok': all(r['ok'] for r in report.values()), 'columns': report})
+
+
+@app.post('/submit', status_code=202, dependencies=[Depends(require_api_key), Depends(limit_concurrency)])
+async def submit_config(request: SubmitRequest):
+    """Queue an ExcelConfig row (batched append, see GET /submissions/{id})"""
+    from services.excel_config import build_excel_config_row
+    from services.submission_queue import get_submission_queue
+
+    row = build_excel_config_row(request.user_input, request.form_values, request.columns)
+    submission_id = await run_blocking(get_submission_queue().enqueue, list(row.values()))
+    return json_response({'submission_id': submission_id, 'row': row}, status_code=202)
+
+
+@app.get('/submissions/{submission_id}', dependencies=[Depends(require_api_key)])
+async def submission_status(submission_id: int):
+    from services.submission_queue import get_submission_queue
+
+    status = await run_blocking(get_submission_queue().status, submission_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail=f"Unknown submission: {submission_id}")
+    return json_response(status)
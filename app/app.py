@@ -7,16 +7,17 @@ sys.path.insert(0, root_dir)
 # app/app.py
 import streamlit as st
 import json
-from services.auth import auth
-from googleapiclient.discovery import build
 import pandas as pd
 from datetime import datetime
-from services.config import SITE_ID, DRIVE_ID, validate_config, WIP_ID, EXCEL_CONFIG_GID, SHEET_NAME
-from services.sharepoint_services import SharePointService
-from services.preprocessing import process_file_to_dataframe, extract_columns_metadata
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
+from services.config import validate_config
+from services.row_access import open_row_accessor
+from services.jobs import get_job_manager
+from services.excel_config import build_excel_config_row
+from services.submission_queue import get_submission_queue
+from services.config_registry import get_config_registry
+from services.service_cache import invalidate_listings, invalidate_previews, reset_sharepoint_clients, cache_stats
+from utils.session_store import SessionData, get_session_store, current_session_id
+from services.validation import validate_type_mapping, check_key_uniqueness, rank_key_candidates
 
 # ============================================
 # FIX PYTHON PATH
@@ -43,14 +44,43 @@ if 'step' not in st.session_state:
 if 'file_data' not in st.session_state:
     st.session_state.file_data = None
 
-if 'columns_info' not in st.session_state:
-    st.session_state.columns_info = None
-
 if 'user_input' not in st.session_state:
     st.session_state.user_input = {}
 
-if 'df_preview' not in st.session_state:
-    st.session_state.df_preview = None
+# Large per-session payloads live in the process-wide session store (global memory budget,
+# LRU spill to disk, idle sessions dropped), not in st.session_state:
+# columns_info, df_preview, raw_grid (header_row change = re-slice, no re-download),
+# workbook (sheet switch = no re-download / re-open)
+session_data = SessionData()
+get_session_store().touch(current_session_id())
+
+# Parquet copy of the full file (for full-file validation)
+if 'source_path' not in st.session_state:
+    st.session_state.source_path = None
+
+if 'validation_report' not in st.session_state:
+    st.session_state.validation_report = None
+
+if 'key_check' not in st.session_state:
+    st.session_state.key_check = None
+
+# Step 2 column editor: one row per column (Exclude / Key / Target Type)
+if 'column_settings' not in st.session_state:
+    st.session_state.column_settings = None
+
+if 'column_editor_version' not in st.session_state:
+    st.session_state.column_editor_version = 0
+
+# Background fetch job (services.jobs) + last failed / cancelled job
+if 'fetch_job_id' not in st.session_state:
+    st.session_state.fetch_job_id = None
+
+if 'fetch_error' not in st.session_state:
+    st.session_state.fetch_error = None
+
+# Submissions queued from this session (services.submission_queue), kept across Start Over
+if 'submission_ids' not in st.session_state:
+    st.session_state.submission_ids = []
 
 # ✅ TAMBAHAN: Flag untuk track apakah data sudah di-fetch
 if 'data_fetched' not in st.session_state:
@@ -67,7 +97,8 @@ if 'form_values' not in st.session_state:
         'sheet_name': '',
         'header_row': 0,
         'need_backup': False,
-        'backup_path': ''
+        'backup_path': '',
+        'approx_profile': False
     }
 
 # ============================================
@@ -83,9 +114,19 @@ def reset_app():
     """Reset all session state"""
     st.session_state.step = 1
     st.session_state.file_data = None
-    st.session_state.columns_info = None
+    session_data.columns_info = None
     st.session_state.user_input = {}
-    st.session_state.df_preview = None
+    session_data.df_preview = None
+    st.session_state.source_path = None
+    st.session_state.validation_report = None
+    st.session_state.key_check = None
+    st.session_state.column_settings = None
+    session_data.raw_grid = None
+    session_data.workbook = None
+    if st.session_state.fetch_job_id:
+        get_job_manager().cancel(st.session_state.fetch_job_id)
+    st.session_state.fetch_job_id = None
+    st.session_state.fetch_error = None
     st.session_state.data_fetched = False  # ✅ TAMBAHAN
     st.session_state.form_values = {  # ✅ TAMBAHAN
         'sp_url': '',
@@ -96,96 +137,191 @@ def reset_app():
         'sheet_name': '',
         'header_row': 0,
         'need_backup': False,
-        'backup_path': ''
+        'backup_path': '',
+        'approx_profile': False
     }
 
 # ✅ UBAH: Fungsi reset_page2_data (hanya reset page 2, form step 1 tetap)
 def reset_page2_data():
     """Reset hanya data page 2 (column selections)"""
     st.session_state.file_data = None
-    st.session_state.columns_info = None
-    st.session_state.df_preview = None
+    session_data.columns_info = None
+    session_data.df_preview = None
+    st.session_state.source_path = None
+    st.session_state.validation_report = None
+    st.session_state.key_check = None
+    st.session_state.column_settings = None
     st.session_state.data_fetched = False
     # user_input key_columns akan direset saat fetch
     if 'key_columns' in st.session_state.user_input:
         del st.session_state.user_input['key_columns']
+    st.session_state.user_input.pop('type_selection', None)
+
+def available_source_path():
+    """Parquet copy of the full file, None (and forgotten) once the profile cache entry is evicted"""
+    source_path = st.session_state.source_path
+    if source_path and not os.path.exists(source_path):
+        st.session_state.source_path = None
+        return None
+    return source_path
+
+SOURCE_EXPIRED_MESSAGE = "⚠️ Full-file copy sudah tidak ada di cache (evicted), fetch ulang file di Step 1"
+
+def format_unique_count(col_info: dict) -> str:
+    """Unique count label, approximate counts shown as '≈N (±x%)'"""
+    if col_info.get('unique_count_is_approx'):
+        return f"≈{col_info['unique_count']:,} (±{col_info.get('unique_count_error', 0):.1%})"
+    return f"{col_info['unique_count']:,}"
+
+# Available data types untuk mapping
+AVAILABLE_TYPES = [
+    "Default",
+    "date",
+    "datetime",
+    "int",
+    "bigint",
+    "float",
+    "string",
+    "varchar",
+]
+
+# Columns of the Step 2 editor that the user can change
+EDITABLE_SETTINGS = ['Exclude', 'Key', 'Target Type']
+
+def build_column_settings(columns_info: dict, user_input: dict) -> pd.DataFrame:
+    """
+    One row per column (index = column position) with the current Step 2 selections.
+    Target Type: saved selection, else saved mapping, else the profiling suggestion
+    """
+    excluded = set(user_input.get('excluded_columns', []))
+    keys = set(user_input.get('key_columns', []))
+    type_selection = user_input.get('type_selection', {})
+    type_mapping = user_input.get('type_mapping', {})
+    rows = []
+    for col_name, col_info in columns_info.items():
+        suggested_type = col_info.get('suggested_type', "Default")
+        target_type = type_selection.get(col_name, type_mapping.get(col_name, suggested_type))
+        rows.append({
+            'Column': str(col_name),
+            'Type': col_info['inferred_type'],
+            'Nulls %': col_info['null_percentage'],
+            'Unique': format_unique_count(col_info),
+            'Suggested': f"{suggested_type} ({col_info.get('suggestion_confidence', 0):.0%})"
+                         if suggested_type != "Default" else "",
+            'Exclude': col_name in excluded,
+            'Key': col_name in keys,
+            'Target Type': target_type if target_type in AVAILABLE_TYPES else "Default",
+        })
+    return pd.DataFrame(rows)
+
+def filter_column_settings(settings: pd.DataFrame, search: str, show: str) -> pd.DataFrame:
+    """Rows of the column editor matching the search text and the show filter"""
+    mask = pd.Series(True, index=settings.index)
+    if search:
+        mask &= settings['Column'].str.contains(search, case=False, regex=False)
+    if show == "Included":
+        mask &= ~settings['Exclude']
+    elif show == "Excluded":
+        mask &= settings['Exclude']
+    elif show == "Key":
+        mask &= settings['Key']
+    elif show == "Custom type":
+        mask &= settings['Target Type'] != "Default"
+    return settings[mask]
 
 def process_user_input():
     """
     Backend processing: Read file from SharePoint and extract column metadata
-    This runs when user clicks 'Fetch' on Step 1
+    This runs when user clicks 'Fetch' on Step 1. The pipeline runs as a background job,
+    progress is shown by render_fetch_job (widgets stay usable during a long fetch)
     """
-    with st.spinner("🔄 Processing your request..."):
-        try:
-            # Step 1: Get user input from session state
-            user_input = st.session_state.user_input
-            
-            st.info("📂 Connecting to SharePoint...")
-            
-            # Step 2: Initialize SharePoint Service
-            sp_service = SharePointService(
-                site_id=SITE_ID,
-                drive_id=DRIVE_ID
-            )
-            
-            st.info(f"🔍 Searching for file: {user_input['file_name']}")
-            
-            # Step 3: Get file metadata
-            file_meta = sp_service.get_file_metadata(
-                FolderPath=user_input['folder_path'].strip(),
-                FilePattern=user_input['file_name'].strip()
-            )
-            
-            st.success(f"✅ File found: {file_meta['name']}")
-            
-            # Step 4: Download file
-            st.info("⬇️ Downloading file...")
-            file_bytes = sp_service.download_file(file_meta['download_url'])
-            
-            # Step 5: Process to DataFrame
-            st.info("📊 Processing file...")
-            
-            # Determine CSV delimiter if applicable
-            csv_delimiter = None
-            if user_input['extension'] == '.csv':
-                delimiter_map = {
-                    ',': 'comma',
-                    ';': 'semicolon',
-                    '\\tab': 'tab',
-                    '|': 'pipe'
-                }
-                csv_delimiter = delimiter_map.get(user_input.get('delimiter', ','), 'comma')
-            
-            df = process_file_to_dataframe(
-                file_bytes=file_bytes,
-                file_name=file_meta['name'],
-                sheet_name=user_input.get('sheet_name') if user_input.get('sheet_name') else None,
-                header=user_input.get('header_row', 0),
-                csv_delimiter=csv_delimiter or 'comma'
-            )
-            
-            st.success(f"✅ DataFrame created: {len(df):,} rows × {len(df.columns)} columns")
-            
-            # Step 6: Extract column metadata
-            st.info("🔬 Extracting column information...")
-            columns_info = extract_columns_metadata(df)
-            
-            # Step 7: Save to session state
-            st.session_state.file_data = file_meta
-            st.session_state.columns_info = columns_info
-            st.session_state.df_preview = df.head(100)  # Store sample only
-            st.session_state.data_fetched = True  # ✅ TAMBAHAN: Set flag to True
-            
-            st.success("✅ Processing complete!")
-            
-            return True
-            
-        except Exception as e:
-            st.error(f"❌ Error: {str(e)}")
-            import traceback
-            with st.expander("🔍 Show detailed error"):
-                st.code(traceback.format_exc())
-            return False
+    # Loaded on first fetch: pulls in the parse / profiling stack (requests, pyarrow, ...)
+    from services.fetch_pipeline import run_fetch
+
+    job = get_job_manager().submit(
+        'fetch',
+        run_fetch,
+        dict(st.session_state.user_input),
+        raw_grid=session_data.raw_grid,
+        workbook=session_data.workbook
+    )
+    st.session_state.fetch_job_id = job.job_id
+    st.session_state.fetch_error = None
+
+def apply_fetch_result(result: dict):
+    """Copy a finished fetch job result into session state / session store"""
+    st.session_state.file_data = result['file_meta']
+    session_data.columns_info = result['columns_info']
+    session_data.df_preview = result['df_preview']
+    st.session_state.source_path = result['source_path']
+    session_data.raw_grid = result['raw_grid']
+    session_data.workbook = result['workbook']
+    st.session_state.column_settings = None
+    st.session_state.data_fetched = True  # ✅ TAMBAHAN: Set flag to True
+
+def format_progress(progress: dict) -> str:
+    done, total, unit = progress['done'], progress['total'], progress['unit']
+    if unit == 'bytes':
+        done_label = f"{done / 1024 / 1024:,.1f} MB"
+        return f"{done_label} / {total / 1024 / 1024:,.1f} MB" if total else done_label
+    return f"{done:,} / {total:,} {unit}" if total else f"{done:,} {unit}"
+
+FETCH_STAGES = [('download', '⬇️ Download'), ('parse', '📊 Parse'), ('profile', '🔬 Profile')]
+
+@st.fragment(run_every=1.0)
+def render_fetch_job():
+    """Poll the running fetch job (fragment rerun only), full rerun once it finishes"""
+    job = get_job_manager().get(st.session_state.fetch_job_id)
+    if job is None:
+        st.session_state.fetch_job_id = None
+        st.rerun()
+    
+    snapshot = job.snapshot()
+    if snapshot['status'] == 'done':
+        apply_fetch_result(job.result)
+        job.result = None  # payloads now owned by the session store
+        st.session_state.fetch_job_id = None
+        st.rerun()
+    elif snapshot['status'] in ('failed', 'cancelled'):
+        st.session_state.fetch_error = snapshot
+        st.session_state.fetch_job_id = None
+        st.rerun()
+    
+    with st.status(f"🔄 Processing your request... ({snapshot['elapsed']:.0f}s)", expanded=True):
+        for level, message in snapshot['messages']:
+            getattr(st, level, st.info)(message)
+        for stage, label in FETCH_STAGES:
+            progress = snapshot['progress'].get(stage)
+            if not progress:
+                continue
+            ratio = min(progress['done'] / progress['total'], 1.0) if progress['total'] else 0.0
+            st.progress(ratio, text=f"{label}: {format_progress(progress)}")
+    
+    if st.button("⛔ Cancel fetch", key="btn_cancel_fetch"):
+        get_job_manager().cancel(snapshot['job_id'])
+
+SUBMISSION_ICONS = {'pending': '⏳', 'sending': '📤', 'done': '✅', 'failed': '❌'}
+
+@st.fragment(run_every=2.0)
+def render_submissions():
+    """Per-row status of this session's queued submissions"""
+    queue = get_submission_queue()
+    for submission_id in reversed(st.session_state.submission_ids):
+        status = queue.status(submission_id)
+        if status is None:
+            continue
+        icon = SUBMISSION_ICONS.get(status['status'], '')
+        if status['status'] == 'done':
+            st.write(f"{icon} #{submission_id}: ExcelConfigId {status['config_id']}")
+        elif status['status'] == 'failed':
+            st.write(f"{icon} #{submission_id}: {status['error']}")
+            if st.button("Retry", key=f"btn_retry_submission_{submission_id}"):
+                queue.retry(submission_id)
+        elif status['status'] == 'pending' and status['attempts']:
+            retry_in = max(0, status['next_attempt_at'] - datetime.now().timestamp())
+            st.write(f"{icon} #{submission_id}: retry {status['attempts']} in {retry_in:.0f}s ({status['error']})")
+        else:
+            st.write(f"{icon} #{submission_id}: {status['status']}")
 
 # ============================================
 # HEADER
@@ -201,6 +337,13 @@ except Exception as e:
     st.info("💡 Please check your .env file")
     st.stop()
 
+# The session store drops payloads of tabs idle longer than SESSION_IDLE_MINUTES:
+# back to Step 1 (form values kept) instead of failing later on columns_info None
+if st.session_state.step > 1 and session_data.columns_info is None:
+    reset_page2_data()
+    st.session_state.step = 1
+    st.warning("⚠️ Data file sudah tidak tersedia (session idle terlalu lama), silakan fetch ulang file")
+
 # Progress bar
 progress_mapping = {1: 0.33, 2: 0.66, 3: 1.0}
 st.progress(progress_mapping.get(st.session_state.step, 0.33))
@@ -285,6 +428,11 @@ if st.session_state.step == 1:
             help="For Excel files only",
             key="input_sheet_name"
         )
+        if session_data.workbook and session_data.workbook['session'].sheet_names:
+            st.caption(
+                "Sheets in workbook: "
+                + ", ".join(f"`{name}`" for name in session_data.workbook['session'].sheet_names)
+            )
     
     with col4:
         header_row = st.number_input(
@@ -311,6 +459,13 @@ if st.session_state.step == 1:
                                     placeholder="Enter backup path..." if need_backup else "Checkbox disabled",
                                     help= "Path for backup",
                                     key="input_backup_path")
+
+    approx_profile = st.checkbox(
+        "Approximate profiling (large files)",
+        value=form_vals.get('approx_profile', False),
+        help="Use sketches (HyperLogLog, top-k) for unique counts. Faster and constant memory, counts are estimates",
+        key="input_approx_profile"
+    )
     
     st.divider()
     
@@ -322,7 +477,8 @@ if st.session_state.step == 1:
     col_fetch, col_next = st.columns([1, 1])
     
     with col_fetch:
-        fetch_disabled = not all_filled
+        fetch_running = bool(st.session_state.fetch_job_id)
+        fetch_disabled = not all_filled or fetch_running
         if extension == ".csv" and delimiter == "Custom" and not custom_delimiter:
             fetch_disabled = True
         
@@ -336,7 +492,7 @@ if st.session_state.step == 1:
     
     with col_next:
         # ✅ TAMBAHAN: Next button hanya muncul kalau data sudah di-fetch
-        next_disabled = not st.session_state.data_fetched
+        next_disabled = not st.session_state.data_fetched or fetch_running
         next_clicked = st.button(
             "➡️ Next",
             type="secondary",
@@ -357,7 +513,8 @@ if st.session_state.step == 1:
             'sheet_name': sheet_name,
             'header_row': header_row,
             'need_backup': need_backup,
-            'backup_path': backup_path if need_backup else ''
+            'backup_path': backup_path if need_backup else '',
+            'approx_profile': approx_profile
         }
         
         # Save to user_input
@@ -366,12 +523,22 @@ if st.session_state.step == 1:
         # ✅ TAMBAHAN: Reset page 2 data when fetching new data
         reset_page2_data()
         
-        # Process file and extract columns
-        success = process_user_input()
-        
-        if success:
-            st.success("✅ Data fetched successfully! Click 'Next' to continue.")
-            st.rerun()
+        # Process file and extract columns (background job)
+        process_user_input()
+        st.rerun()
+    
+    # Live progress of the running fetch job
+    if st.session_state.fetch_job_id:
+        render_fetch_job()
+    
+    fetch_error = st.session_state.fetch_error
+    if fetch_error:
+        if fetch_error['status'] == 'cancelled':
+            st.warning("⛔ Fetch cancelled")
+        else:
+            st.error(f"❌ Error: {fetch_error['error']}")
+            with st.expander("🔍 Show detailed error"):
+                st.code(fetch_error['traceback'])
     
     # ✅ TAMBAHAN: Handle Next button click
     if next_clicked:
@@ -384,7 +551,8 @@ if st.session_state.step == 1:
             'sheet_name': sheet_name,
             'header_row': header_row,
             'need_backup': need_backup,
-            'backup_path': backup_path if need_backup else ''
+            'backup_path': backup_path if need_backup else '',
+            'approx_profile': approx_profile
         }
         # Update user_input juga agar sinkron
         st.session_state.user_input.update(st.session_state.form_values)
@@ -405,7 +573,7 @@ elif st.session_state.step == 2:
     st.subheader("⚙️ Step 2: Configure Columns")
     
     # Check if data is loaded
-    if st.session_state.columns_info is None:
+    if session_data.columns_info is None:
         st.error("❌ No data loaded. Please go back to Step 1.")
         if st.button("← Back to Step 1"):
             prev_step()
@@ -420,9 +588,15 @@ elif st.session_state.step == 2:
     
     # Show data preview
     with st.expander("👁️ Data Preview", expanded=True):
-        if st.session_state.df_preview is not None:
+        if session_data.df_preview is not None:
+            total_rows = file_meta.get('total_rows')
+            if total_rows and total_rows > len(session_data.df_preview):
+                st.caption(
+                    f"Showing {len(session_data.df_preview):,} of {total_rows:,} rows sampled across the file "
+                    f"(first and last rows always included, index = original row number)"
+                )
             st.dataframe(
-                st.session_state.df_preview,
+                session_data.df_preview,
                 width='stretch',
                 height=300
             )
@@ -432,20 +606,23 @@ elif st.session_state.step == 2:
         import pandas as pd
         
         col_info_list = []
-        for col_name, col_info in st.session_state.columns_info.items():
+        for col_name, col_info in session_data.columns_info.items():
             col_info_list.append({
                 'Column': col_name,
                 'Type': col_info['inferred_type'],
                 'Nulls': f"{col_info['null_count']} ({col_info['null_percentage']}%)",
-                'Unique': col_info['unique_count'],
+                'Unique': format_unique_count(col_info),
                 'Sample': ', '.join(str(v) for v in col_info['sample_values'][:3])
             })
         
         col_info_df = pd.DataFrame(col_info_list)
         st.dataframe(col_info_df, width='stretch', hide_index=True)
+
+        if any(info.get('unique_count_is_approx') for info in session_data.columns_info.values()):
+            st.caption("≈ Unique counts are HyperLogLog estimates (± relative standard error)")
     
     st.divider()
-    all_columns = list(st.session_state.columns_info.keys())
+    all_columns = list(session_data.columns_info.keys())
     
     # Initialize session state
     if 'ingestion_method' not in st.session_state.user_input:
@@ -457,32 +634,6 @@ elif st.session_state.step == 2:
     if 'schedule' not in st.session_state.user_input:
         st.session_state.user_input['schedule'] = {}
 
-    # ============================================
-    # SECTION 2: COLUMNS EXCLUDE
-    # ============================================
-    st.markdown("### 🚫 Exclude Columns")
-    st.caption("Pilih kolom yang tidak ingin dimasukkan ke dalam database")
-
-    selected_excluded_columns = []
-    num_cols_exclude = 3
-    cols_exclude = st.columns(num_cols_exclude)
-
-    for idx, col_name in enumerate(all_columns):
-        col_info = st.session_state.columns_info[col_name]
-        default_excluded = col_name in st.session_state.user_input.get('excluded_columns', [])
-
-        with cols_exclude[idx % num_cols_exclude]:
-            is_excluded = st.checkbox(
-                f"**{col_name}**",
-                value=default_excluded,
-                key=f"exclude_col_{col_name}",
-                help=f"Type: {col_info['inferred_type']}"
-            )
-            if is_excluded:
-                selected_excluded_columns.append(col_name)
-
-    st.divider()
-
     st.markdown("### 🗑️ Exclude Rows by Index")
     st.caption("Masukkan index baris yang ingin dihapus (pisahkan dengan koma)")
 
@@ -532,13 +683,31 @@ elif st.session_state.step == 2:
     # Preview excluded rows
     if excluded_row_indices:
         with st.expander("👁️ Preview Excluded Rows"):
-            try:
-                df = st.session_state.df_preview.iloc[excluded_row_indices]
-                st.dataframe(df)
-            except:
-                st.warning("⚠️ Beberapa index melebihi jumlah baris data")
+            # Maksimal 1000 baris yang ditampilkan
+            preview_indices = excluded_row_indices[:1000]
+            source_path = available_source_path()
+            if source_path:
+                # Ambil baris langsung dari Parquet copy (full file, tanpa re-parse workbook)
+                accessor = open_row_accessor(source_path)
+                st.dataframe(accessor.take(preview_indices, column_labels=all_columns))
+                out_of_range = sum(1 for idx in excluded_row_indices if idx >= accessor.num_rows)
+                if out_of_range:
+                    st.warning(f"⚠️ {out_of_range} index melebihi jumlah baris data ({accessor.num_rows:,})")
+            else:
+                # Fallback: preview berisi sample, index = nomor baris asli
+                df_preview = session_data.df_preview
+                in_preview = df_preview.index.intersection(preview_indices)
+                st.dataframe(df_preview.loc[in_preview])
+                not_in_preview = len(preview_indices) - len(in_preview)
+                if not_in_preview:
+                    st.warning(f"⚠️ {not_in_preview} index tidak ada di preview sample (atau melebihi jumlah baris data)")
+            if len(excluded_row_indices) > len(preview_indices):
+                st.caption(f"Showing first {len(preview_indices):,} of {len(excluded_row_indices):,} excluded rows")
+
+    st.divider()
+
     # ============================================
-    # SECTION 1: KEY COLUMNS SELECTION
+    # SECTION 1: METHOD INGESTION
     # ============================================
     st.markdown("### ⚙️ Method Ingestion")
     st.caption("Pilih metode ingestion yang akan digunakan")
@@ -555,36 +724,164 @@ elif st.session_state.step == 2:
         horizontal=True,
         label_visibility="collapsed"
     )
+    is_delete_insert = ingestion_method == "Delete-Insert"
 
+    st.divider()
+
+    # ============================================
+    # SECTION 2: COLUMN SETTINGS (EXCLUDE / KEY / DATA TYPE)
+    # ============================================
+    # One data editor for all columns: widget count (and rerun cost) does not grow with the column count
+    st.markdown("### 🧩 Column Settings")
+    st.caption(
+        "Exclude kolom yang tidak ingin dimasukkan ke database"
+        + (", pilih key columns (like primary keys)" if is_delete_insert else "")
+        + " dan target data type (pre-selected from profiling stats, 'Default' = auto-detected type)"
+    )
+
+    if st.session_state.column_settings is None or \
+            len(st.session_state.column_settings) != len(all_columns):
+        st.session_state.column_settings = build_column_settings(
+            session_data.columns_info, st.session_state.user_input
+        )
+    column_settings = st.session_state.column_settings
+
+    filter_col1, filter_col2 = st.columns([2, 1])
+    with filter_col1:
+        column_search = st.text_input(
+            "Search columns", placeholder="Filter by column name...", key="column_search"
+        )
+    with filter_col2:
+        column_show = st.selectbox(
+            "Show", options=["All", "Included", "Excluded", "Key", "Custom type"], key="column_show"
+        )
+    visible_settings = filter_column_settings(column_settings, column_search, column_show)
+
+    # Bulk actions apply to the rows currently shown
+    bulk_col1, bulk_col2, bulk_col3, bulk_col4, bulk_col5 = st.columns([1, 1, 1, 1, 1])
+    bulk_update = None
+    with bulk_col1:
+        if st.button("🚫 Exclude shown", width='stretch', key="bulk_exclude"):
+            bulk_update = ('Exclude', True)
+    with bulk_col2:
+        if st.button("✅ Include shown", width='stretch', key="bulk_include"):
+            bulk_update = ('Exclude', False)
+    with bulk_col3:
+        if st.button("💡 Use suggested types", width='stretch', key="bulk_suggested"):
+            bulk_update = ('Target Type', None)
+    with bulk_col4:
+        bulk_type = st.selectbox(
+            "Set type", options=AVAILABLE_TYPES, key="bulk_type", label_visibility="collapsed"
+        )
+    with bulk_col5:
+        if st.button("🔧 Set type for shown", width='stretch', key="bulk_set_type"):
+            bulk_update = ('Target Type', bulk_type)
+
+    if bulk_update:
+        setting, value = bulk_update
+        if setting == 'Target Type' and value is None:
+            for position in visible_settings.index:
+                suggested_type = session_data.columns_info[all_columns[position]].get('suggested_type', "Default")
+                column_settings.at[position, 'Target Type'] = suggested_type
+        else:
+            column_settings.loc[visible_settings.index, setting] = value
+        # New editor key: pending cell edits of the old editor must not override the bulk update
+        st.session_state.column_editor_version += 1
+        st.rerun()
+
+    st.caption(f"Showing {len(visible_settings):,} of {len(column_settings):,} columns")
+    editor_key = f"column_editor_{st.session_state.column_editor_version}_{column_search}_{column_show}"
+    edited_settings = st.data_editor(
+        visible_settings,
+        key=editor_key,
+        width='stretch',
+        height=min(600, 38 + 35 * max(len(visible_settings), 1)),
+        hide_index=True,
+        column_order=['Column', 'Type', 'Nulls %', 'Unique', 'Suggested', 'Exclude']
+            + (['Key'] if is_delete_insert else []) + ['Target Type'],
+        disabled=['Column', 'Type', 'Nulls %', 'Unique', 'Suggested'],
+        column_config={
+            'Nulls %': st.column_config.NumberColumn(format="%.2f"),
+            'Exclude': st.column_config.CheckboxColumn(help="Tidak dimasukkan ke database"),
+            'Key': st.column_config.CheckboxColumn(help="Key columns uniquely identify each row"),
+            'Target Type': st.column_config.SelectboxColumn(options=AVAILABLE_TYPES, required=True),
+        }
+    )
+    # Write cell edits back to the full settings table
+    column_settings.loc[edited_settings.index, EDITABLE_SETTINGS] = edited_settings[EDITABLE_SETTINGS]
+
+    excluded_mask = column_settings['Exclude'].to_numpy(dtype=bool)
+    selected_excluded_columns = [col for col, excluded in zip(all_columns, excluded_mask) if excluded]
+    filtered_columns = [col for col, excluded in zip(all_columns, excluded_mask) if not excluded]
     selected_key_columns = []
-    filtered_columns = [col for col in all_columns if col not in selected_excluded_columns]
+    if is_delete_insert:
+        key_mask = column_settings['Key'].to_numpy(dtype=bool)
+        selected_key_columns = [col for col, is_key, excluded in zip(all_columns, key_mask, excluded_mask)
+                                if is_key and not excluded]
+        if (key_mask & excluded_mask).any():
+            st.warning("⚠️ Excluded columns are ignored as key columns")
+
+    # Target types of included columns (type_mapping: only non-Default)
+    type_selection = {
+        col: target_type
+        for col, target_type, excluded in zip(all_columns, column_settings['Target Type'], excluded_mask)
+        if not excluded
+    }
+    type_mapping = {col: t for col, t in type_selection.items() if t != "Default"}
 
-    if ingestion_method == "Delete-Insert":
+    if is_delete_insert:
         st.divider()
 
         # --- Key Columns ---
-        st.markdown("### 🔑 Select Key Columns")
-        st.caption("Key columns uniquely identify each row (like primary keys)")
-
-        num_cols = 3
-        cols = st.columns(num_cols)
-
-        for idx, col_name in enumerate(filtered_columns):
-            col_info = st.session_state.columns_info[col_name]
-            default_checked = col_name in st.session_state.user_input.get('key_columns', [])
-
-            with cols[idx % num_cols]:
-                is_selected = st.checkbox(
-                    f"**{col_name}**",
-                    value=default_checked,
-                    key=f"key_col_{col_name}",
-                    help=f"Type: {col_info['inferred_type']} | Unique: {col_info['unique_count']}"
-                )
-                if is_selected:
-                    selected_key_columns.append(col_name)
+        st.markdown("### 🔑 Key Columns")
+        st.caption("Selected: " + (", ".join(f"**{col}**" for col in selected_key_columns) or "-"))
 
-        st.divider()
+        total_rows = file_meta.get('total_rows') or len(session_data.df_preview)
+        key_candidates = rank_key_candidates(
+            {col: session_data.columns_info[col] for col in filtered_columns},
+            total_rows
+        )
+        if key_candidates:
+            st.caption("💡 Best candidates: " + ", ".join(
+                f"**{c['column']}** ({'≈' if c['is_approx'] else ''}{c['uniqueness_ratio']:.1%} unique"
+                f"{', has nulls' if c['null_count'] else ''})"
+                for c in key_candidates
+            ))
+
+        # Full-file uniqueness check of the composite key
+        source_path = available_source_path() if selected_key_columns else None
+        if selected_key_columns and not source_path:
+            st.caption("Full-file copy not available, fetch the file again to check key uniqueness")
+        if selected_key_columns and source_path:
+            if st.button("🔑 Check key uniqueness on full file", key="btn_check_keys"):
+                with st.spinner("Hashing composite keys..."):
+                    try:
+                        st.session_state.key_check = {
+                            'key_columns': list(selected_key_columns),
+                            'result': check_key_uniqueness(source_path, selected_key_columns)
+                        }
+                    except FileNotFoundError:
+                        st.session_state.source_path = None
+                        st.warning(SOURCE_EXPIRED_MESSAGE)
+
+            key_check = st.session_state.key_check
+            if key_check and key_check['key_columns'] == selected_key_columns:
+                result = key_check['result']
+                if result['is_unique']:
+                    st.success(f"✅ Key is unique across {result['total_rows']:,} rows")
+                else:
+                    st.error(
+                        f"❌ {result['duplicate_rows']:,} duplicate rows "
+                        f"({result['duplicate_keys']:,} keys occur more than once)"
+                    )
+                    st.dataframe([
+                        {**sample['key'], 'Count': sample['count'], 'Rows': ', '.join(map(str, sample['rows']))}
+                        for sample in result['samples']
+                    ], width='stretch', hide_index=True)
+                if result['null_key_rows']:
+                    st.warning(f"⚠️ {result['null_key_rows']:,} rows have an empty key column")
 
+    st.divider()
 
     # --- Schedule (selalu muncul) ---
     st.markdown("### 🗓️ Schedule Ingestion")
@@ -617,84 +914,6 @@ elif st.session_state.step == 2:
         
     st.divider()
     
-    # ============================================
-    # SECTION 3: DATA TYPE MAPPING (SIMPLIFIED TABULAR)
-    # ============================================
-    st.markdown("### 🔧 Map Data Types")
-    st.caption("Define target data type for each column (leave as 'Default' to use auto-detected type)")
-    
-    # Available data types untuk mapping
-    AVAILABLE_TYPES = [
-        "Default",
-        "date",
-        "datetime",
-        "int",
-        "bigint",
-        "float",
-        "string",
-        "varchar",
-    ]
-    
-    # ✅ FIX: Jangan auto-populate, biarkan kosong
-    if 'type_mapping' not in st.session_state.user_input:
-        st.session_state.user_input['type_mapping'] = {}
-    
-    # ✅ FIX: Buat temporary dict untuk current session
-    current_type_mapping = st.session_state.user_input.get('type_mapping', {})
-    
-    # Create mapping UI in tabular format
-    type_mapping = {}
-    
-    # Tabular layout dengan 2 kolom
-    # st.markdown("#### Column Type Configuration")
-    
-    # Create header
-    header_col1, header_col2 = st.columns([2, 1])
-    with header_col1:
-        st.markdown("**Column Name**")
-    with header_col2:
-        st.markdown("**Target Type**")
-    
-    st.markdown("---")
-    
-    # Create rows
-    for col_name in filtered_columns:
-        col_info = st.session_state.columns_info[col_name]
-        
-        # ✅ FIX: Kalau belum pernah diset, default ke "Default" (index 0)
-        # Kalau udah pernah diset, pakai value yang tersimpan
-        saved_type = current_type_mapping.get(col_name, "Default")
-        
-        # Find index
-        try:
-            current_index = AVAILABLE_TYPES.index(saved_type)
-        except ValueError:
-            current_index = 0  # Fallback to "Default"
-        
-        # Create row with 2 columns
-        row_col1, row_col2 = st.columns([2, 1])
-        
-        with row_col1:
-            # Show column name with inferred type badge
-            inferred_badge = col_info['inferred_type'].capitalize()
-            st.markdown(f"**{col_name}** `{inferred_badge}`")
-        
-        with row_col2:
-            # Selectbox for type mapping
-            selected_type = st.selectbox(
-                f"Type for {col_name}",
-                options=AVAILABLE_TYPES,
-                index=current_index,  # ✅ Ini akan 0 untuk kolom yang belum pernah diubah
-                key=f"type_map_{col_name}",
-                label_visibility="collapsed"
-            )
-            
-            # ✅ FIX: Hanya simpan kalau BUKAN "Default"
-            if selected_type != "Default":
-                type_mapping[col_name] = selected_type
-    
-    st.divider()
-    
     # ============================================
     # PREVIEW: JSON OUTPUT (Only non-default values)
     # ============================================
@@ -721,7 +940,7 @@ elif st.session_state.step == 2:
                     "null_count": col_info['null_count'],
                     "unique_count": col_info['unique_count']
                 }
-                for col_name, col_info in st.session_state.columns_info.items()
+                for col_name, col_info in session_data.columns_info.items()
             }
         
         st.json(output_json, expanded=True)
@@ -763,18 +982,18 @@ elif st.session_state.step == 2:
         st.session_state.user_input['key_columns'] = selected_key_columns
         st.session_state.user_input['excluded_columns'] = selected_excluded_columns
         st.session_state.user_input['type_mapping'] = type_mapping  # ✅ Hanya non-default
+        st.session_state.user_input['type_selection'] = type_selection
         prev_step()
         st.rerun()
     
     if next_clicked:
-        is_delete_insert = ingestion_method == "Delete-Insert"
-
         if is_delete_insert and not selected_key_columns:
             st.error("❌ Please select at least one key column")
         else:
             st.session_state.user_input['ingestion_method'] = ingestion_method
             st.session_state.user_input['excluded_columns'] = selected_excluded_columns
             st.session_state.user_input['type_mapping'] = type_mapping
+            st.session_state.user_input['type_selection'] = type_selection
 
             # ✅ Schedule selalu disimpan
             time_str = run_time.strftime("%H:%M:%S")
@@ -861,6 +1080,17 @@ elif st.session_state.step == 3:
         elif table_name and is_prefix_valid:
             st.success("✅ **Valid Name:** Prefix matches requirements.")
 
+        # Duplicate table name check against the local ExcelConfig mirror
+        if table_name:
+            try:
+                existing_configs = get_config_registry().find_by_table(table_name)
+            except Exception as e:
+                existing_configs = []
+                print(f"  ⚠ Config registry lookup failed: {e}")
+            if existing_configs:
+                existing_ids = ", ".join(str(c.get('ExcelConfigId')) for c in existing_configs)
+                st.warning(f"⚠️ **Table already configured:** `{table_name}` is used by ExcelConfigId {existing_ids}")
+
         # Configurator Name (PIC)
         pic_name = st.text_input(
             "Configurator Name (PIC)*",
@@ -889,6 +1119,25 @@ elif st.session_state.step == 3:
         **Sheet:** `{user_input.get('sheet_name') or 'Default'}`
         """)
 
+        # Previous configs of the same file (local ExcelConfig mirror)
+        try:
+            previous_configs = get_config_registry().find_by_file(user_input.get('file_name', ''))
+        except Exception as e:
+            previous_configs = []
+            print(f"  ⚠ Config registry lookup failed: {e}")
+        if previous_configs:
+            with st.expander(f"🗂️ {len(previous_configs)} existing config(s) for this file"):
+                st.dataframe([
+                    {
+                        "ExcelConfigId": c.get('ExcelConfigId'),
+                        "Table": c.get('TableName'),
+                        "Sheet": c.get('SheetName'),
+                        "Key Columns": c.get('KeyColumnsList'),
+                        "Modified": c.get('LastModifiedDate'),
+                    }
+                    for c in previous_configs
+                ], width='stretch', hide_index=True)
+
         st.markdown("##### 🔑 Key & Schema")
 
         keys = user_input.get('key_columns', [])
@@ -901,7 +1150,7 @@ elif st.session_state.step == 3:
         excluded_rows_count = len(excluded_rows) if excluded_rows else 0
         excluded_rows_text = f"{excluded_rows_count} rows" if excluded_rows else "—"
 
-        total_cols = len(st.session_state.columns_info) if st.session_state.columns_info is not None else 0
+        total_cols = len(session_data.columns_info) if session_data.columns_info is not None else 0
         active_cols = total_cols - len(excluded_cols)
 
         ingestion_method = user_input.get('ingestion_method', '—')
@@ -957,6 +1206,57 @@ elif st.session_state.step == 3:
             st.caption("All columns using default data type")
     
     st.divider()
+
+    # ============================================
+    # FULL-FILE TYPE VALIDATION
+    # ============================================
+    st.markdown("### 🔎 Validate Type Mapping")
+    st.caption("Trial-cast every mapped column over the whole file before submitting")
+
+    validation_failed = False
+    current_mapping = user_input.get("type_mapping", {})
+    if not current_mapping:
+        st.caption("No custom types to validate")
+    elif not available_source_path():
+        st.caption("Full-file copy not available, fetch the file again to validate")
+    else:
+        if st.button("🔎 Validate on full file", key="btn_validate_types"):
+            with st.spinner("Validating type mapping on full file..."):
+                try:
+                    st.session_state.validation_report = {
+                        'type_mapping': dict(current_mapping),
+                        'report': validate_type_mapping(st.session_state.source_path, current_mapping)
+                    }
+                except FileNotFoundError:
+                    st.session_state.source_path = None
+                    st.warning(SOURCE_EXPIRED_MESSAGE)
+
+        saved_validation = st.session_state.validation_report
+        if saved_validation and saved_validation['type_mapping'] == current_mapping:
+            report = saved_validation['report']
+            failed = {col: r for col, r in report.items() if not r['ok']}
+            validation_failed = bool(failed)
+
+            if failed:
+                st.error(f"❌ {len(failed)} column(s) have values that cannot be cast")
+                st.dataframe([
+                    {
+                        "Column": col,
+                        "Target Type": r['target_type'],
+                        "Failed Rows": f"{r['failed_count']:,} / {r['checked_rows']:,}",
+                        "Examples": ", ".join(f"row {e['row']}: {e['value']}" for e in r['examples'])
+                    }
+                    for col, r in failed.items()
+                ], width='stretch', hide_index=True)
+            else:
+                checked_rows = next(iter(report.values()))['checked_rows'] if report else 0
+                st.success(f"✅ All mapped columns cast cleanly ({checked_rows:,} rows checked)")
+
+    submit_anyway = True
+    if validation_failed:
+        submit_anyway = st.checkbox("Submit anyway (ingestion may fail on these rows)", key="cb_submit_anyway")
+
+    st.divider()
     
     col_back, col_submit, col_reset = st.columns([1, 1, 1])
     
@@ -971,7 +1271,7 @@ elif st.session_state.step == 3:
             st.rerun()
     
     with col_submit:
-        if st.button("🚀 Submit to Fabric", type="primary", width='stretch'):
+        if st.button("🚀 Submit to Fabric", type="primary", width='stretch', disabled=not submit_anyway):
             st.session_state.user_input['dest_config'] = {
                 'target_dest': target_destination,
                 'target_schema': target_schema,
@@ -981,126 +1281,25 @@ elif st.session_state.step == 3:
 
             try:
                 user_input = st.session_state.user_input
-                dest_config = user_input.get('dest_config', {})
                 form_values = st.session_state.get('form_values', {})
 
-                # ---- Ambil nilai dari session state ----
-                type_mapping = user_input.get('type_mapping', {})
-                key_columns = user_input.get('key_columns', [])
-                excluded_columns = user_input.get('excluded_columns', [])
-                rows_to_delete = user_input.get('excluded_row_indices', [])
-
-                # ---- Form values ----
-                file_name = form_values.get('file_name', '')
-                sp_url = form_values.get('sp_url', 'NULL')
-                folder_path = form_values.get('folder_path', 'NULL')
-                sheet_name = form_values.get('sheet_name', 'NULL')
-                csv_delimiter = form_values.get('delimiter') or 'NULL'
-                need_backup = form_values.get('need_backup', False)
-                backup_path = form_values.get('backup_path', '')
-                header_row = form_values.get('header_row', 0)
-                schedule_spreadsheet = json.dumps(user_input.get('schedule', {})) if user_input.get('schedule') else 'NULL'
-
-                # ---- Derived values ----
-                key_columns_str = ', '.join(key_columns) if key_columns else 'NULL'
-                rows_to_delete_str = ', '.join(str(r) for r in rows_to_delete) if rows_to_delete else 'NULL'
-
-                df_columns = list(st.session_state.columns_info.keys())
-                excluded_indices = [str(df_columns.index(col) + 1) for col in excluded_columns if col in df_columns]
-                excluded_columns_str = ', '.join(excluded_indices) if excluded_indices else 'NULL'
-
-                target_dest = dest_config.get('target_dest', '')
-                fwk_target_id = 200 if target_dest == 'SILVER_LH_P_FINANCE_DEV' else 101010
-                need_backup_val = 'Y' if need_backup else 'N'
-                backup_folder_path = backup_path if need_backup else 'NULL'
-                pic_name_val = dest_config.get('pic_name', '')
-
-                ingestion_method_raw = user_input.get('ingestion_method', 'Full-Load')
-                ingestion_mode = 'Full-Load' if 'Full-Load' in ingestion_method_raw or 'Full Load' in ingestion_method_raw else ingestion_method_raw
-
-                now = datetime.now()
-                last_modified_date = f"{now.month}/{now.day}/{now.year} {now.strftime('%H:%M:%S')}"
-
-                # ---- Ambil max ExcelConfigId dari spreadsheet ----
-                csv_url = f"https://docs.google.com/spreadsheets/d/{WIP_ID}/export?format=csv&gid={EXCEL_CONFIG_GID}"
-                df = pd.read_csv(csv_url)
-                max_id = int(df['ExcelConfigId'].max()) + 1
+                # ---- Build row (ExcelConfigId allocated on append) ----
+                config_row = build_excel_config_row(
+                    user_input, form_values, list(session_data.columns_info.keys())
+                )
 
                 # ---- Print to terminal ----
                 print("\n" + "="*60)
                 print("🚀 FABRIC SUBMISSION - USER INPUT")
                 print("="*60)
-                print(f"  max_id:               {max_id}")
-                print(f"  file_name:            {file_name}")
-                print(f"  sp_url:               {sp_url}")
-                print(f"  folder_path:          {folder_path}")
-                print(f"  sheet_name:           {sheet_name}")
-                print(f"  csv_delimiter:        {csv_delimiter}")
-                print(f"  header_row:           {header_row + 1}")
-                print(f"  key_columns:          {key_columns_str}")
-                print(f"  excluded_columns:     {excluded_columns_str}")
-                print(f"  rows_to_delete:       {rows_to_delete_str}")
-                print(f"  type_mapping:         {json.dumps(type_mapping) if type_mapping else 'NULL'}")
-                print(f"  ingestion_mode:       {ingestion_mode}")
-                print(f"  schedule:             {user_input.get('schedule', {})}")
-                print(f"  fwk_target_id:        {fwk_target_id}")
-                print(f"  need_backup:          {need_backup_val}")
-                print(f"  backup_folder_path:   {backup_folder_path}")
-                print(f"  last_modified_date:   {last_modified_date}")
-                print(f"  pic_name:             {pic_name_val}")
-                print(f"  target_dest:          {target_dest}")
-                print(f"  target_schema:        {dest_config.get('target_schema', 'NULL')}")
-                print(f"  table_name:           {dest_config.get('table_name', 'NULL')}")
+                for column, value in config_row.items():
+                    print(f"  {column + ':':<22}{value}")
                 print("="*60 + "\n")
 
-                # ---- Build row ----
-                new_row = [
-                    max_id,                                                      # ExcelConfigId
-                    9999,                                                        # FwkTriggerId
-                    dest_config.get('target_schema', 'NULL'),                   # SchemaName
-                    file_name,                                                   # FileName
-                    file_name,                                                   # FilePattern
-                    sp_url,                                                      # URL
-                    folder_path,                                                 # FolderPath
-                    dest_config.get('table_name', 'NULL'),                      # TableName
-                    sheet_name,                                                  # SheetName
-                    user_input.get('dataflow_id', 'NULL'),                      # DataflowId
-                    user_input.get('dataflow_workspace_id', 'NULL'),            # DataflowWorkspaceId
-                    key_columns_str,                                             # KeyColumnsList
-                    excluded_columns_str,                                        # ColumnsExcludeMap
-                    json.dumps(type_mapping) if type_mapping else 'NULL',        # ColumnType
-                    8,                                                           # Actions
-                    header_row + 1,                                              # HeaderRowsToDelete
-                    rows_to_delete_str,                                          # FwkTargetId (?)
-                    fwk_target_id,                                               # FwkTargetId
-                    ingestion_mode,                                              # IngestionMode
-                    need_backup_val,                                             # NeedBackup
-                    backup_folder_path,                                          # BackupFolderPath
-                    'N',                                                         # FlexibleSchema
-                    'N',                                                         # IsStaging
-                    'Y',                                                         # IsActive
-                    'N',                                                         # ExpectedEmpty
-                    csv_delimiter,                                               # CSVDelimiter
-                    last_modified_date,                                          # LastModifiedDate
-                    pic_name_val,                                                # LastModifiedBy
-                    pic_name_val,                                                # DataOwner
-                    schedule_spreadsheet
-                ]
-
-                # ---- Append ke spreadsheet ----
-                creds = auth.get_credentials()
-                service = build('sheets', 'v4', credentials=creds)
-                body = {'values': [new_row]}
-                result = service.spreadsheets().values().append(
-                    spreadsheetId=WIP_ID,
-                    range=f'{SHEET_NAME}!A1',
-                    valueInputOption='USER_ENTERED',
-                    insertDataOption='INSERT_ROWS',
-                    body=body
-                ).execute()
-
-                print(f"✅ Berhasil append! Range: {result['updates']['updatedRange']}")
-                st.success("✅ Configuration submitted!")
+                # ---- Queue append ke spreadsheet (batched, retried in background) ----
+                submission_id = get_submission_queue().enqueue(list(config_row.values()))
+                st.session_state.submission_ids.append(submission_id)
+                st.success(f"✅ Configuration queued for submission (#{submission_id}), status in the sidebar")
 
             except Exception as e:
                 st.error(f"❌ Gagal submit: {str(e)}")
@@ -1117,10 +1316,44 @@ with st.sidebar:
     st.markdown("### 🔍 Debug Info")
     st.write(f"Current Step: {st.session_state.step}")
     st.write(f"Data Fetched: {'Yes' if st.session_state.data_fetched else 'No'}")  # ✅ UBAH
-    st.write(f"Data Loaded: {'Yes' if st.session_state.columns_info else 'No'}")
+    st.write(f"Data Loaded: {'Yes' if session_data.columns_info else 'No'}")
+
+    if session_data.columns_info:
+        st.write(f"Total Columns: {len(session_data.columns_info)}")
+    
+    # Process-wide session store (all sessions)
+    store_metrics = get_session_store().metrics()
+    st.write(
+        f"Session Store: {store_metrics['resident_bytes'] / 1024 / 1024:,.1f} / "
+        f"{store_metrics['budget_bytes'] / 1024 / 1024:,.0f} MB resident, "
+        f"{store_metrics['spilled_bytes'] / 1024 / 1024:,.1f} MB spilled "
+        f"({store_metrics['sessions']} sessions)"
+    )
+
+    if st.session_state.submission_ids:
+        st.markdown("### 📤 Submissions")
+        render_submissions()
 
-    if st.session_state.columns_info:
-        st.write(f"Total Columns: {len(st.session_state.columns_info)}")
+    # Process-wide caches (shared by all sessions)
+    st.markdown("### 🗄️ Caches")
+    stats = cache_stats()
+    st.write(
+        f"Listings: {stats['listings']['entries']} cached "
+        f"({stats['listings']['hits']} hits / {stats['listings']['misses']} misses)"
+    )
+    st.write(
+        f"Parsed previews: {stats['previews']['entries']} cached "
+        f"({stats['previews']['hits']} hits / {stats['previews']['misses']} misses)"
+    )
+    if st.button("🔄 Refresh folder listings"):
+        invalidate_listings()
+        st.success("Folder listings will be reloaded")
+    if st.button("🧹 Clear parsed previews"):
+        invalidate_previews()
+        st.success("In-memory parsed previews cleared")
+    if st.button("🔌 Reconnect SharePoint"):
+        reset_sharepoint_clients()
+        st.success("SharePoint connection reset")
     
     # ✅ TAMBAHAN: Show selected key columns
     if st.session_state.user_input.get('key_columns'):
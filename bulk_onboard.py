@@ -0,0 +1,97 @@
+# bulk_onboard.py
+"""
+Headless bulk onboarding: profile every matching file in a SharePoint folder and
+generate ExcelConfig rows (suggested types + key column) without the Streamlit wizard.
+
+    # 1. Profile and write a review file
+    python bulk_onboard.py --folder "Fabric_Excel_Files/Finance" --pattern ".*\\.xlsx" \\
+        --target-dest SILVER_LH_P_FINANCE_DEV --pic "Jono Sudibyo" --output review.csv
+
+    # 2. After checking / editing review.csv, append all rows in one batch
+    python bulk_onboard.py --submit-review review.csv
+
+    # Or profile and append directly
+    python bulk_onboard.py --folder ... --pattern ... --pic ... --submit
+"""
+import argparse
+import sys
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk onboarding of SharePoint files into ExcelConfig")
+    parser.add_argument('--folder', help="SharePoint folder path (subfolders included)")
+    parser.add_argument('--pattern', default=r'.*', help="Regex the whole file name must match (default: all)")
+    parser.add_argument('--target-dest', default='SILVER_LH_MCUADMIN_MCU_ADMIN-SILVER')
+    parser.add_argument('--target-schema', default='dbo')
+    parser.add_argument('--pic', default='', help="Configurator name (LastModifiedBy / DataOwner)")
+    parser.add_argument('--sp-url', default='NULL')
+    parser.add_argument('--header-row', type=int, default=0, help="0-based header row")
+    parser.add_argument('--delimiter', default=',', choices=[',', ';', '\\tab', '|'], help="CSV delimiter")
+    parser.add_argument('--min-confidence', type=float, default=0.8, help="Minimum confidence to apply a suggested type")
+    parser.add_argument('--exact-profile', action='store_true', help="Exact unique counts (slower)")
+    parser.add_argument('--include-existing', action='store_true', help="Also profile files already in ExcelConfig")
+    parser.add_argument('--workers', type=int, default=4, help="Files profiled concurrently")
+    parser.add_argument('--output', help="Review file (.csv editable + submittable, .json full results)")
+    parser.add_argument('--submit', action='store_true', help="Append generated rows to ExcelConfig in one batch")
+    parser.add_argument('--submit-review', metavar='CSV', help="Append the rows of a reviewed .csv file")
+    args = parser.parse_args(argv)
+    if not args.submit_review and not args.folder:
+        parser.error("--folder is required (or --submit-review)")
+    if args.folder and not (args.output or args.submit):
+        parser.error("use --output and/or --submit")
+    return args
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+
+    from services.config import SITE_ID, DRIVE_ID, PARSE_IN_SUBPROCESS, validate_config
+    from services.bulk_onboarding import onboard_folder, write_review_file, read_review_file, submit_rows
+    from services.excel_config import get_config_id_allocator
+    from services.config_registry import get_config_registry
+
+    validate_config()
+    registry = get_config_registry()
+
+    if args.submit_review:
+        rows = read_review_file(args.submit_review)
+        config_ids = submit_rows(rows, get_config_id_allocator(), registry)
+        for row, config_id in zip(rows, config_ids):
+            print(f"  {config_id}: {row['FileName']} -> {row['TableName']}")
+        return 0
+
+    from services.service_cache import get_sharepoint_service
+    from services.parse_executor import get_parse_executor
+
+    options = {
+        'target_dest': args.target_dest,
+        'target_schema': args.target_schema,
+        'pic_name': args.pic,
+        'sp_url': args.sp_url,
+        'header_row': args.header_row,
+        'delimiter': args.delimiter,
+        'min_confidence': args.min_confidence,
+        'approximate': not args.exact_profile,
+        'include_existing': args.include_existing,
+    }
+    results = onboard_folder(
+        get_sharepoint_service(SITE_ID, DRIVE_ID), args.folder, args.pattern, options,
+        max_workers=args.workers, registry=registry,
+        parse_executor=get_parse_executor() if PARSE_IN_SUBPROCESS else None
+    )
+
+    counts = {status: sum(r['status'] == status for r in results) for status in ('ok', 'skipped', 'failed')}
+    print(f"📋 {counts['ok']} config(s) generated, {counts['skipped']} skipped, {counts['failed']} failed")
+
+    if args.output:
+        write_review_file(results, args.output)
+        print(f"💾 Review file written: {args.output}")
+    if args.submit:
+        rows = [r['row'] for r in results if r['status'] == 'ok']
+        if rows:
+            submit_rows(rows, get_config_id_allocator(), registry)
+    return 1 if counts['failed'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
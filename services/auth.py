@@ -1,18 +1,19 @@
-import requests
-from services.config import TENANT_ID, CLIENT_ID, CLIENT_SECRET, GRAPH_SCOPE
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
-import json
-import os
+from services.config import TENANT_ID, CLIENT_ID, CLIENT_SECRET, GRAPH_SCOPE, get_token_data
+import time
+import threading
 
 class AuthService:
+    # Refresh tokens this many seconds before they expire
+    TOKEN_EXPIRY_MARGIN = 300
+
     def __init__(self):
         self.graph_token = None
+        self.graph_token_expires_at = 0
         self.fabric_token = None
+        self._lock = threading.Lock()
     
-    def get_token(self, scope):
-        """Get Azure AD access token"""
+    def _request_token(self, scope):
+        """Token endpoint response (access_token, expires_in)"""
         token_url = f"https://login.microsoftonline.com/{TENANT_ID}/oauth2/v2.0/token"
         token_data = {
             "client_id": CLIENT_ID,
@@ -21,21 +22,34 @@ class AuthService:
             "scope": scope,
         }
         
+        import requests
+
         try:
             response = requests.post(token_url, data=token_data, timeout=30)
             response.raise_for_status()
-            return response.json()["access_token"]
+            return response.json()
         except Exception as e:
             raise Exception(f"Failed to get token: {e}")
     
+    def get_token(self, scope):
+        """Get Azure AD access token"""
+        return self._request_token(scope)["access_token"]
+    
     def get_graph_token(self):
-        """Get Microsoft Graph token"""
-        if not self.graph_token:
-            self.graph_token = self.get_token(GRAPH_SCOPE)
-        return self.graph_token
+        """Get Microsoft Graph token (shared by all sessions, renewed shortly before expiry)"""
+        with self._lock:
+            if not self.graph_token or time.time() >= self.graph_token_expires_at:
+                token = self._request_token(GRAPH_SCOPE)
+                self.graph_token = token["access_token"]
+                self.graph_token_expires_at = time.time() + int(token.get("expires_in", 3600)) - self.TOKEN_EXPIRY_MARGIN
+            return self.graph_token
     
     def get_credentials(self):
-        token_data = json.loads(os.getenv('GOOGLE_TOKEN'))
+        # Google client libraries are only loaded when a Sheets call needs credentials
+        from google.auth.transport.requests import Request
+        from google.oauth2.credentials import Credentials
+
+        token_data = get_token_data()
         creds = Credentials(
             token=token_data['token'],
             refresh_token=token_data['refresh_token'],
@@ -58,6 +72,7 @@ class AuthService:
     def refresh(self):
         """Refresh all tokens"""
         self.graph_token = None
+        self.graph_token_expires_at = 0
         # self.fabric_token = None
 
 auth = AuthService()
\ No newline at end of file
@@ -0,0 +1,217 @@
+# services/bulk_onboarding.py
+import os
+import re
+import csv
+import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List
+from services.excel_config import build_excel_config_row
+from services.validation import rank_key_candidates, validate_type_mapping
+
+SUPPORTED_EXTENSIONS = ('.xlsx', '.xls', '.csv')
+
+# Step 1 delimiter -> CSVDelimiter name (same mapping as services.fetch_pipeline)
+DELIMITER_NAMES = {',': 'comma', ';': 'semicolon', '\\tab': 'tab', '|': 'pipe'}
+
+
+def table_name_for(file_name: str) -> str:
+    """'Sales Report 2024.xlsx' -> 'Excel_Sales_Report_2024'"""
+    stem = os.path.splitext(file_name)[0]
+    return 'Excel_' + re.sub(r'[^0-9A-Za-z]+', '_', stem).strip('_')
+
+
+def match_files(files: List[Dict], pattern: str) -> List[Dict]:
+    """Supported files whose name fully matches the regex pattern (like Step 1 FilePattern)"""
+    return [
+        f for f in files
+        if re.fullmatch(pattern, f['name']) and f['name'].lower().endswith(SUPPORTED_EXTENSIONS)
+    ]
+
+
+def profile_file(sp_service, file_meta: Dict, header_row: int = 0, delimiter: str = ',',
+                 approximate: bool = True, parse_executor=None) -> Dict:
+    """
+    Download + parse (first sheet) + profile one file.
+    Returns {'columns_info', 'total_rows', 'df'} (df: parsed file, for full-file validation)
+    """
+    from services.raw_grid import load_raw_grid
+    from services.preprocessing import extract_columns_metadata
+
+    file_bytes = sp_service.download_file(file_meta['download_url'])
+    grid = load_raw_grid(
+        file_bytes=file_bytes,
+        file_name=file_meta['name'],
+        csv_delimiter=DELIMITER_NAMES.get(delimiter, 'comma'),
+        executor=parse_executor
+    )
+    df = grid.with_header(header_row)
+    return {
+        'columns_info': extract_columns_metadata(df, approximate=approximate),
+        'total_rows': len(df),
+        'df': df,
+    }
+
+
+def suggest_config(file_meta: Dict, profile: Dict, folder_path: str, options: Dict) -> Dict:
+    """
+    ExcelConfig row for a profiled file with Step 2 defaults filled in automatically:
+    suggested types above min_confidence, a key column only if one is unique and non-null.
+    Suggested types are trial-cast over the whole file (profile['df']) like Step 3 does,
+    columns with failing values stay Default (noted for the review file).
+    Returns {'row': dict (sheet column order), 'notes': [str]}
+    """
+    columns_info = profile['columns_info']
+    notes = []
+
+    type_mapping = {}
+    for col, info in columns_info.items():
+        suggested_type = info.get('suggested_type', 'Default')
+        if suggested_type == 'Default':
+            continue
+        if info.get('suggestion_confidence', 0) >= options['min_confidence']:
+            type_mapping[col] = suggested_type
+        else:
+            notes.append(f"{col}: low confidence {suggested_type} ({info.get('suggestion_confidence', 0):.0%})")
+
+    # No Step 3 validation headless: never submit a type the full file does not cast to
+    if profile.get('df') is not None:
+        for col, result in validate_type_mapping(profile['df'], type_mapping).items():
+            if not result['ok']:
+                type_mapping.pop(col, None)
+                example = result['examples'][0]['value'] if result['examples'] else ''
+                notes.append(f"{col}: {result['failed_count']:,} value(s) fail {result['target_type']} "
+                             f"(e.g. {example!r}), kept Default")
+
+    key_columns = []
+    candidates = rank_key_candidates(columns_info, profile['total_rows'], limit=1)
+    if candidates and candidates[0]['uniqueness_ratio'] >= 1.0 and not candidates[0]['null_count']:
+        key_columns = [candidates[0]['column']]
+        if candidates[0]['is_approx']:
+            notes.append(f"key {candidates[0]['column']}: uniqueness is approximate, check before Delete-Insert")
+    else:
+        notes.append("no unique key column, using full load")
+
+    is_csv = file_meta['name'].lower().endswith('.csv')
+    user_input = {
+        'type_mapping': type_mapping,
+        'key_columns': key_columns,
+        'excluded_columns': [],
+        'excluded_row_indices': [],
+        'ingestion_method': 'Delete-Insert' if key_columns else 'Truncate-Insert / Full Load',
+        'dest_config': {
+            'target_dest': options['target_dest'],
+            'target_schema': options['target_schema'],
+            'table_name': table_name_for(file_meta['name']),
+            'pic_name': options['pic_name'],
+        },
+    }
+    form_values = {
+        'file_name': file_meta['name'],
+        'sp_url': options.get('sp_url') or 'NULL',
+        'folder_path': folder_path if not file_meta.get('folder_name') else f"{folder_path}/{file_meta['folder_name']}",
+        'sheet_name': 'NULL',
+        'delimiter': options['delimiter'] if is_csv else None,
+        'header_row': options['header_row'],
+    }
+    row = build_excel_config_row(user_input, form_values, list(columns_info.keys()))
+    return {'row': row, 'notes': notes}
+
+
+def onboard_folder(sp_service, folder_path: str, pattern: str, options: Dict,
+                   max_workers: int = 4, registry=None, parse_executor=None) -> List[Dict]:
+    """
+    Profile all files matching pattern under folder_path concurrently and suggest a config
+    for each. Files already in the registry (same FileName / FilePattern) are skipped
+    unless options['include_existing'].
+
+    Returns [{'file': name, 'status': 'ok' / 'skipped' / 'failed', 'row', 'notes', 'error'}]
+    """
+    files = match_files(sp_service.list_files(folder_path), pattern)
+    print(f"📂 {len(files)} file(s) matched {pattern!r} in {folder_path}")
+
+    results = []
+    todo = []
+    for file_meta in files:
+        existing = registry.find_by_file(file_meta['name']) if registry is not None else []
+        if existing and not options.get('include_existing'):
+            ids = ", ".join(str(c.get('ExcelConfigId')) for c in existing)
+            results.append({'file': file_meta['name'], 'status': 'skipped', 'notes': [f"already configured ({ids})"]})
+        else:
+            todo.append(file_meta)
+
+    def run(file_meta):
+        profile = profile_file(
+            sp_service, file_meta, header_row=options['header_row'], delimiter=options['delimiter'],
+            approximate=options.get('approximate', True), parse_executor=parse_executor
+        )
+        return suggest_config(file_meta, profile, folder_path, options)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(run, file_meta): file_meta for file_meta in todo}
+        for i, future in enumerate(as_completed(futures), start=1):
+            name = futures[future]['name']
+            try:
+                suggestion = future.result()
+                results.append({'file': name, 'status': 'ok', **suggestion})
+                print(f"  [{i}/{len(todo)}] ✅ {name} -> {suggestion['row']['TableName']}")
+            except Exception as e:
+                results.append({'file': name, 'status': 'failed', 'error': str(e)})
+                print(f"  [{i}/{len(todo)}] ❌ {name}: {e}")
+
+    # Two files mapping to the same table name need a manual decision
+    table_names = [r['row']['TableName'] for r in results if r['status'] == 'ok']
+    for r in results:
+        if r['status'] != 'ok':
+            continue
+        table_name = r['row']['TableName']
+        if table_names.count(table_name) > 1:
+            r['notes'].append(f"table name {table_name} generated for several files")
+        elif registry is not None and registry.find_by_table(table_name):
+            r['notes'].append(f"table name {table_name} already configured")
+    return sorted(results, key=lambda r: r['file'])
+
+
+def write_review_file(results: List[Dict], path: str):
+    """
+    .csv: one ExcelConfig row per profiled file (+ Notes column), editable and
+    submittable with read_review_file; .json: full results incl. skipped / failed files
+    """
+    if path.lower().endswith('.json'):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, default=str)
+        return
+
+    rows = [r for r in results if r['status'] == 'ok']
+    if not rows:
+        print("  ⚠ No configs to write")
+        return
+    fieldnames = list(rows[0]['row'].keys()) + ['Notes']
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        for r in rows:
+            writer.writerow({**r['row'], 'Notes': '; '.join(r['notes'])})
+
+
+def read_review_file(path: str) -> List[Dict]:
+    """ExcelConfig rows from a (reviewed) .csv review file, Notes column dropped"""
+    with open(path, newline='', encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    for row in rows:
+        row.pop('Notes', None)
+    return rows
+
+
+def submit_rows(rows: List[Dict], allocator, registry=None) -> List[int]:
+    """Append all rows to the ExcelConfig sheet in one batch, returns the allocated IDs"""
+    values = [list(row.values()) for row in rows]
+    config_ids, updated_range = allocator.append_rows(values)
+    print(f"✅ Berhasil append {len(config_ids)} config(s)! Range: {updated_range}")
+    if registry is not None:
+        try:
+            registry.record_appended(
+                updated_range, [[config_id] + row[1:] for config_id, row in zip(config_ids, values)]
+            )
+        except Exception as e:
+            print(f"  ⚠ Config registry update failed: {e}")
+    return config_ids
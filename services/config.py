@@ -1,6 +1,8 @@
 import os
+import tempfile
 from dotenv import load_dotenv
 import json
+from functools import lru_cache
 
 load_dotenv()
 
@@ -24,14 +26,79 @@ FABRIC_API_URL = "https://api.fabric.microsoft.com/v1"
 WIP_ID = os.getenv('WIP_ID')
 EXCEL_CONFIG_GID = os.getenv('EXCEL_CONFIG_GID')
 SHEET_NAME = os.getenv('SHEET_NAME')
+# Lock file serialising ExcelConfigId allocation between app processes on this host
+EXCEL_CONFIG_LOCK_PATH = os.getenv('EXCEL_CONFIG_LOCK_PATH') or os.path.join(tempfile.gettempdir(), 'excel_config_id.lock')
+# Local SQLite mirror of the ExcelConfig sheet (incremental sync, full resync every N minutes)
+CONFIG_REGISTRY_PATH = os.getenv('CONFIG_REGISTRY_PATH') or os.path.join(tempfile.gettempdir(), 'excel_config_registry.sqlite')
+CONFIG_REGISTRY_SYNC_SECONDS = int(os.getenv('CONFIG_REGISTRY_SYNC_SECONDS', '60'))
+CONFIG_REGISTRY_FULL_SYNC_MINUTES = int(os.getenv('CONFIG_REGISTRY_FULL_SYNC_MINUTES', '30'))
+# Outbox for ExcelConfig appends (batched, retried with backoff on quota / server errors)
+# Pending rows must survive a reboot: default under the home directory, not the temp dir
+SUBMISSION_QUEUE_PATH = os.getenv('SUBMISSION_QUEUE_PATH') or os.path.join(
+    os.path.expanduser('~'), '.excel_ingestion', 'excel_config_outbox.sqlite'
+)
+SUBMISSION_BATCH_SIZE = int(os.getenv('SUBMISSION_BATCH_SIZE', '50'))
+SUBMISSION_MAX_ATTEMPTS = int(os.getenv('SUBMISSION_MAX_ATTEMPTS', '8'))
+SUBMISSION_FLUSH_SECONDS = float(os.getenv('SUBMISSION_FLUSH_SECONDS', '2'))
+
+# Profile cache (columns_info + preview per file version)
+PROFILE_CACHE_DIR = os.getenv('PROFILE_CACHE_DIR') or os.path.join(tempfile.gettempdir(), 'excel_ingestion_profile_cache')
+PROFILE_CACHE_MAX_MB = int(os.getenv('PROFILE_CACHE_MAX_MB', '512'))
+
+# Parallel profiling / validation workers (column sharding, empty = cpu count, max 8)
+PROFILE_WORKERS = int(os.getenv('PROFILE_WORKERS') or min(8, os.cpu_count() or 1))
+
+# Preview sample (head + tail + reservoir from across the whole file)
+PREVIEW_SAMPLE_ROWS = int(os.getenv('PREVIEW_SAMPLE_ROWS', '100'))
+
+# Isolated parse workers (memory / wall-clock limit per parse, 0 = no limit)
+PARSE_IN_SUBPROCESS = os.getenv('PARSE_IN_SUBPROCESS', 'true').lower() in ('1', 'true', 'yes')
+PARSE_WORKERS = int(os.getenv('PARSE_WORKERS', '2'))
+PARSE_MEMORY_LIMIT_MB = int(os.getenv('PARSE_MEMORY_LIMIT_MB', '4096'))
+PARSE_TIMEOUT_SECONDS = int(os.getenv('PARSE_TIMEOUT_SECONDS', '300'))
+
+# Process-wide session data store (preview / columns_info / raw grid per session)
+SESSION_STORE_BUDGET_MB = int(os.getenv('SESSION_STORE_BUDGET_MB', '1024'))
+# Parent dir of the per-process private spill dir (must be ours / not writable by others, or sticky like /tmp)
+SESSION_STORE_SPILL_DIR = os.getenv('SESSION_STORE_SPILL_DIR') or tempfile.gettempdir()
+SESSION_IDLE_MINUTES = int(os.getenv('SESSION_IDLE_MINUTES', '120'))
+
+# Process caches shared by all sessions (folder listings carry expiring download URLs)
+LISTING_CACHE_TTL_SECONDS = int(os.getenv('LISTING_CACHE_TTL_SECONDS', '120'))
+PREVIEW_CACHE_TTL_SECONDS = int(os.getenv('PREVIEW_CACHE_TTL_SECONDS', '3600'))
+
+# Background jobs (fetch pipeline) shared by all sessions
+FETCH_JOB_WORKERS = int(os.getenv('FETCH_JOB_WORKERS', '4'))
+
+# HTTP API (api/server.py): concurrent requests, blocking-call workers, wait for a slot before 429
+API_MAX_CONCURRENT = int(os.getenv('API_MAX_CONCURRENT', '8'))
+API_WORKERS = int(os.getenv('API_WORKERS', '4'))
+API_QUEUE_TIMEOUT_SECONDS = int(os.getenv('API_QUEUE_TIMEOUT_SECONDS', '10'))
+# Required by every HTTP API endpoint except /health (X-API-Key header), unset = API refuses requests
+API_KEY = os.getenv('API_KEY')
 
 # API Scopes
 GRAPH_SCOPE = "https://graph.microsoft.com/.default"
 # FABRIC_SCOPE = "https://analysis.windows.net/powerbi/api/.default"
-TOKEN_DATA = json.loads(os.getenv('GOOGLE_TOKEN'))
 SPREADSHEET_SCOPE = ['https://www.googleapis.com/auth/spreadsheets']
 
 
+@lru_cache(maxsize=1)
+def get_token_data() -> dict:
+    """Google OAuth token from GOOGLE_TOKEN, parsed on first use (only Sheets calls need it)"""
+    raw = os.getenv('GOOGLE_TOKEN')
+    if not raw:
+        raise ValueError("Missing required config: GOOGLE_TOKEN")
+    return json.loads(raw)
+
+
+def __getattr__(name):
+    # TOKEN_DATA kept as a lazy module attribute for existing imports
+    if name == 'TOKEN_DATA':
+        return get_token_data()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 def validate_config():
     """Validate all required config"""
     missing = [name for name, val in [
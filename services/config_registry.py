@@ -0,0 +1,210 @@
+# services/config_registry.py
+import os
+import json
+import time
+import sqlite3
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Dict, List, Optional
+from services.excel_config import FIRST_DATA_ROW, build_excel_config_row, _parse_id
+
+# Sheet columns mirrored into indexed SQLite columns
+INDEXED_COLUMNS = {
+    'ExcelConfigId': 'excel_config_id',
+    'FileName': 'file_name',
+    'FilePattern': 'file_pattern',
+    'TableName': 'table_name',
+    'LastModifiedDate': 'last_modified',
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS excel_config (
+    row_number INTEGER PRIMARY KEY,
+    excel_config_id INTEGER,
+    file_name TEXT,
+    file_pattern TEXT,
+    table_name TEXT,
+    last_modified TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_excel_config_id ON excel_config (excel_config_id);
+CREATE INDEX IF NOT EXISTS ix_excel_config_file_name ON excel_config (file_name COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS ix_excel_config_file_pattern ON excel_config (file_pattern COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS ix_excel_config_table_name ON excel_config (table_name COLLATE NOCASE);
+CREATE TABLE IF NOT EXISTS sync_state (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+class ConfigRegistry:
+    """
+    Local SQLite mirror of the ExcelConfig sheet for lookups that used to download the
+    whole sheet (duplicate table names, previous config of a file, max ID).
+
+    Sync is incremental by row count: only rows appended since the last sync are read.
+    Rows edited in place in the sheet are picked up by a full resync every
+    full_sync_seconds. sync() is throttled to once per min_interval seconds.
+    backend: SheetsConfigBackend / InMemoryConfigBackend (services.excel_config).
+    """
+
+    def __init__(self, backend, db_path: str, min_interval: float = 60, full_sync_seconds: float = 1800):
+        self.backend = backend
+        self.db_path = db_path
+        self.min_interval = min_interval
+        self.full_sync_seconds = full_sync_seconds
+        self._sync_lock = threading.Lock()
+        self._last_sync = 0.0
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        with self._db() as conn:
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _db(self):
+        """One connection per call (lookups come from many Streamlit threads), committed on exit"""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            conn.execute('PRAGMA journal_mode=WAL')
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _get_state(self, conn: sqlite3.Connection, key: str, default=None):
+        row = conn.execute('SELECT value FROM sync_state WHERE key = ?', (key,)).fetchone()
+        return json.loads(row['value']) if row else default
+
+    @staticmethod
+    def _set_state(conn: sqlite3.Connection, key: str, value):
+        conn.execute('INSERT OR REPLACE INTO sync_state (key, value) VALUES (?, ?)', (key, json.dumps(value)))
+
+    def _header(self, conn: sqlite3.Connection) -> List[str]:
+        header = self._get_state(conn, 'header')
+        if not header:
+            rows = self.backend.read_rows(1, 1)
+            header = [str(h) for h in rows[0]] if rows else list(build_excel_config_row({}, {}, []).keys())
+            self._set_state(conn, 'header', header)
+        return header
+
+    @staticmethod
+    def _record(header: List[str], row_number: int, values: List) -> tuple:
+        data = {name: (values[i] if i < len(values) else None) for i, name in enumerate(header)}
+        indexed = {column: data.get(name) for name, column in INDEXED_COLUMNS.items()}
+        return (
+            row_number,
+            _parse_id(indexed['excel_config_id']),
+            None if indexed['file_name'] is None else str(indexed['file_name']),
+            None if indexed['file_pattern'] is None else str(indexed['file_pattern']),
+            None if indexed['table_name'] is None else str(indexed['table_name']),
+            None if indexed['last_modified'] is None else str(indexed['last_modified']),
+            json.dumps(data, default=str),
+        )
+
+    def _store(self, conn: sqlite3.Connection, header: List[str], first_row: int, rows: List[List]):
+        conn.executemany(
+            'INSERT OR REPLACE INTO excel_config VALUES (?, ?, ?, ?, ?, ?, ?)',
+            [self._record(header, first_row + i, values) for i, values in enumerate(rows)]
+        )
+
+    def sync(self, force: bool = False, full: bool = False) -> int:
+        """Pull new rows from the sheet (all rows if full / resync due), returns rows read"""
+        with self._sync_lock:
+            now = time.time()
+            if not force and not full and now - self._last_sync < self.min_interval:
+                return 0
+            with self._db() as conn:
+                synced_rows = self._get_state(conn, 'synced_rows', 0)
+                full = full or now - self._get_state(conn, 'full_synced_at', 0) >= self.full_sync_seconds
+                if full:
+                    conn.execute('DELETE FROM sync_state WHERE key = ?', ('header',))
+                    header = self._header(conn)
+                    rows = self.backend.read_rows(FIRST_DATA_ROW)
+                    conn.execute('DELETE FROM excel_config')
+                    self._store(conn, header, FIRST_DATA_ROW, rows)
+                    synced_rows = len(rows)
+                    self._set_state(conn, 'full_synced_at', now)
+                else:
+                    header = self._header(conn)
+                    rows = self.backend.read_rows(FIRST_DATA_ROW + synced_rows)
+                    self._store(conn, header, FIRST_DATA_ROW + synced_rows, rows)
+                    synced_rows += len(rows)
+                self._set_state(conn, 'synced_rows', synced_rows)
+            self._last_sync = now
+            if rows or full:
+                print(f"  ✓ Config registry synced ({'full' if full else 'incremental'}, {len(rows)} rows read)")
+            return len(rows)
+
+    def record_appended(self, updated_range: str, rows: List[List]):
+        """Mirror rows this process just appended (no sheet read needed)"""
+        from services.excel_config import ConfigIdAllocator
+
+        first_row = ConfigIdAllocator._appended_row(updated_range)
+        with self._sync_lock, self._db() as conn:
+            synced_rows = self._get_state(conn, 'synced_rows', 0)
+            # Only extend the watermark when there is no gap (rows from other hosts)
+            if first_row != FIRST_DATA_ROW + synced_rows:
+                return
+            self._store(conn, self._header(conn), first_row, rows)
+            self._set_state(conn, 'synced_rows', synced_rows + len(rows))
+
+    @staticmethod
+    def _rows(cursor) -> List[Dict]:
+        return [json.loads(r['data']) for r in cursor.fetchall()]
+
+    def find_by_id(self, config_id: int) -> Optional[Dict]:
+        self.sync()
+        with self._db() as conn:
+            rows = self._rows(conn.execute(
+                'SELECT data FROM excel_config WHERE excel_config_id = ?', (int(config_id),)
+            ))
+        return rows[0] if rows else None
+
+    def find_by_file(self, file_name: str) -> List[Dict]:
+        """Configs whose FileName or FilePattern equals file_name (case-insensitive), newest first"""
+        self.sync()
+        with self._db() as conn:
+            return self._rows(conn.execute(
+                'SELECT data FROM excel_config '
+                'WHERE file_name = ? COLLATE NOCASE OR file_pattern = ? COLLATE NOCASE '
+                'ORDER BY row_number DESC', (file_name, file_name)
+            ))
+
+    def find_by_table(self, table_name: str) -> List[Dict]:
+        """Configs writing to table_name (case-insensitive)"""
+        self.sync()
+        with self._db() as conn:
+            return self._rows(conn.execute(
+                'SELECT data FROM excel_config WHERE table_name = ? COLLATE NOCASE '
+                'ORDER BY row_number DESC', (table_name,)
+            ))
+
+    def max_id(self) -> int:
+        self.sync()
+        with self._db() as conn:
+            row = conn.execute('SELECT MAX(excel_config_id) AS max_id FROM excel_config').fetchone()
+        return row['max_id'] or 0
+
+    def stats(self) -> Dict:
+        with self._db() as conn:
+            rows = conn.execute('SELECT COUNT(*) AS n FROM excel_config').fetchone()['n']
+            full_synced_at = self._get_state(conn, 'full_synced_at', 0)
+        return {'rows': rows, 'last_sync': self._last_sync, 'full_synced_at': full_synced_at}
+
+
+@lru_cache(maxsize=1)
+def get_config_registry() -> ConfigRegistry:
+    """Process-wide registry over the ExcelConfig sheet"""
+    from services.config import (
+        WIP_ID, SHEET_NAME, CONFIG_REGISTRY_PATH, CONFIG_REGISTRY_SYNC_SECONDS, CONFIG_REGISTRY_FULL_SYNC_MINUTES
+    )
+    from services.excel_config import SheetsConfigBackend
+
+    return ConfigRegistry(
+        SheetsConfigBackend(WIP_ID, SHEET_NAME),
+        db_path=CONFIG_REGISTRY_PATH,
+        min_interval=CONFIG_REGISTRY_SYNC_SECONDS,
+        full_sync_seconds=CONFIG_REGISTRY_FULL_SYNC_MINUTES * 60
+    )
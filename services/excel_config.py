@@ -0,0 +1,317 @@
+# services/excel_config.py
+import re
+import json
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: only the in-process lock applies
+    fcntl = None
+
+# Column A of the ExcelConfig sheet, row 1 = header
+ID_COLUMN = 'A'
+FIRST_DATA_ROW = 2
+
+
+def build_excel_config_row(user_input: Dict, form_values: Dict, df_columns: List[str],
+                           config_id: Optional[int] = None, now: Optional[datetime] = None) -> Dict:
+    """
+    ExcelConfig values for one submission, in sheet column order (list(row.values()) is
+    the row to append). ExcelConfigId is filled in by ConfigIdAllocator.append_row.
+    """
+    dest_config = user_input.get('dest_config', {})
+
+    type_mapping = user_input.get('type_mapping', {})
+    key_columns = user_input.get('key_columns', [])
+    excluded_columns = user_input.get('excluded_columns', [])
+    rows_to_delete = user_input.get('excluded_row_indices', [])
+
+    file_name = form_values.get('file_name', '')
+    need_backup = form_values.get('need_backup', False)
+    header_row = form_values.get('header_row', 0)
+
+    # Excluded columns as 1-based positions in the source file
+    excluded_indices = [str(df_columns.index(col) + 1) for col in excluded_columns if col in df_columns]
+
+    target_dest = dest_config.get('target_dest', '')
+    pic_name = dest_config.get('pic_name', '')
+
+    ingestion_method_raw = user_input.get('ingestion_method', 'Full-Load')
+    ingestion_mode = 'Full-Load' if 'Full-Load' in ingestion_method_raw or 'Full Load' in ingestion_method_raw else ingestion_method_raw
+
+    now = now or datetime.now()
+
+    return {
+        'ExcelConfigId': config_id,
+        'FwkTriggerId': 9999,
+        'SchemaName': dest_config.get('target_schema', 'NULL'),
+        'FileName': file_name,
+        'FilePattern': file_name,
+        'URL': form_values.get('sp_url', 'NULL'),
+        'FolderPath': form_values.get('folder_path', 'NULL'),
+        'TableName': dest_config.get('table_name', 'NULL'),
+        'SheetName': form_values.get('sheet_name', 'NULL'),
+        'DataflowId': user_input.get('dataflow_id', 'NULL'),
+        'DataflowWorkspaceId': user_input.get('dataflow_workspace_id', 'NULL'),
+        'KeyColumnsList': ', '.join(key_columns) if key_columns else 'NULL',
+        'ColumnsExcludeMap': ', '.join(excluded_indices) if excluded_indices else 'NULL',
+        'ColumnType': json.dumps(type_mapping) if type_mapping else 'NULL',
+        'Actions': 8,
+        'HeaderRowsToDelete': header_row + 1,
+        'RowsToDelete': ', '.join(str(r) for r in rows_to_delete) if rows_to_delete else 'NULL',
+        'FwkTargetId': 200 if target_dest == 'SILVER_LH_P_FINANCE_DEV' else 101010,
+        'IngestionMode': ingestion_mode,
+        'NeedBackup': 'Y' if need_backup else 'N',
+        'BackupFolderPath': form_values.get('backup_path', '') if need_backup else 'NULL',
+        'FlexibleSchema': 'N',
+        'IsStaging': 'N',
+        'IsActive': 'Y',
+        'ExpectedEmpty': 'N',
+        'CSVDelimiter': form_values.get('delimiter') or 'NULL',
+        'LastModifiedDate': f"{now.month}/{now.day}/{now.year} {now.strftime('%H:%M:%S')}",
+        'LastModifiedBy': pic_name,
+        'DataOwner': pic_name,
+        'Schedule': json.dumps(user_input['schedule']) if user_input.get('schedule') else 'NULL',
+    }
+
+
+def _parse_id(value) -> Optional[int]:
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+class SheetsConfigBackend:
+    """Google Sheets access to the ExcelConfig sheet (ranges in A1 notation)"""
+
+    def __init__(self, spreadsheet_id: str, sheet_name: str, credentials=None):
+        self.spreadsheet_id = spreadsheet_id
+        self.sheet_name = sheet_name
+        self._credentials = credentials
+        self._service = None
+
+    @property
+    def values(self):
+        if self._service is None:
+            from googleapiclient.discovery import build
+            from services.auth import auth
+
+            creds = self._credentials or auth.get_credentials()
+            self._service = build('sheets', 'v4', credentials=creds, cache_discovery=False)
+        return self._service.spreadsheets().values()
+
+    def read_column(self, column: str, start_row: int) -> List:
+        """Cell values of one column from start_row (1-based) to the last row"""
+        try:
+            result = self.values.get(
+                spreadsheetId=self.spreadsheet_id,
+                range=f"{self.sheet_name}!{column}{start_row}:{column}",
+                valueRenderOption='UNFORMATTED_VALUE'
+            ).execute()
+        except Exception as e:
+            # start_row past the last grid row = nothing new
+            if 'exceeds grid limits' in str(e):
+                return []
+            raise
+        return [row[0] if row else None for row in result.get('values', [])]
+
+    def read_rows(self, start_row: int, end_row: Optional[int] = None) -> List[List]:
+        """Whole rows from start_row (1-based) to end_row / the last row"""
+        try:
+            result = self.values.get(
+                spreadsheetId=self.spreadsheet_id,
+                range=f"{self.sheet_name}!A{start_row}:ZZ{end_row or ''}",
+                valueRenderOption='UNFORMATTED_VALUE'
+            ).execute()
+        except Exception as e:
+            if 'exceeds grid limits' in str(e):
+                return []
+            raise
+        return result.get('values', [])
+
+    def append_rows(self, rows: List[List]) -> str:
+        """Append rows after the last row, returns the updated A1 range"""
+        result = self.values.append(
+            spreadsheetId=self.spreadsheet_id,
+            range=f'{self.sheet_name}!A1',
+            valueInputOption='USER_ENTERED',
+            insertDataOption='INSERT_ROWS',
+            body={'values': rows}
+        ).execute()
+        return result['updates']['updatedRange']
+
+    def update_cell(self, column: str, row: int, value):
+        self.values.update(
+            spreadsheetId=self.spreadsheet_id,
+            range=f"{self.sheet_name}!{column}{row}",
+            valueInputOption='USER_ENTERED',
+            body={'values': [[value]]}
+        ).execute()
+
+
+class InMemoryConfigBackend:
+    """
+    Same interface as SheetsConfigBackend over a list of rows (row 1 = header),
+    for local runs and checks without Google credentials
+    """
+
+    def __init__(self, rows: Optional[List[List]] = None, sheet_name: str = 'ExcelConfig'):
+        self.sheet_name = sheet_name
+        self.rows = [list(row) for row in (rows or [])]
+        self._lock = threading.Lock()
+
+    def read_column(self, column: str, start_row: int) -> List:
+        index = ord(column) - ord('A')
+        with self._lock:
+            return [row[index] if len(row) > index else None for row in self.rows[start_row - 1:]]
+
+    def read_rows(self, start_row: int, end_row: Optional[int] = None) -> List[List]:
+        with self._lock:
+            return [list(row) for row in self.rows[start_row - 1:end_row]]
+
+    def append_rows(self, rows: List[List]) -> str:
+        with self._lock:
+            first = len(self.rows) + 1
+            self.rows.extend(list(row) for row in rows)
+            last = len(self.rows)
+        return f"{self.sheet_name}!A{first}:A{last}"
+
+    def update_cell(self, column: str, row: int, value):
+        with self._lock:
+            self.rows[row - 1][ord(column) - ord('A')] = value
+
+
+class ConfigIdAllocator:
+    """
+    Allocates ExcelConfigId values without downloading the whole config sheet.
+
+    - High-water mark: max ID + number of data rows, kept in memory and refreshed
+      incrementally (only the ID cells of rows appended since the last read)
+    - Same host: a thread lock + lock file serialise allocate -> append
+    - Other hosts: after appending, the ID column is checked; if a row above ours got
+      the same ID, ours is moved to the next free ID. A moved ID must be unique in the
+      whole column (rows below may already hold it), else it is moved again (up to
+      max_attempts). Across hosts this is best effort: two hosts moving rows at the same
+      moment can exhaust the attempts (logged), only the lock file serialises fully
+    - Several rows can be appended in one call (append_rows), IDs are consecutive
+    """
+
+    def __init__(self, backend, lock_path: Optional[str] = None, max_attempts: int = 5):
+        self.backend = backend
+        self.lock_path = lock_path
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._max_id = 0
+        self._row_count = None  # data rows read so far, None = never read
+
+    @contextmanager
+    def _locked(self):
+        with self._lock:
+            if fcntl is None or not self.lock_path:
+                yield
+                return
+            with open(self.lock_path, 'a') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _observe(self, values: List):
+        ids = [i for i in map(_parse_id, values) if i is not None]
+        if ids:
+            self._max_id = max(self._max_id, max(ids))
+
+    def refresh(self, full: bool = False) -> int:
+        """Read ID cells appended since the last refresh (all of them if full), returns max ID"""
+        if full or self._row_count is None:
+            values = self.backend.read_column(ID_COLUMN, FIRST_DATA_ROW)
+            self._max_id = 0
+            self._row_count = len(values)
+        else:
+            values = self.backend.read_column(ID_COLUMN, FIRST_DATA_ROW + self._row_count)
+            self._row_count += len(values)
+        self._observe(values)
+        return self._max_id
+
+    @staticmethod
+    def _appended_row(updated_range: str) -> int:
+        """'Sheet!A120:AD120' -> 120"""
+        match = re.search(r'![A-Z]+(\d+)', updated_range)
+        if not match:
+            raise ValueError(f"Unexpected append range: {updated_range}")
+        return int(match.group(1))
+
+    def _duplicated_rows(self, config_ids: List[int], first_row: int, moved: set) -> set:
+        """
+        Positions (in config_ids) of our rows whose ID is also used by another row:
+        appended IDs clash only with rows above them (lowest row keeps a duplicated ID,
+        rows below re-allocate themselves); moved IDs clash with any other row, since
+        rows below may have been appended with that ID already. Reads the whole ID
+        column, so the high-water mark also picks up rows appended after ours.
+        """
+        values = self.backend.read_column(ID_COLUMN, FIRST_DATA_ROW)
+        self._observe(values)
+        self._row_count = len(values)
+        rows_by_id = {}
+        for offset, value in enumerate(values):
+            rows_by_id.setdefault(_parse_id(value), []).append(FIRST_DATA_ROW + offset)
+        duplicated = set()
+        for i, config_id in enumerate(config_ids):
+            others = [row for row in rows_by_id.get(config_id, []) if row != first_row + i]
+            if others and (i in moved or min(others) < first_row + i):
+                duplicated.add(i)
+        return duplicated
+
+    def append_rows(self, rows: List[List]) -> Tuple[List[int], str]:
+        """
+        Append ExcelConfig rows in one call, each with a fresh ExcelConfigId in row[0].
+        Returns (config_ids, updated_range).
+
+        The append is the commit point: once it succeeded, failures while verifying are
+        logged and the rows are reported as written (retrying would duplicate them).
+        """
+        with self._locked():
+            first_id = self.refresh() + 1
+            config_ids = list(range(first_id, first_id + len(rows)))
+            rows = [[config_id] + list(row[1:]) for config_id, row in zip(config_ids, rows)]
+            updated_range = self.backend.append_rows(rows)
+            self._max_id = max(self._max_id, config_ids[-1])
+            first_row = self._appended_row(updated_range)
+
+            # Append-then-verify: another host may have appended the same IDs meanwhile
+            moved = set()
+            try:
+                for _ in range(self.max_attempts):
+                    duplicated = self._duplicated_rows(config_ids, first_row, moved)
+                    if not duplicated:
+                        break
+                    for i in sorted(duplicated):
+                        new_id = self._max_id + 1
+                        print(f"  ⚠ ExcelConfigId {config_ids[i]} taken concurrently, moving row {first_row + i} to {new_id}")
+                        self.backend.update_cell(ID_COLUMN, first_row + i, new_id)
+                        config_ids[i] = self._max_id = new_id
+                        moved.add(i)
+                else:
+                    print(f"  ⚠ Could not confirm unique ExcelConfigIds for {updated_range}")
+            except Exception as e:
+                print(f"  ⚠ ExcelConfigId verification failed for {updated_range}: {e}")
+            return config_ids, updated_range
+
+    def append_row(self, row: List) -> Tuple[int, str]:
+        """Append one ExcelConfig row, returns (config_id, updated_range)"""
+        config_ids, updated_range = self.append_rows([row])
+        return config_ids[0], updated_range
+
+
+@lru_cache(maxsize=1)
+def get_config_id_allocator() -> ConfigIdAllocator:
+    """Process-wide allocator (keeps the high-water mark between submits)"""
+    from services.config import WIP_ID, SHEET_NAME, EXCEL_CONFIG_LOCK_PATH
+
+    return ConfigIdAllocator(SheetsConfigBackend(WIP_ID, SHEET_NAME), lock_path=EXCEL_CONFIG_LOCK_PATH)
@@ -0,0 +1,186 @@
+# services/fetch_pipeline.py
+import uuid
+from typing import Dict, Optional
+from services.config import (
+    SITE_ID, DRIVE_ID, PROFILE_CACHE_DIR, PROFILE_CACHE_MAX_MB, PREVIEW_SAMPLE_ROWS, PARSE_IN_SUBPROCESS
+)
+from services.service_cache import get_sharepoint_service, PREVIEW_CACHE
+from services.profile_cache import ProfileCache
+from services.sampling import representative_sample
+from services.preprocessing import extract_columns_metadata
+from services.raw_grid import load_raw_grid, reheader_columns_info
+from services.workbook import WorkbookSession
+from services.parse_executor import get_parse_executor
+from services.validation import source_row_count
+
+
+def csv_delimiter_name(user_input: Dict) -> Optional[str]:
+    """Step 1 delimiter -> CSVDelimiter name, None for Excel"""
+    if user_input['extension'] != '.csv':
+        return None
+    delimiter_map = {
+        ',': 'comma',
+        ';': 'semicolon',
+        '\\tab': 'tab',
+        '|': 'pipe'
+    }
+    return delimiter_map.get(user_input.get('delimiter', ','), 'comma')
+
+
+def run_fetch(job, user_input: Dict, raw_grid: Optional[Dict] = None, workbook: Optional[Dict] = None) -> Dict:
+    """
+    Fetch pipeline of Step 1: listing -> (cache | re-header | download + parse) -> profile.
+    Runs in a JobManager thread: progress and messages go through `job`, no Streamlit calls.
+
+    raw_grid / workbook: the session's previous raw grid and opened workbook (reused when
+    the file version matches, see services.raw_grid / services.workbook).
+
+    Returns: {
+        'file_meta': dict,  # incl. total_rows
+        'columns_info': dict,
+        'df_preview': pd.DataFrame,
+        'source_path': str or None,
+        'raw_grid': dict or None,  # new session values (unchanged on cache hit)
+        'workbook': dict or None,
+        'from_cache': bool
+    }
+    """
+    job.set_stage('listing', "📂 Connecting to SharePoint...")
+    sp_service = get_sharepoint_service(SITE_ID, DRIVE_ID)
+
+    job.log(f"🔍 Searching for file: {user_input['file_name']}")
+    file_meta = sp_service.get_file_metadata(
+        FolderPath=user_input['folder_path'].strip(),
+        FilePattern=user_input['file_name'].strip()
+    )
+    job.log(f"✅ File found: {file_meta['name']}", level='success')
+
+    csv_delimiter = csv_delimiter_name(user_input)
+    header_row = user_input.get('header_row', 0)
+    approximate = user_input.get('approx_profile', False)
+
+    # Cache lookup: same file version + same parse options -> skip download/parse/profile
+    profile_cache = ProfileCache(PROFILE_CACHE_DIR, PROFILE_CACHE_MAX_MB * 1024 * 1024)
+    cache_key = ProfileCache.make_key(
+        file_id=file_meta['file_id'],
+        ctag=file_meta.get('ctag'),
+        sheet_name=user_input.get('sheet_name'),
+        header_row=header_row,
+        delimiter=csv_delimiter,
+        approximate=approximate
+    )
+    # In-memory results (shared by all sessions) first, then the on-disk profile cache
+    cached = PREVIEW_CACHE.get(cache_key) if file_meta.get('ctag') else None
+    if cached is not None:
+        # Keep the on-disk entry (full-file copy) recent while it is served from memory
+        profile_cache.touch(cache_key)
+    elif file_meta.get('ctag'):
+        disk_cached = profile_cache.get(cache_key)
+        if disk_cached:
+            cached = (*disk_cached, profile_cache.source_path(cache_key))
+            PREVIEW_CACHE.set(cache_key, cached)
+    if cached:
+        columns_info, df_preview, source_path = cached
+        try:
+            if source_path:
+                file_meta['total_rows'] = source_row_count(source_path)
+        except FileNotFoundError:
+            # Full-file copy evicted from the profile cache meanwhile: drop the result, fetch again
+            PREVIEW_CACHE.invalidate(cache_key)
+            profile_cache.invalidate(cache_key)
+            cached = None
+    if cached:
+        job.log("⚡ Loaded from profile cache (file unchanged)", level='success')
+        return {
+            'file_meta': file_meta, 'columns_info': columns_info, 'df_preview': df_preview,
+            'source_path': source_path, 'raw_grid': raw_grid, 'workbook': workbook, 'from_cache': True
+        }
+
+    def profile_progress(done, total):
+        job.update('profile', done, total, 'columns')
+
+    # Same file version / sheet / delimiter as the loaded raw grid -> only header_row changed
+    grid_params = (
+        file_meta['file_id'], file_meta.get('ctag'),
+        user_input.get('sheet_name') or None, csv_delimiter, approximate
+    )
+    if raw_grid and file_meta.get('ctag') and raw_grid['params'] == grid_params:
+        # Step 4-6 (in memory): re-slice the raw grid, re-profile only affected columns
+        job.set_stage('parse', "✂️ Applying new header row in memory...")
+        df = raw_grid['grid'].with_header(header_row)
+        job.update('parse', len(df), len(df), 'rows')
+        job.set_stage('profile', "🔬 Re-profiling affected columns...")
+        columns_info = reheader_columns_info(
+            raw_grid['grid'], raw_grid['header_row'], header_row,
+            raw_grid['columns_info'], df, approximate=approximate,
+            progress_callback=profile_progress
+        )
+    else:
+        # Parse in an isolated worker process (memory / time limited) unless disabled
+        parse_executor = get_parse_executor() if PARSE_IN_SUBPROCESS else None
+        is_excel = file_meta['name'].lower().endswith((".xlsx", ".xls"))
+        if workbook and file_meta.get('ctag') and workbook['params'] == grid_params[:2]:
+            # Step 4: Same workbook version already opened (other sheet) -> no download
+            file_bytes = None
+            job.set_stage('download', "📑 Reusing opened workbook...")
+        else:
+            # Step 4: Download file
+            job.set_stage('download', "⬇️ Downloading file...")
+            file_bytes = sp_service.download_file(
+                file_meta['download_url'],
+                progress_callback=lambda done, total: job.update('download', done, total, 'bytes')
+            )
+            workbook = None
+            if is_excel:
+                workbook = {
+                    'params': grid_params[:2],
+                    'session': WorkbookSession(file_bytes, file_meta['name'], executor=parse_executor)
+                }
+
+        # Step 5: Parse without header (raw grid), then apply header row
+        job.set_stage('parse', "📊 Processing file...")
+        grid = load_raw_grid(
+            file_bytes=file_bytes,
+            file_name=file_meta['name'],
+            sheet_name=user_input.get('sheet_name') if user_input.get('sheet_name') else None,
+            csv_delimiter=csv_delimiter or 'comma',
+            workbook=workbook['session'] if workbook else None,
+            executor=parse_executor,
+            cancel_event=job.cancel_event
+        )
+        df = grid.with_header(header_row)
+        job.update('parse', len(df), len(df), 'rows')
+        raw_grid = {'grid': grid, 'params': grid_params}
+
+        # Step 6: Extract column metadata
+        job.set_stage('profile', "🔬 Extracting column information...")
+        columns_info = extract_columns_metadata(df, approximate=approximate, progress_callback=profile_progress)
+
+    job.log(f"✅ DataFrame created: {len(df):,} rows × {len(df.columns)} columns", level='success')
+    raw_grid = dict(raw_grid, header_row=header_row, columns_info=columns_info)
+
+    # Step 7: Representative sample only (head + tail + random rows, index = original row number)
+    file_meta['total_rows'] = len(df)
+    df_preview = representative_sample(df, PREVIEW_SAMPLE_ROWS)
+
+    # Cache entry + full-file Parquet copy (used for full-file validation in Step 3)
+    job.set_stage('cache', "💾 Writing profile cache...")
+    source_path = None
+    try:
+        if file_meta.get('ctag'):
+            profile_cache.put(cache_key, columns_info, df_preview, df_source=df)
+        else:
+            # No file version: lookups never hit this entry, keep only this fetch's full-file copy
+            cache_key = f"{cache_key}-{uuid.uuid4().hex}"
+            profile_cache.put(cache_key, None, None, df_source=df)
+        source_path = profile_cache.source_path(cache_key)
+    except Exception as cache_error:
+        print(f"  ⚠ Profile cache write failed: {cache_error}")
+    if file_meta.get('ctag'):
+        PREVIEW_CACHE.set(cache_key, (columns_info, df_preview, source_path))
+
+    job.log("✅ Processing complete!", level='success')
+    return {
+        'file_meta': file_meta, 'columns_info': columns_info, 'df_preview': df_preview,
+        'source_path': source_path, 'raw_grid': raw_grid, 'workbook': workbook, 'from_cache': False
+    }
@@ -0,0 +1,150 @@
+# services/jobs.py
+import time
+import uuid
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Callable, Dict, Optional
+
+# Finished jobs are kept this long so a session can still pick up the result after a reconnect
+JOB_KEEP_SECONDS = 3600
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class Job:
+    """
+    State of one background job, written by the worker thread, read by the UI.
+
+    progress: {stage: {'done': int, 'total': int or None, 'unit': str}}
+    e.g. download (bytes), parse (rows), profile (columns)
+    """
+
+    def __init__(self, name: str):
+        self.job_id = uuid.uuid4().hex
+        self.name = name
+        self.status = 'pending'  # pending -> running -> done / failed / cancelled
+        self.stage = None
+        self.progress: Dict = {}
+        self.messages = []  # [(level, text)], level = info / success / warning
+        self.result = None
+        self.error = None
+        self.traceback = None
+        self.cancel_event = threading.Event()
+        self.created_at = time.time()
+        self.finished_at = None
+        self._lock = threading.Lock()
+
+    def log(self, message: str, level: str = 'info'):
+        print(f"  [{self.name}] {message}")
+        with self._lock:
+            self.messages.append((level, message))
+
+    def set_stage(self, stage: str, message: Optional[str] = None):
+        self.check_cancelled()
+        with self._lock:
+            self.stage = stage
+        if message:
+            self.log(message)
+
+    def update(self, stage: str, done: int, total: Optional[int] = None, unit: str = ''):
+        """Report progress of a stage, raises JobCancelled if cancel was requested"""
+        with self._lock:
+            self.progress[stage] = {'done': done, 'total': total, 'unit': unit}
+        self.check_cancelled()
+
+    def check_cancelled(self):
+        if self.cancel_event.is_set():
+            raise JobCancelled(f"{self.name} cancelled")
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ('done', 'failed', 'cancelled')
+
+    def snapshot(self) -> Dict:
+        """Consistent copy of the job state for rendering"""
+        with self._lock:
+            return {
+                'job_id': self.job_id,
+                'name': self.name,
+                'status': self.status,
+                'stage': self.stage,
+                'progress': {stage: dict(p) for stage, p in self.progress.items()},
+                'messages': list(self.messages),
+                'error': self.error,
+                'traceback': self.traceback,
+                'elapsed': (self.finished_at or time.time()) - self.created_at,
+            }
+
+
+class JobManager:
+    """
+    Job registry + thread pool for long-running work (fetch pipeline) outside the
+    Streamlit script run. Work functions get the Job as first argument and report
+    progress / check cancellation through it; they must not call Streamlit APIs.
+    """
+
+    def __init__(self, max_workers: int = 4, keep_seconds: int = JOB_KEEP_SECONDS):
+        self.keep_seconds = keep_seconds
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='job')
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, name: str, fn: Callable, *args, **kwargs) -> Job:
+        self.cleanup()
+        job = Job(name)
+        with self._lock:
+            self._jobs[job.job_id] = job
+        self._executor.submit(self._run, job, fn, args, kwargs)
+        return job
+
+    @staticmethod
+    def _run(job: Job, fn: Callable, args, kwargs):
+        job.status = 'running'
+        try:
+            job.check_cancelled()
+            job.result = fn(job, *args, **kwargs)
+            job.status = 'done'
+        except JobCancelled:
+            job.status = 'cancelled'
+            job.log("Cancelled", level='warning')
+        except Exception as e:
+            # Cancel while a stage was blocked (e.g. parse worker killed) is still a cancel
+            if job.cancel_event.is_set():
+                job.status = 'cancelled'
+                job.log("Cancelled", level='warning')
+            else:
+                job.error = str(e)
+                job.traceback = traceback.format_exc()
+                job.status = 'failed'
+        finally:
+            job.finished_at = time.time()
+
+    def get(self, job_id: Optional[str]) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> bool:
+        job = self.get(job_id)
+        if job is None or job.finished:
+            return False
+        job.cancel_event.set()
+        return True
+
+    def cleanup(self):
+        """Drop finished jobs older than keep_seconds"""
+        cutoff = time.time() - self.keep_seconds
+        with self._lock:
+            for job_id in [j.job_id for j in self._jobs.values() if j.finished and j.finished_at < cutoff]:
+                del self._jobs[job_id]
+
+
+@lru_cache(maxsize=1)
+def get_job_manager() -> JobManager:
+    """Process-wide job manager shared by all Streamlit sessions"""
+    from services.config import FETCH_JOB_WORKERS
+
+    return JobManager(max_workers=FETCH_JOB_WORKERS)
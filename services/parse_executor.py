@@ -0,0 +1,387 @@
+# services/parse_executor.py
+import os
+import time
+import uuid
+import pickle
+import tempfile
+import importlib
+import threading
+import traceback
+import multiprocessing
+from io import BytesIO
+from collections import OrderedDict
+from functools import lru_cache
+from typing import List, Optional
+import pandas as pd
+
+# Functions a worker may run: name -> (module, attribute). First argument is always the file bytes.
+PARSE_FUNCTIONS = {
+    'process_file_to_dataframe': ('services.preprocessing', 'process_file_to_dataframe'),
+    'read_excel_with_repair': ('services.preprocessing', 'read_excel_with_repair'),
+    'read_raw_frame': ('services.raw_grid', 'read_raw_frame'),
+}
+
+# Workbook task: WorkbookSession kept open inside the worker (sheet switch = no re-open)
+WORKBOOK_TASK = 'workbook'
+WORKER_OPEN_WORKBOOKS = 2
+
+# How often the parent checks deadline / cancel while waiting for a worker
+POLL_INTERVAL = 0.2
+
+
+class ParseError(Exception):
+    """Parse failed inside the worker process (or the worker died)"""
+
+
+class ParseTimeoutError(ParseError):
+    pass
+
+
+class ParseCancelledError(ParseError):
+    pass
+
+
+def _default_spool_dir() -> str:
+    # /dev/shm = RAM-backed on Linux, results are memory-mapped back without a disk round trip
+    return '/dev/shm' if os.path.isdir('/dev/shm') and os.access('/dev/shm', os.W_OK) else tempfile.gettempdir()
+
+
+def _limit_memory(memory_limit_bytes: int):
+    """Cap the worker address space (RLIMIT_AS), allocations beyond it raise MemoryError"""
+    if not memory_limit_bytes:
+        return
+    try:
+        import resource
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit_bytes, memory_limit_bytes))
+    except (ImportError, ValueError, OSError) as e:
+        # Windows / limit not permitted: run without limit
+        print(f"  ⚠ Parse worker memory limit not applied: {e}")
+
+
+def _spool_paths(spool_base: str):
+    return f"{spool_base}.arrow", f"{spool_base}.pkl"
+
+
+def _remove_spool(spool_base: str):
+    """Delete spool files of a task (also left behind by a killed / timed out worker)"""
+    for path in _spool_paths(spool_base):
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+
+def _write_result(result, spool_base: str):
+    """
+    Write a worker result to spool files (paths chosen by the parent, see _remove_spool).
+    DataFrame: Arrow IPC file for all Arrow-compatible columns, mixed object columns
+    (e.g. header text above numbers in a raw grid) are pickled to a second spool file
+    so values keep their types. Anything else is pickled.
+    Only paths and small metadata go back through the pipe.
+    """
+    arrow_path, pickle_path = _spool_paths(spool_base)
+    if not isinstance(result, pd.DataFrame):
+        with open(pickle_path, 'wb') as f:
+            pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+        return {'kind': 'pickle', 'path': pickle_path}
+
+    import pyarrow as pa
+
+    arrow_columns, arrow_arrays, other_columns = [], [], []
+    for position in range(result.shape[1]):
+        try:
+            arrow_arrays.append(pa.array(result.iloc[:, position], from_pandas=True))
+            arrow_columns.append(position)
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+            other_columns.append(position)
+
+    table = pa.Table.from_arrays(arrow_arrays, names=[str(p) for p in arrow_columns])
+    with pa.OSFile(arrow_path, 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    if other_columns:
+        with open(pickle_path, 'wb') as f:
+            pickle.dump(result.iloc[:, other_columns], f, protocol=pickle.HIGHEST_PROTOCOL)
+    return {
+        'kind': 'arrow',
+        'path': arrow_path,
+        'other_path': pickle_path if other_columns else None,
+        'labels': list(result.columns),
+        'index': result.index if not isinstance(result.index, pd.RangeIndex) else None,
+        'num_rows': len(result),
+        'arrow_columns': arrow_columns,
+        'other_columns': other_columns,
+    }
+
+
+def _read_result(message):
+    """Load the spool files written by _write_result (deleted by the caller)"""
+    if message['kind'] == 'pickle':
+        with open(message['path'], 'rb') as f:
+            return pickle.load(f)
+
+    import pyarrow as pa
+
+    with pa.memory_map(message['path'], 'r') as source:
+        table = pa.ipc.open_file(source).read_all()
+    arrow_df = table.to_pandas()
+
+    columns = {}
+    for position, name in zip(message['arrow_columns'], arrow_df.columns):
+        columns[position] = arrow_df[name]
+    if message['other_path']:
+        with open(message['other_path'], 'rb') as f:
+            other = pickle.load(f)
+        for i, position in enumerate(message['other_columns']):
+            columns[position] = other.iloc[:, i].reset_index(drop=True)
+
+    df = pd.concat([columns[p] for p in range(len(message['labels']))], axis=1) if columns \
+        else pd.DataFrame(index=range(message['num_rows']))
+    df.columns = message['labels']
+    if message['index'] is not None:
+        df.index = message['index']
+    return df
+
+
+_MISSING = object()
+
+
+def _workbook_call(workbooks: OrderedDict, data: Optional[bytes], kwargs: dict):
+    """
+    WorkbookSession method on a workbook kept open in this worker (LRU, WORKER_OPEN_WORKBOOKS).
+    data None = parent assumes the workbook is open here; returns _MISSING if it is not.
+    """
+    from services.workbook import WorkbookSession
+
+    key = kwargs['key']
+    session = workbooks.get(key)
+    if session is None:
+        if data is None:
+            return _MISSING
+        session = WorkbookSession(BytesIO(data), kwargs['file_name'])
+        workbooks[key] = session
+        while len(workbooks) > WORKER_OPEN_WORKBOOKS:
+            workbooks.popitem(last=False)[1].close()
+    workbooks.move_to_end(key)
+    if kwargs['method'] == 'sheet_names':
+        return session.sheet_names
+    return session.parse(kwargs['sheet_name'], header=kwargs['header'])
+
+
+def _worker_main(conn, memory_limit_bytes: int):
+    """Worker loop: receive (function name, file bytes, kwargs, spool base), reply with spool file info or error"""
+    _limit_memory(memory_limit_bytes)
+    workbooks = OrderedDict()
+    while True:
+        try:
+            task = conn.recv()
+        except (EOFError, OSError):
+            return
+        if task is None:
+            return
+
+        func_name, data, kwargs, spool_base = task
+        try:
+            if func_name == WORKBOOK_TASK:
+                result = _workbook_call(workbooks, data, kwargs)
+                if result is _MISSING:
+                    conn.send(('missing',))
+                    continue
+            else:
+                module_name, attr = PARSE_FUNCTIONS[func_name]
+                func = getattr(importlib.import_module(module_name), attr)
+                result = func(BytesIO(data), **kwargs)
+            del data
+            conn.send(('ok', _write_result(result, spool_base)))
+        except MemoryError:
+            # Heap may be fragmented / half-built objects: report and exit, parent starts a fresh worker
+            conn.send(('error', 'MemoryError', 'Parse exceeded the worker memory limit', ''))
+            return
+        except BaseException as e:
+            conn.send(('error', type(e).__name__, str(e), traceback.format_exc()))
+
+
+class _Worker:
+    def __init__(self, ctx, memory_limit_bytes: int):
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(
+            target=_worker_main,
+            args=(child_conn, memory_limit_bytes),
+            daemon=True,
+            name='parse-worker'
+        )
+        self.process.start()
+        child_conn.close()
+        # Workbook keys open in the worker (same LRU as _workbook_call)
+        self.workbooks = OrderedDict()
+
+    def remember_workbook(self, key: str):
+        self.workbooks[key] = True
+        self.workbooks.move_to_end(key)
+        while len(self.workbooks) > WORKER_OPEN_WORKBOOKS:
+            self.workbooks.popitem(last=False)
+
+    def alive(self) -> bool:
+        return self.process.is_alive()
+
+    def kill(self):
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join(timeout=5)
+        self.conn.close()
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except (OSError, BrokenPipeError):
+            pass
+        self.process.join(timeout=5)
+        self.kill()
+
+
+class ParseExecutor:
+    """
+    Pool of warm worker processes (spawn) for isolated file parsing.
+
+    - memory: each worker has an address-space limit (RLIMIT_AS, Linux/macOS), a runaway
+      parse fails with MemoryError in the worker instead of growing the server process
+    - time: a parse running longer than timeout is killed (only that worker), ParseTimeoutError
+    - cancel: pass a threading.Event, setting it kills the worker, ParseCancelledError
+    - results: DataFrames come back as Arrow IPC files in spool_dir (/dev/shm if available),
+      memory-mapped by the caller; only mixed object columns are pickled (to a spool file,
+      not through the pipe). Spool files are removed after every call, also on timeout / cancel.
+    - workbooks: run_workbook() keeps a WorkbookSession open in the worker and routes later
+      calls for the same workbook to that worker, so a sheet switch does not re-open the ZIP
+      or decode shared strings again (bytes are only sent when the worker does not have it)
+    Idle workers are kept (max_workers) so spawn + pandas import cost is paid once.
+    """
+
+    def __init__(self, max_workers: int = 2, memory_limit_mb: int = 4096,
+                 timeout: Optional[float] = 300, spool_dir: Optional[str] = None):
+        self.max_workers = max(1, max_workers)
+        self.memory_limit_bytes = max(0, memory_limit_mb) * 1024 * 1024
+        self.timeout = timeout
+        self.spool_dir = spool_dir or _default_spool_dir()
+        self._ctx = multiprocessing.get_context('spawn')
+        self._slots = threading.BoundedSemaphore(self.max_workers)
+        self._lock = threading.Lock()
+        self._idle: List[_Worker] = []
+
+    def _spawn(self) -> _Worker:
+        return _Worker(self._ctx, self.memory_limit_bytes)
+
+    def warm_up(self, count: Optional[int] = None):
+        """Start idle workers ahead of the first parse"""
+        count = self.max_workers if count is None else min(count, self.max_workers)
+        with self._lock:
+            while len(self._idle) < count:
+                self._idle.append(self._spawn())
+
+    def _acquire(self, workbook_key: Optional[str] = None) -> _Worker:
+        """Idle worker, preferring one that has workbook_key open"""
+        with self._lock:
+            if workbook_key is not None:
+                for worker in self._idle:
+                    if workbook_key in worker.workbooks and worker.alive():
+                        self._idle.remove(worker)
+                        return worker
+            while self._idle:
+                worker = self._idle.pop()
+                if worker.alive():
+                    return worker
+                worker.kill()
+        return self._spawn()
+
+    def _release(self, worker: _Worker):
+        with self._lock:
+            self._idle.append(worker)
+
+    @staticmethod
+    def _exchange(worker: _Worker, task: tuple, started: float, timeout: Optional[float],
+                  cancel_event: Optional[threading.Event]):
+        """Send one task and wait for the reply (kills the worker on timeout / cancel / death)"""
+        func_name = task[0]
+        try:
+            worker.conn.send(task)
+            while not worker.conn.poll(POLL_INTERVAL):
+                if cancel_event is not None and cancel_event.is_set():
+                    worker.kill()
+                    raise ParseCancelledError(f"{func_name} cancelled")
+                if timeout and time.monotonic() - started > timeout:
+                    worker.kill()
+                    raise ParseTimeoutError(f"{func_name} exceeded {timeout:.0f}s, worker killed")
+                if not worker.alive():
+                    worker.kill()
+                    raise ParseError(f"Parse worker died (exit code {worker.process.exitcode})")
+            return worker.conn.recv()
+        except (EOFError, OSError) as e:
+            worker.kill()
+            raise ParseError(f"Parse worker died: {type(e).__name__}") from e
+
+    def _call(self, func_name: str, data: bytes, kwargs: dict, timeout: Optional[float],
+              cancel_event: Optional[threading.Event], workbook_key: Optional[str] = None):
+        timeout = self.timeout if timeout is None else timeout
+        spool_base = os.path.join(self.spool_dir, f"parse-{os.getpid()}-{uuid.uuid4().hex}")
+        try:
+            with self._slots:
+                worker = self._acquire(workbook_key)
+                started = time.monotonic()
+                has_workbook = workbook_key is not None and workbook_key in worker.workbooks
+                reply = self._exchange(worker, (func_name, None if has_workbook else data, kwargs, spool_base),
+                                       started, timeout, cancel_event)
+                if reply[0] == 'missing':
+                    reply = self._exchange(worker, (func_name, data, kwargs, spool_base),
+                                           started, timeout, cancel_event)
+                if workbook_key is not None and reply[0] == 'ok':
+                    worker.remember_workbook(workbook_key)
+
+                if worker.alive():
+                    self._release(worker)
+                else:
+                    worker.kill()
+
+            if reply[0] == 'error':
+                _, error_type, message, worker_traceback = reply
+                if worker_traceback:
+                    print(worker_traceback)
+                raise ParseError(f"{error_type}: {message}")
+            return _read_result(reply[1])
+        finally:
+            _remove_spool(spool_base)
+
+    def run(self, func_name: str, file_bytes: BytesIO, timeout: Optional[float] = None,
+            cancel_event: Optional[threading.Event] = None, **kwargs):
+        """Run PARSE_FUNCTIONS[func_name](file_bytes, **kwargs) in a worker and return its result"""
+        if func_name not in PARSE_FUNCTIONS:
+            raise ValueError(f"Unknown parse function: {func_name}")
+        return self._call(func_name, file_bytes.getvalue(), kwargs, timeout, cancel_event)
+
+    def run_workbook(self, key: str, data: bytes, file_name: str, method: str,
+                     timeout: Optional[float] = None, cancel_event: Optional[threading.Event] = None,
+                     **kwargs):
+        """
+        WorkbookSession.<method> ('sheet_names' / 'parse', kwargs sheet_name + header) on the
+        workbook `key`, opened from data in a worker on first use and kept open there
+        """
+        kwargs = dict(kwargs, key=key, file_name=file_name, method=method)
+        return self._call(WORKBOOK_TASK, data, kwargs, timeout, cancel_event, workbook_key=key)
+
+    def shutdown(self):
+        with self._lock:
+            workers, self._idle = self._idle, []
+        for worker in workers:
+            worker.stop()
+
+
+@lru_cache(maxsize=1)
+def get_parse_executor() -> ParseExecutor:
+    """Process-wide executor (shared by all Streamlit sessions), workers started on first use"""
+    from services.config import PARSE_WORKERS, PARSE_MEMORY_LIMIT_MB, PARSE_TIMEOUT_SECONDS
+
+    executor = ParseExecutor(
+        max_workers=PARSE_WORKERS,
+        memory_limit_mb=PARSE_MEMORY_LIMIT_MB,
+        timeout=PARSE_TIMEOUT_SECONDS
+    )
+    executor.warm_up(1)
+    return executor
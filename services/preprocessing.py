@@ -7,11 +7,13 @@ import tempfile
 from datetime import datetime, timezone, timedelta
 from io import BytesIO
 import xml.etree.ElementTree as ET
+import numpy as np
 import pandas as pd
 import requests
 import pandas as pd
 from io import BytesIO
 from typing import Dict, Tuple, Optional
+from pandas.tseries.api import guess_datetime_format
 
 def process_file_to_dataframe( file_bytes: BytesIO, file_name: str, sheet_name: Optional[str] = None, 
                               header: int = 0, csv_delimiter: str = "comma") -> pd.DataFrame:
@@ -35,9 +37,15 @@ def process_file_to_dataframe( file_bytes: BytesIO, file_name: str, sheet_name:
     else:
         raise ValueError(f"Unsupported file type: {file_name}")
 
-def extract_columns_metadata(df: pd.DataFrame) -> Dict:
+def extract_columns_metadata(df: pd.DataFrame, approximate: bool = False,
+                             max_workers: Optional[int] = None, use_processes: bool = False,
+                             progress_callback=None) -> Dict:
     """
     Extract column information from DataFrame
+    approximate=True uses fixed-size sketches (HyperLogLog unique_count, top-k, reservoir samples)
+    Columns are profiled in parallel (max_workers, default PROFILE_WORKERS from config),
+    use_processes=True switches the thread pool to a process pool
+    progress_callback(columns_done, total_columns) is called as columns finish
     Returns: {
         'column_name': {
             'dtype': str,
@@ -45,34 +53,75 @@ def extract_columns_metadata(df: pd.DataFrame) -> Dict:
             'null_percentage': float,
             'unique_count': int,
             'sample_values': list,
-            'inferred_type': str  # 'numeric', 'text', 'date', 'boolean'
+            'inferred_type': str,  # 'numeric', 'text', 'date', 'boolean'
+            'min': Any, 'max': Any,  # None if not comparable
+            'min_length': int, 'max_length': int, 'avg_length': float,  # string columns only
+            'unique_count_is_approx': bool,
+            # approximate=True only:
+            'unique_count_error': float,  # relative standard error of unique_count
+            'top_values': [{'value': str, 'count': int, 'error': int}],
+            'top_values_max_error': int
         }
     }
     """
-    columns_info = {}
-    
-    for col in df.columns:
-        col_data = df[col]
-        
-        # Infer semantic type
-        inferred_type = infer_column_type(col_data)
-        
-        columns_info[col] = {
-            'dtype': str(col_data.dtype),
-            'null_count': int(col_data.isnull().sum()),
-            'null_percentage': round(col_data.isnull().sum() / len(df) * 100, 2),
-            'unique_count': int(col_data.nunique()),
-            'sample_values': col_data.dropna().head(5).astype(str).tolist(),
-            'inferred_type': inferred_type
-        }
-    
-    return columns_info
+    from services.profiling import profile_columns
+
+    return profile_columns(df, approximate=approximate, max_workers=max_workers, use_processes=use_processes,
+                           progress_callback=progress_callback)
+
+# Sample size untuk deteksi date (parse dibatasi, tidak full column)
+DATE_SAMPLE_SIZE = 1000
+
+# Range SQL int (32-bit), di luar ini pakai bigint
+INT32_MIN = -2**31
+INT32_MAX = 2**31 - 1
+
+def _is_integral(series: pd.Series) -> bool:
+    """Vectorized check: all non-null numeric values are whole numbers"""
+    if pd.api.types.is_integer_dtype(series) or pd.api.types.is_bool_dtype(series):
+        return True
+    values = series.dropna().to_numpy(dtype='float64')
+    if not np.isfinite(values).all():
+        return False
+    return bool((np.mod(values, 1) == 0).all())
+
+def _sample_values(values: pd.Series, size: int) -> pd.Series:
+    """Evenly spaced sample over the whole column (first & last value always included)"""
+    if len(values) <= size:
+        return values
+    positions = np.unique(np.linspace(0, len(values) - 1, size).astype(np.int64))
+    return values.iloc[positions]
+
+def parse_date_sample(values: pd.Series) -> Optional[pd.Series]:
+    """
+    Bounded date parse: parse a sample only, with the format guessed from the first string.
+    Returns the parsed sample, or None if the values are not dates.
+    """
+    sample = _sample_values(values, DATE_SAMPLE_SIZE)
+    first_str = next((v for v in sample if isinstance(v, str)), None)
+    date_format = guess_datetime_format(first_str) if first_str else None
+
+    if date_format:
+        try:
+            return pd.to_datetime(sample, format=date_format, errors='raise')
+        except (ValueError, TypeError, OverflowError):
+            pass
+
+    # Fallback: default pandas inference (same as full-column parse, but on the sample)
+    try:
+        return pd.to_datetime(sample, errors='raise')
+    except (ValueError, TypeError, OverflowError):
+        return None
+
+def _looks_like_date(values: pd.Series) -> bool:
+    """Bounded date detection on a sample of the column"""
+    return parse_date_sample(values) is not None
 
 def infer_column_type(series: pd.Series) -> str:
     """Infer semantic type of column"""
     # Numeric
     if pd.api.types.is_numeric_dtype(series):
-        if series.dropna().apply(lambda x: x == int(x)).all():
+        if _is_integral(series):
             return 'integer'
         return 'float'
     
@@ -81,11 +130,11 @@ def infer_column_type(series: pd.Series) -> str:
         return 'boolean'
     
     # Date
-    try:
-        pd.to_datetime(series.dropna(), errors='raise')
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return 'date'
+    values = series.dropna()
+    if _looks_like_date(values):
         return 'date'
-    except:
-        pass
     
     # Default to text
     return 'text'
@@ -201,7 +250,9 @@ def list_all_files(folder_url, folder_path, headers, SITE_ID, DRIVE_ID, parent_f
                 "download_url": item["@microsoft.graph.downloadUrl"],
                 "file_id": item["id"],
                 "folder_name": parent_folder,
-                "parent_folder_id": item.get("parentReference", {}).get("id")
+                "parent_folder_id": item.get("parentReference", {}).get("id"),
+                "ctag": item.get("cTag"),
+                "size": item.get("size")
             })
 
         # If it's a subfolder → recurse using PATH
@@ -369,7 +420,111 @@ def read_excel_with_repair(file_bytes, sheet_name=0, header=0, filename="file.xl
     raise Exception(f"Cannot read {filename} with any method")
 
 
-def read_data(FOLDER_PATH, FILE_PATTERN, SHEET_NAME, HEADER, TOKEN, SITE_ID, DRIVE_ID, CSVDelimiter, NeedBackup, backup_folder_path):
+def dataframe_to_arrow(df: pd.DataFrame, preserve_index: bool = False):
+    """
+    Convert DataFrame to pyarrow Table.
+    Object columns with mixed values (e.g. int + str) cannot be converted directly,
+    so those columns are stored as string (nulls are kept).
+    preserve_index=True keeps the index (restored by pd.read_parquet / Table.to_pandas).
+    """
+    import pyarrow as pa
+
+    try:
+        return pa.Table.from_pandas(df, preserve_index=preserve_index)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        df = df.copy()
+        for col in df.columns:
+            if df[col].dtype != object:
+                continue
+            try:
+                pa.array(df[col], from_pandas=True)
+            except (pa.ArrowInvalid, pa.ArrowTypeError):
+                # Only the mixed columns become string, the others keep their type
+                df[col] = df[col].where(df[col].isna(), df[col].astype(str))
+        return pa.Table.from_pandas(df, preserve_index=preserve_index)
+
+
+def unify_arrow_schema(current, incoming):
+    """
+    Merge two Arrow schemas. Compatible types are promoted (int64 + double -> double),
+    incompatible types (e.g. int64 vs string) fall back to string.
+    """
+    import pyarrow as pa
+
+    if current is None:
+        return incoming
+    try:
+        return pa.unify_schemas([current, incoming], promote_options="permissive")
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        fields = {field.name: field for field in current}
+        for field in incoming:
+            if field.name not in fields:
+                fields[field.name] = field
+            elif not fields[field.name].type.equals(field.type):
+                try:
+                    fields[field.name] = pa.unify_schemas(
+                        [pa.schema([fields[field.name]]), pa.schema([field])],
+                        promote_options="permissive"
+                    ).field(field.name)
+                except (pa.ArrowInvalid, pa.ArrowTypeError):
+                    fields[field.name] = pa.field(field.name, pa.string())
+        return pa.schema(list(fields.values()))
+
+
+def write_source_partition(df: pd.DataFrame, output_dir: str, source: str, part_number: int):
+    """
+    Write one parsed file into a hive-partitioned Parquet dataset: output_dir/Source=<source>/part-N.parquet
+    Returns the Arrow schema of the written file (without the partition column).
+    """
+    import pyarrow.parquet as pq
+    from urllib.parse import quote
+
+    table = dataframe_to_arrow(df.drop(columns=['Source'], errors='ignore'))
+    partition_dir = os.path.join(output_dir, f"Source={quote(str(source), safe='')}")
+    os.makedirs(partition_dir, exist_ok=True)
+    pq.write_table(table, os.path.join(partition_dir, f"part-{part_number:05d}.parquet"))
+    return table.schema
+
+
+def clear_source_dataset(output_dir: str):
+    """Remove Source=* partitions of an earlier run so a reused output_dir holds only this run's files"""
+    import shutil
+
+    for name in os.listdir(output_dir):
+        path = os.path.join(output_dir, name)
+        if name.startswith('Source=') and os.path.isdir(path):
+            shutil.rmtree(path)
+
+
+def open_source_dataset(output_dir: str, schema):
+    """Open the partitioned Parquet dataset written by read_data (lazy, nothing is loaded yet)"""
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    partitioning = ds.partitioning(pa.schema([("Source", pa.string())]), flavor="hive")
+    full_schema = schema.append(pa.field("Source", pa.string()))
+    return ds.dataset(output_dir, format="parquet", partitioning=partitioning, schema=full_schema)
+
+
+def read_data(FOLDER_PATH, FILE_PATTERN, SHEET_NAME, HEADER, TOKEN, SITE_ID, DRIVE_ID, CSVDelimiter, NeedBackup, backup_folder_path,
+              output_mode="dataframe", output_dir=None):
+    """
+    Read all files matching FILE_PATTERN and combine them.
+
+    output_mode:
+    - "dataframe" (default): returns (pd.DataFrame, TableName), all files concatenated in memory
+    - "parquet": every parsed file is written as soon as it finishes to a Parquet dataset in
+      output_dir, partitioned by Source, and returns (pyarrow.dataset.Dataset, TableName).
+      Only one file is held in memory at a time. The Source column is always present in this mode.
+      Source=* partitions left in output_dir by an earlier run are removed first.
+    """
+    if output_mode not in ("dataframe", "parquet"):
+        raise ValueError(f"Invalid output_mode: {output_mode}")
+    if output_mode == "parquet":
+        if not output_dir:
+            raise ValueError("output_dir is required when output_mode='parquet'")
+        os.makedirs(output_dir, exist_ok=True)
+        clear_source_dataset(output_dir)
 
     headers = {"Authorization": f"Bearer {TOKEN}"}
 
@@ -391,6 +546,9 @@ def read_data(FOLDER_PATH, FILE_PATTERN, SHEET_NAME, HEADER, TOKEN, SITE_ID, DRI
         matched_files = [matched_files[0]]
 
     df_list = []
+    files_written = 0
+    total_rows = 0
+    unified_schema = None
     TableName = None
 
     for f in matched_files:
@@ -487,9 +645,20 @@ def read_data(FOLDER_PATH, FILE_PATTERN, SHEET_NAME, HEADER, TOKEN, SITE_ID, DRI
 
                 print(f"  → Result: {len(df)} rows × {len(df.columns)} columns")
 
+            folder_name = f.get('folder_name')
+            source = folder_name if folder_name else 'Root'
+
+            if output_mode == "parquet":
+                file_schema = write_source_partition(df, output_dir, source, files_written)
+                unified_schema = unify_arrow_schema(unified_schema, file_schema)
+                files_written += 1
+                total_rows += len(df)
+                del df
+                print(f"  ✓ Successfully written to dataset (Source={source})")
+                continue
+
             if len(matched_files) > 1:
-                folder_name = f.get('folder_name')
-                df['Source'] = folder_name if folder_name else 'Root'
+                df['Source'] = source
 
             df_list.append(df)
             print(f"  ✓ Successfully added to dataset")
@@ -500,6 +669,20 @@ def read_data(FOLDER_PATH, FILE_PATTERN, SHEET_NAME, HEADER, TOKEN, SITE_ID, DRI
             continue
 
     print(f"\n{'='*60}")
+    if output_mode == "parquet":
+        if not files_written:
+            print("❌ No files processed successfully")
+            return None, None
+
+        dataset = open_source_dataset(output_dir, unified_schema)
+        print(f"✓ SUCCESS! Parquet dataset: {output_dir}")
+        print(f"  - Total rows: {total_rows:,}")
+        print(f"  - Total columns: {len(dataset.schema)}")
+        print(f"  - Files processed: {files_written}")
+        print('='*60)
+
+        return dataset, TableName
+
     if not df_list:
         print("❌ No files processed successfully")
         return None, None
@@ -0,0 +1,182 @@
+# services/profile_cache.py
+import os
+import json
+import time
+import shutil
+import hashlib
+from datetime import date, datetime
+from typing import Dict, Optional, Tuple
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+
+def _encode_label(label):
+    """Column label -> JSON value (header cells can be numbers or dates, not only strings)"""
+    if isinstance(label, np.generic):
+        label = label.item()
+    if isinstance(label, (datetime, date, pd.Timestamp)):
+        return {'datetime': pd.Timestamp(label).isoformat()}
+    if label is None or isinstance(label, (str, int, float, bool)):
+        return label
+    return str(label)
+
+
+def _decode_label(value):
+    if isinstance(value, dict):
+        return pd.Timestamp(value['datetime'])
+    return value
+
+
+def _json_default(value):
+    """numpy scalars / timestamps left in columns_info stats"""
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+
+class ProfileCache:
+    """
+    On-disk cache of fetch results (columns_info + Parquet preview, and optionally
+    a Parquet copy of the full parsed file for full-file validation).
+
+    Entries are keyed by file version (file_id + cTag) and parse options, so a changed
+    file or different sheet/header/delimiter never hits a stale entry.
+    Total size is capped at max_bytes, least recently used entries are evicted first.
+    """
+
+    COLUMNS_INFO_FILE = 'columns_info.json'
+    PREVIEW_FILE = 'preview.parquet'
+    SOURCE_FILE = 'source.parquet'
+    # Small row groups so RowRangeAccessor only decodes a few rows around each requested index
+    SOURCE_ROW_GROUP_ROWS = 16_384
+    # Bumped when the profiler output changes, so entries profiled by an older version never hit
+    PROFILE_VERSION = 2
+
+    def __init__(self, cache_dir: str, max_bytes: int = 512 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(self.cache_dir, mode=0o700, exist_ok=True)
+
+    @staticmethod
+    def make_key(file_id: str, ctag: Optional[str], sheet_name, header_row: int,
+                 delimiter: Optional[str], approximate: bool = False) -> str:
+        raw = json.dumps([ProfileCache.PROFILE_VERSION, file_id, ctag, sheet_name or None, int(header_row or 0),
+                          delimiter, bool(approximate)])
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def _entry_dir(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key)
+
+    def get(self, key: str) -> Optional[Tuple[Dict, pd.DataFrame]]:
+        """Return (columns_info, df_preview) or None on miss"""
+        entry_dir = self._entry_dir(key)
+        try:
+            with open(os.path.join(entry_dir, self.COLUMNS_INFO_FILE), encoding='utf-8') as f:
+                columns_info = {_decode_label(label): info for label, info in json.load(f)}
+            df_preview = pd.read_parquet(os.path.join(entry_dir, self.PREVIEW_FILE))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, TypeError, pa.ArrowException) as e:
+            # Truncated / corrupt entry: drop it, the caller re-fetches
+            print(f"  ⚠ Profile cache entry unreadable, removed: {e}")
+            self.invalidate(key)
+            return None
+
+        # Parquet only keeps string column names, restore original labels
+        if len(df_preview.columns) == len(columns_info):
+            df_preview.columns = list(columns_info.keys())
+
+        self.touch(key)
+        return columns_info, df_preview
+
+    def touch(self, key: str):
+        """Mark as recently used (LRU order = directory mtime), entry may be evicted meanwhile"""
+        now = time.time()
+        try:
+            os.utime(self._entry_dir(key), (now, now))
+        except OSError:
+            pass
+
+    def source_path(self, key: str) -> Optional[str]:
+        """Path of the full-file Parquet copy, None if the entry has none"""
+        path = os.path.join(self._entry_dir(key), self.SOURCE_FILE)
+        return path if os.path.exists(path) else None
+
+    def put(self, key: str, columns_info: Optional[Dict], df_preview: Optional[pd.DataFrame],
+            df_source: Optional[pd.DataFrame] = None):
+        """
+        Store entry atomically (write to temp dir, then rename), then evict if over budget.
+        columns_info / df_preview None: only the full-file copy is stored (entry is never a hit).
+        """
+        from services.preprocessing import dataframe_to_arrow
+        import pyarrow.parquet as pq
+
+        entry_dir = self._entry_dir(key)
+        tmp_dir = f"{entry_dir}.tmp-{os.getpid()}-{time.time_ns()}"
+        os.makedirs(tmp_dir)
+        try:
+            if columns_info is not None and df_preview is not None:
+                # Plain JSON, not pickle: the cache dir may be shared / writable by others
+                with open(os.path.join(tmp_dir, self.COLUMNS_INFO_FILE), 'w', encoding='utf-8') as f:
+                    json.dump([[_encode_label(label), info] for label, info in columns_info.items()],
+                              f, default=_json_default)
+
+                preview = df_preview.copy()
+                preview.columns = [str(col) for col in preview.columns]
+                # Index = original row number of the sampled rows, kept in the file
+                pq.write_table(dataframe_to_arrow(preview, preserve_index=True),
+                               os.path.join(tmp_dir, self.PREVIEW_FILE))
+
+            if df_source is not None:
+                source = df_source.copy(deep=False)
+                source.columns = [str(col) for col in source.columns]
+                pq.write_table(
+                    dataframe_to_arrow(source),
+                    os.path.join(tmp_dir, self.SOURCE_FILE),
+                    row_group_size=self.SOURCE_ROW_GROUP_ROWS
+                )
+
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            os.replace(tmp_dir, entry_dir)
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+        self.evict()
+
+    def _entries(self):
+        """[(mtime, size, path)] for all complete entries"""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if not os.path.isdir(path) or '.tmp-' in name:
+                continue
+            try:
+                size = sum(
+                    os.path.getsize(os.path.join(root, file))
+                    for root, _, files in os.walk(path) for file in files
+                )
+                entries.append((os.path.getmtime(path), size, path))
+            except OSError:
+                continue  # removed by another session meanwhile
+        return entries
+
+    def size_bytes(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self):
+        """Remove least recently used entries until total size <= max_bytes"""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+
+    def invalidate(self, key: str):
+        shutil.rmtree(self._entry_dir(key), ignore_errors=True)
+
+    def clear(self):
+        for _, _, path in self._entries():
+            shutil.rmtree(path, ignore_errors=True)
@@ -0,0 +1,409 @@
+# services/profiling.py
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, Optional
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+from services.config import PROFILE_WORKERS
+from services.sketches import HyperLogLog, SpaceSaving, Reservoir
+
+SAMPLE_SIZE = 5
+
+# Approximate (sketch) mode
+PROFILE_CHUNK_SIZE = 100_000
+HLL_PRECISION = 14
+TOP_K = 10
+TOP_K_CAPACITY = 64
+
+def _to_arrow(series: pd.Series) -> Optional[pa.Array]:
+    """Convert column to Arrow array (NaN -> null). Returns None for mixed or all-null object columns."""
+    try:
+        arr = pa.array(series, from_pandas=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+        return None
+    if pa.types.is_dictionary(arr.type):
+        arr = arr.dictionary_decode()
+    if pa.types.is_null(arr.type):
+        return None
+    return arr
+
+def _json_value(value):
+    """Keep numbers as-is, everything else (dates, strings) as string"""
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+def _arrow_stats(arr: pa.Array, distinct: bool = True) -> Dict:
+    """Column stats using Arrow compute kernels (one kernel per stat, no Python loop)"""
+    stats = {
+        'null_count': arr.null_count,
+        'unique_count': pc.count_distinct(arr, mode='only_valid').as_py() if distinct else None,
+        'min': None,
+        'max': None,
+        'min_length': None,
+        'max_length': None,
+        'avg_length': None,
+    }
+
+    if arr.null_count < len(arr):
+        try:
+            min_max = pc.min_max(arr)
+            stats['min'] = _json_value(min_max['min'].as_py())
+            stats['max'] = _json_value(min_max['max'].as_py())
+        except (pa.ArrowNotImplementedError, pa.ArrowInvalid):
+            pass
+
+        if pa.types.is_string(arr.type) or pa.types.is_large_string(arr.type):
+            lengths = pc.utf8_length(arr)
+            length_min_max = pc.min_max(lengths)
+            stats['min_length'] = length_min_max['min'].as_py()
+            stats['max_length'] = length_min_max['max'].as_py()
+            stats['avg_length'] = round(pc.mean(lengths).as_py(), 2)
+
+    valid_mask = pc.is_valid(arr).to_numpy(zero_copy_only=False)
+    stats['valid_positions'] = np.flatnonzero(valid_mask)
+    return stats
+
+def _pandas_stats(series: pd.Series, distinct: bool = True) -> Dict:
+    """Fallback for columns Arrow cannot represent (e.g. object column with int + str)"""
+    valid_mask = series.notna().to_numpy()
+    valid = series[valid_mask]
+    lengths = valid.astype(str).str.len()
+
+    return {
+        'null_count': int(len(series) - valid_mask.sum()),
+        'unique_count': int(valid.nunique()) if distinct else None,
+        'min': None,
+        'max': None,
+        'min_length': int(lengths.min()) if len(lengths) else None,
+        'max_length': int(lengths.max()) if len(lengths) else None,
+        'avg_length': round(float(lengths.mean()), 2) if len(lengths) else None,
+        'valid_positions': np.flatnonzero(valid_mask),
+    }
+
+# Target type suggestion
+MAX_DECIMALS = 15
+VARCHAR_MAX_LENGTH = 8000
+VARCHAR_LENGTHS = [16, 32, 64, 128, 256, 512, 1024, 2048, 4000, 8000]
+
+def _max_decimals(values: np.ndarray) -> int:
+    """Number of decimal places needed to represent all values (vectorized, capped at MAX_DECIMALS)"""
+    values = values[np.isfinite(values)]
+    for decimals in range(MAX_DECIMALS + 1):
+        scaled = values * 10.0 ** decimals
+        # Absolute tolerance only: a relative one would swallow the fraction of large values
+        if np.isclose(scaled, np.round(scaled), rtol=0, atol=1e-6).all():
+            return decimals
+    return MAX_DECIMALS
+
+def _infer_type(series: pd.Series, valid_positions: Optional[np.ndarray] = None):
+    """
+    Inferred type + type detail stats in one pass, same result as infer_column_type:
+    - numeric: whole numbers (exact check, _is_integral) -> 'integer', else 'float' + max_decimals
+    - datetime dtype -> 'date' + has_time
+    - anything else: date parse of a bounded sample of the valid values -> 'date' + has_time, else 'text'
+    valid_positions: positions of non-null values (from the column stats), None = all valid.
+    Returns (inferred_type, {'has_time', 'max_decimals'})
+    """
+    from services.preprocessing import DATE_SAMPLE_SIZE, parse_date_sample, _is_integral
+
+    details = {'has_time': None, 'max_decimals': None}
+    if pd.api.types.is_numeric_dtype(series):
+        if _is_integral(series):
+            return 'integer', details
+        values = series.to_numpy(dtype='float64', na_value=np.nan)
+        details['max_decimals'] = _max_decimals(values[~np.isnan(values)])
+        return 'float', details
+
+    if pd.api.types.is_datetime64_any_dtype(series):
+        parsed = series.dropna()
+    else:
+        if valid_positions is None:
+            valid_positions = np.arange(len(series))
+        if len(valid_positions) > DATE_SAMPLE_SIZE:
+            picks = np.unique(np.linspace(0, len(valid_positions) - 1, DATE_SAMPLE_SIZE).astype(np.int64))
+            valid_positions = valid_positions[picks]
+        parsed = parse_date_sample(series.iloc[valid_positions])
+        if parsed is None:
+            return 'text', details
+        parsed = parsed.dropna()
+    details['has_time'] = bool((parsed != parsed.dt.normalize()).any()) if len(parsed) else None
+    return 'date', details
+
+def suggest_target_type(info: Dict) -> Dict:
+    """
+    Recommend a target type (one of Step 2 AVAILABLE_TYPES) from profile stats.
+    Returns {'suggested_type', 'suggestion_confidence' (0-1), 'suggestion_reason', 'suggested_length'}
+    """
+    from services.preprocessing import INT32_MIN, INT32_MAX
+
+    inferred_type = info['inferred_type']
+    suggestion = {'suggested_type': 'Default', 'suggestion_confidence': 0.0,
+                  'suggestion_reason': 'No values', 'suggested_length': None}
+    if not info['sample_values']:
+        return suggestion
+
+    if inferred_type == 'integer' and isinstance(info.get('min'), (int, float)):
+        fits_int = INT32_MIN <= info['min'] and info['max'] <= INT32_MAX
+        suggestion.update(
+            suggested_type='int' if fits_int else 'bigint',
+            suggestion_confidence=0.95 if 'int' in info['dtype'] else 0.85,
+            suggestion_reason=f"Whole numbers, range {info['min']:,.0f} to {info['max']:,.0f}"
+        )
+    elif inferred_type == 'float':
+        suggestion.update(
+            suggested_type='float',
+            suggestion_confidence=0.9,
+            suggestion_reason=f"Decimal numbers, up to {info.get('max_decimals')} decimal places"
+        )
+    elif inferred_type == 'date':
+        has_time = info.get('has_time')
+        suggestion.update(
+            suggested_type='datetime' if has_time else 'date',
+            suggestion_confidence=0.95 if 'datetime' in info['dtype'] else 0.75,
+            suggestion_reason='Dates with time component' if has_time else 'Dates without time component'
+        )
+    elif inferred_type == 'text':
+        max_length = info.get('max_length') or 0
+        if max_length <= VARCHAR_MAX_LENGTH:
+            length = next(size for size in VARCHAR_LENGTHS if size >= max_length)
+            suggestion.update(
+                suggested_type='varchar',
+                suggestion_confidence=0.8,
+                suggestion_reason=f"Text, max length {max_length} -> varchar({length})",
+                suggested_length=length
+            )
+        else:
+            suggestion.update(
+                suggested_type='string',
+                suggestion_confidence=0.8,
+                suggestion_reason=f"Long text, max length {max_length}"
+            )
+
+    if info.get('unique_count_is_approx'):
+        suggestion['suggestion_confidence'] = round(suggestion['suggestion_confidence'] * 0.9, 2)
+    return suggestion
+
+def profile_column(series: pd.Series, total_rows: Optional[int] = None) -> Dict:
+    """
+    Profile one column: nulls, distinct count, min/max, string length stats and samples.
+    Every stat is computed once (Arrow kernels when possible), the result keeps
+    the columns_info contract of extract_columns_metadata.
+    """
+    if total_rows is None:
+        total_rows = len(series)
+
+    arr = _to_arrow(series)
+    stats = _arrow_stats(arr) if arr is not None else _pandas_stats(series)
+    valid_positions = stats.pop('valid_positions')
+    inferred_type, type_details = _infer_type(series, valid_positions)
+
+    info = {
+        'dtype': str(series.dtype),
+        'null_count': int(stats['null_count']),
+        'null_percentage': round(stats['null_count'] / total_rows * 100, 2) if total_rows else 0.0,
+        'unique_count': int(stats['unique_count']),
+        'sample_values': series.iloc[valid_positions[:SAMPLE_SIZE]].astype(str).tolist(),
+        'inferred_type': inferred_type,
+        'unique_count_is_approx': False,
+        'min': stats['min'],
+        'max': stats['max'],
+        'min_length': stats['min_length'],
+        'max_length': stats['max_length'],
+        'avg_length': stats['avg_length'],
+        **type_details,
+    }
+    info.update(suggest_target_type(info))
+    return info
+
+# Length histogram buckets: [0], [1], [2-3], [4-7], ... [2^k, 2^(k+1))
+LENGTH_BUCKETS = 18
+
+def _merge_min_max(current, new_min, new_max):
+    """Merge chunk min/max into running (min, max). Incomparable types -> False for good."""
+    if current is False or new_min is None:
+        return current
+    if current is None:
+        return (new_min, new_max)
+    try:
+        return (min(current[0], new_min), max(current[1], new_max))
+    except TypeError:
+        return False
+
+def _vote_type(type_votes: Dict) -> str:
+    """Resolve per-chunk inferred types into one column type"""
+    voted = {t for t, count in type_votes.items() if count}
+    if not voted:
+        return 'integer' if not type_votes else next(iter(type_votes))
+    if len(voted) == 1:
+        return voted.pop()
+    if voted == {'integer', 'float'}:
+        return 'float'
+    return 'text'
+
+class ColumnStats:
+    """
+    Mergeable column statistics, updated chunk by chunk (see profile_column_approx).
+    Memory is fixed (sketches + counters), and partial profiles can be merged.
+    """
+
+    def __init__(self):
+        self.row_count = 0
+        self.null_count = 0
+        self.dtypes = set()
+        self.type_votes: Dict[str, int] = {}
+        self.min_max = None
+        self.length_histogram = np.zeros(LENGTH_BUCKETS, dtype=np.int64)
+        self.length_min = None
+        self.length_max = None
+        self.length_sum = 0
+        self.has_time = None
+        self.max_decimals = None
+        self.hll = HyperLogLog(HLL_PRECISION)
+        self.top_values = SpaceSaving(TOP_K_CAPACITY)
+        self.reservoir = Reservoir(SAMPLE_SIZE)
+
+    def update(self, chunk: pd.Series):
+        self.row_count += len(chunk)
+        self.dtypes.add(str(chunk.dtype))
+        valid = chunk[chunk.notna()]
+        self.null_count += len(chunk) - len(valid)
+
+        chunk_type, details = _infer_type(valid)
+        self.type_votes[chunk_type] = self.type_votes.get(chunk_type, 0) + len(valid)
+        if valid.empty:
+            return
+
+        if details['has_time'] is not None:
+            self.has_time = bool(self.has_time) or details['has_time']
+        if details['max_decimals'] is not None:
+            self.max_decimals = max(self.max_decimals or 0, details['max_decimals'])
+
+        self.hll.update(valid)
+        self.top_values.update(valid)
+        self.reservoir.update(valid)
+
+        arr = _to_arrow(valid)
+        stats = _arrow_stats(arr, distinct=False) if arr is not None else _pandas_stats(valid, distinct=False)
+        self.min_max = _merge_min_max(self.min_max, stats['min'], stats['max'])
+
+        if stats['min_length'] is not None:
+            if arr is not None:
+                lengths = pc.utf8_length(arr).to_numpy(zero_copy_only=False)
+            else:
+                lengths = valid.astype(str).str.len().to_numpy()
+            buckets = np.minimum(np.floor(np.log2(lengths + 1)).astype(np.int64), LENGTH_BUCKETS - 1)
+            self.length_histogram += np.bincount(buckets, minlength=LENGTH_BUCKETS)
+            self.length_min = stats['min_length'] if self.length_min is None else min(self.length_min, stats['min_length'])
+            self.length_max = stats['max_length'] if self.length_max is None else max(self.length_max, stats['max_length'])
+            self.length_sum += int(lengths.sum())
+
+    def merge(self, other: "ColumnStats") -> "ColumnStats":
+        self.row_count += other.row_count
+        self.null_count += other.null_count
+        self.dtypes |= other.dtypes
+        for chunk_type, count in other.type_votes.items():
+            self.type_votes[chunk_type] = self.type_votes.get(chunk_type, 0) + count
+        if other.min_max is False:
+            self.min_max = False
+        elif other.min_max:
+            self.min_max = _merge_min_max(self.min_max, *other.min_max)
+        self.length_histogram += other.length_histogram
+        if other.length_min is not None:
+            self.length_min = other.length_min if self.length_min is None else min(self.length_min, other.length_min)
+            self.length_max = other.length_max if self.length_max is None else max(self.length_max, other.length_max)
+        self.length_sum += other.length_sum
+        if other.has_time is not None:
+            self.has_time = bool(self.has_time) or other.has_time
+        if other.max_decimals is not None:
+            self.max_decimals = max(self.max_decimals or 0, other.max_decimals)
+        self.hll.merge(other.hll)
+        self.top_values.merge(other.top_values)
+        self.reservoir.merge(other.reservoir)
+        return self
+
+    def to_info(self, total_rows: Optional[int] = None) -> Dict:
+        """Final output, same shape as extract_columns_metadata(approximate=True)"""
+        total_rows = self.row_count if total_rows is None else total_rows
+        length_count = int(self.length_histogram.sum())
+        dtype = next(iter(self.dtypes)) if len(self.dtypes) == 1 else 'object'
+
+        info = {
+            'dtype': dtype,
+            'null_count': int(self.null_count),
+            'null_percentage': round(self.null_count / total_rows * 100, 2) if total_rows else 0.0,
+            'unique_count': self.hll.estimate(),
+            'sample_values': [str(v) for v in self.reservoir.items],
+            'inferred_type': _vote_type(self.type_votes),
+            'unique_count_is_approx': True,
+            'unique_count_error': round(float(self.hll.relative_error), 4),
+            'top_values': [
+                {'value': str(item['value']), 'count': item['count'], 'error': item['error']}
+                for item in self.top_values.top(TOP_K)
+            ],
+            'top_values_max_error': self.top_values.max_error,
+            'min': self.min_max[0] if self.min_max else None,
+            'max': self.min_max[1] if self.min_max else None,
+            'min_length': self.length_min,
+            'max_length': self.length_max,
+            'avg_length': round(self.length_sum / length_count, 2) if length_count else None,
+            'length_histogram': self.length_histogram.tolist(),
+            'has_time': self.has_time,
+            'max_decimals': self.max_decimals,
+        }
+        info.update(suggest_target_type(info))
+        return info
+
+def profile_column_approx(series: pd.Series, total_rows: Optional[int] = None) -> Dict:
+    """
+    Sketch-based profile: HyperLogLog for unique_count, space-saving top-k for frequent values
+    and a reservoir for sample_values. Column is fed to a ColumnStats in PROFILE_CHUNK_SIZE
+    chunks, so profiling memory does not grow with row count.
+    """
+    stats = ColumnStats()
+    for start in range(0, len(series), PROFILE_CHUNK_SIZE):
+        stats.update(series.iloc[start:start + PROFILE_CHUNK_SIZE])
+    return stats.to_info(total_rows)
+
+def profile_columns(df: pd.DataFrame, approximate: bool = False,
+                    max_workers: Optional[int] = None, use_processes: bool = False,
+                    progress_callback: Optional[Callable[[int, int], None]] = None) -> Dict:
+    """
+    Profile all columns of a DataFrame, sharded across workers.
+    - threads (default): Arrow/NumPy kernels release the GIL
+    - use_processes=True: for Python-heavy inference (columns are pickled to the workers)
+    Result keeps df column order regardless of which worker finishes first.
+    progress_callback(columns_done, total_columns) is called as columns finish
+    (raise from the callback to abort, pending columns are cancelled).
+    """
+    profile = profile_column_approx if approximate else profile_column
+    max_workers = PROFILE_WORKERS if max_workers is None else max_workers
+    columns = list(df.columns)
+    total_rows = len(df)
+
+    if max_workers <= 1 or len(columns) <= 1:
+        result = {}
+        for col in columns:
+            result[col] = profile(df[col], total_rows)
+            if progress_callback:
+                progress_callback(len(result), len(columns))
+        return result
+
+    max_workers = min(max_workers, len(columns))
+    if use_processes:
+        executor = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context('spawn'))
+    else:
+        executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='profile')
+
+    try:
+        futures = [executor.submit(profile, df[col], total_rows) for col in columns]
+        if progress_callback:
+            for done, _ in enumerate(as_completed(futures), start=1):
+                progress_callback(done, len(columns))
+        return dict(zip(columns, (future.result() for future in futures)))
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,175 @@
+# services/raw_grid.py
+from io import BytesIO
+from typing import Dict, List, Optional
+import numpy as np
+import pandas as pd
+
+# Rows kept as Python objects (candidate header rows), the rest is stored as Arrow
+HEADER_ZONE_ROWS = 50
+
+
+def _header_labels(values) -> List:
+    """Column labels like pandas: empty -> 'Unnamed: i', duplicates -> 'name.1'"""
+    seen: Dict = {}
+    labels = []
+    for idx, name in enumerate(values):
+        name = f"Unnamed: {idx}" if name is None or pd.isna(name) or name == "" else name
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        labels.append(name)
+    return labels
+
+
+class RawGrid:
+    """
+    Headerless row grid of one loaded sheet / CSV.
+
+    The first HEADER_ZONE_ROWS rows are kept as an object DataFrame, the remaining rows
+    as a typed Arrow table (compact). Changing header_row / leading rows to delete is
+    then a slice + relabel, no re-download or re-parse.
+    """
+
+    def __init__(self, raw: pd.DataFrame, kind: str = 'excel'):
+        from services.preprocessing import dataframe_to_arrow
+
+        self.kind = kind
+        self.num_rows = len(raw)
+        self.num_columns = raw.shape[1]
+        raw = raw.copy(deep=False)
+        raw.columns = [str(i) for i in range(self.num_columns)]
+        self.top = raw.iloc[:HEADER_ZONE_ROWS].reset_index(drop=True)
+        rest = raw.iloc[HEADER_ZONE_ROWS:]
+        self.rest = dataframe_to_arrow(rest.infer_objects() if kind == 'excel' else rest)
+
+    def memory_bytes(self) -> int:
+        return int(self.top.memory_usage(deep=True).sum()) + self.rest.nbytes
+
+    def _convert(self, body: pd.DataFrame) -> pd.DataFrame:
+        """Re-infer column dtypes after the header rows are sliced off"""
+        if self.kind == 'excel':
+            return body.infer_objects()
+        # CSV grid is read as text, convert numeric columns like read_csv does
+        for col in body.columns:
+            try:
+                body[col] = pd.to_numeric(body[col])
+            except (ValueError, TypeError):
+                pass
+        return body
+
+    def with_header(self, header_row: int = 0) -> pd.DataFrame:
+        """DataFrame using row `header_row` as header, rows above it are dropped"""
+        if header_row < 0 or header_row >= self.num_rows:
+            raise ValueError(f"Header row {header_row} out of range (0-{self.num_rows - 1})")
+
+        rest = self.rest.to_pandas()
+        if header_row < len(self.top):
+            labels = _header_labels(self.top.iloc[header_row].tolist())
+            body = pd.concat([self.top.iloc[header_row + 1:], rest], ignore_index=True)
+        else:
+            rest_header = header_row - len(self.top)
+            labels = _header_labels(rest.iloc[rest_header].tolist())
+            body = rest.iloc[rest_header + 1:].reset_index(drop=True)
+
+        body = self._convert(body)
+        body.columns = labels
+        return body
+
+    def changed_columns(self, old_header: int, new_header: int) -> List[int]:
+        """
+        Column positions whose body values differ between the two header rows:
+        columns with any non-null value in the rows that move in or out of the body.
+        """
+        low, high = sorted((old_header, new_header))
+        if high >= len(self.top):
+            return list(range(self.num_columns))
+        delta = self.top.iloc[low + 1:high + 1]
+        return [int(i) for i in np.flatnonzero(delta.notna().any(axis=0).to_numpy())]
+
+
+def read_raw_frame(file_bytes: BytesIO, file_name: str, sheet_name: Optional[str] = None,
+                   csv_delimiter: str = "comma") -> pd.DataFrame:
+    """Parse a file without header (same readers as process_file_to_dataframe)"""
+    if file_name.lower().endswith(".xlsx") or file_name.lower().endswith(".xls"):
+        from services.preprocessing import read_excel_with_repair
+        return read_excel_with_repair(file_bytes, sheet_name or 0, None, file_name)
+
+    elif file_name.lower().endswith(".csv"):
+        import io
+        text = file_bytes.getvalue().decode("utf-8", errors="ignore")
+        delimiter_map = {
+            "comma": ",", "semicolon": ";",
+            "tab": "\t", "pipe": "|"
+        }
+        delimiter = delimiter_map.get(csv_delimiter, ",")
+        try:
+            return pd.read_csv(io.StringIO(text), delimiter=delimiter, header=None, dtype=str)
+        except pd.errors.ParserError:
+            # Ragged rows (title / preamble lines above the header): pad every row to the widest one
+            import csv
+            max_fields = max((len(row) for row in csv.reader(io.StringIO(text), delimiter=delimiter)), default=1)
+            return pd.read_csv(io.StringIO(text), delimiter=delimiter, header=None, dtype=str,
+                               names=range(max_fields))
+
+    else:
+        raise ValueError(f"Unsupported file type: {file_name}")
+
+
+def load_raw_grid(file_bytes: BytesIO, file_name: str, sheet_name: Optional[str] = None,
+                  csv_delimiter: str = "comma", workbook=None, executor=None,
+                  cancel_event=None) -> RawGrid:
+    """
+    Raw headerless grid of a file.
+    workbook: already opened WorkbookSession of this file (sheet switch without re-open)
+    executor: ParseExecutor, parse runs in an isolated worker process
+    cancel_event: threading.Event, kills a parse running in the executor
+    """
+    kind = 'csv' if file_name.lower().endswith(".csv") else 'excel'
+    if workbook is not None and kind == 'excel':
+        raw = workbook.parse(sheet_name or 0, header=None, cancel_event=cancel_event)
+    elif executor is not None:
+        raw = executor.run('read_raw_frame', file_bytes, cancel_event=cancel_event, file_name=file_name,
+                           sheet_name=sheet_name, csv_delimiter=csv_delimiter)
+    else:
+        raw = read_raw_frame(file_bytes, file_name, sheet_name, csv_delimiter)
+    return RawGrid(raw, kind=kind)
+
+
+def reheader_columns_info(grid: RawGrid, old_header: int, new_header: int, old_columns_info: Dict,
+                          df: pd.DataFrame, approximate: bool = False,
+                          max_workers: Optional[int] = None, progress_callback=None) -> Dict:
+    """
+    columns_info for `df` (grid.with_header(new_header)) reusing the old profile:
+    only columns with non-null values in the shifted rows are re-profiled, the others
+    keep their stats (renamed, null counts adjusted for the added/removed empty rows).
+    """
+    from services.profiling import profile_columns, suggest_target_type
+
+    old_infos = list(old_columns_info.values())
+    if len(old_infos) != len(df.columns):
+        return profile_columns(df, approximate=approximate, max_workers=max_workers,
+                               progress_callback=progress_callback)
+
+    changed = set(grid.changed_columns(old_header, new_header))
+    reprofiled = profile_columns(
+        df.iloc[:, sorted(changed)], approximate=approximate, max_workers=max_workers,
+        progress_callback=progress_callback
+    ) if changed else {}
+
+    total_rows = len(df)
+    row_delta = old_header - new_header  # rows added to the body (negative = removed)
+    columns_info = {}
+    for position, col in enumerate(df.columns):
+        if position in changed:
+            columns_info[col] = reprofiled[col]
+            continue
+        info = dict(old_infos[position])
+        info['null_count'] = max(0, info['null_count'] + row_delta)
+        info['null_percentage'] = round(info['null_count'] / total_rows * 100, 2) if total_rows else 0.0
+        # Empty rows entering / leaving the body can change the dtype (int <-> float with NaN)
+        info['dtype'] = str(df[col].dtype)
+        info.update(suggest_target_type(info))
+        columns_info[col] = info
+    return columns_info
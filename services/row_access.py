@@ -0,0 +1,67 @@
+# services/row_access.py
+import os
+from functools import lru_cache
+from typing import Iterable, List, Optional
+import numpy as np
+import pandas as pd
+
+
+class RowRangeAccessor:
+    """
+    Random row access over the Parquet copy of a fetched file.
+
+    Row-group boundaries come from the Parquet footer, so fetching rows only
+    decodes the row groups that contain them (no workbook re-parse).
+    """
+
+    def __init__(self, path: str):
+        import pyarrow.parquet as pq
+
+        self.path = path
+        self.parquet_file = pq.ParquetFile(path)
+        metadata = self.parquet_file.metadata
+        row_group_rows = [metadata.row_group(i).num_rows for i in range(metadata.num_row_groups)]
+        # row_group_starts[i] = first row number of row group i
+        self.row_group_starts = np.concatenate([[0], np.cumsum(row_group_rows)]).astype(np.int64)
+        self.num_rows = int(metadata.num_rows)
+
+    @staticmethod
+    def _to_frame(table, row_numbers: np.ndarray, column_labels: Optional[List]) -> pd.DataFrame:
+        df = table.to_pandas()
+        df.index = pd.Index(row_numbers)
+        # Parquet only keeps string column names, restore original labels
+        if column_labels is not None and len(column_labels) == len(df.columns):
+            df.columns = list(column_labels)
+        return df
+
+    def take(self, indices: Iterable[int], column_labels: Optional[List] = None) -> pd.DataFrame:
+        """Rows by original row number (out-of-range indices are ignored), in row order"""
+        import pyarrow as pa
+
+        indices = np.unique(np.asarray(list(indices), dtype=np.int64))
+        indices = indices[(indices >= 0) & (indices < self.num_rows)]
+        if not len(indices):
+            return self._to_frame(self.parquet_file.schema_arrow.empty_table(), indices, column_labels)
+
+        row_groups = np.searchsorted(self.row_group_starts, indices, side='right') - 1
+        tables = []
+        for row_group in np.unique(row_groups):
+            local = indices[row_groups == row_group] - self.row_group_starts[row_group]
+            table = self.parquet_file.read_row_group(int(row_group))
+            tables.append(table.take(pa.array(local)))
+        return self._to_frame(pa.concat_tables(tables), indices, column_labels)
+
+    def range(self, start: int, stop: int, column_labels: Optional[List] = None) -> pd.DataFrame:
+        """Rows [start, stop) by original row number"""
+        start, stop = max(0, start), min(stop, self.num_rows)
+        return self.take(range(start, stop) if start < stop else [], column_labels)
+
+
+@lru_cache(maxsize=16)
+def _cached_accessor(path: str, mtime: float) -> RowRangeAccessor:
+    return RowRangeAccessor(path)
+
+
+def open_row_accessor(path: str) -> RowRangeAccessor:
+    """Reuse the parsed Parquet footer across Streamlit reruns (keyed by path + mtime)"""
+    return _cached_accessor(path, os.path.getmtime(path))
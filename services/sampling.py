@@ -0,0 +1,115 @@
+# services/sampling.py
+from typing import Iterable, Optional
+import numpy as np
+import pandas as pd
+
+SAMPLE_CHUNK_ROWS = 100_000
+
+
+class RowSampler:
+    """
+    Bounded, representative row sample built while streaming a file chunk by chunk.
+
+    - first head_rows and last tail_rows rows are always included
+    - the rest is a uniform reservoir sample over the whole file (Algorithm R)
+    Memory stays at ~sample_size rows regardless of file size. The result keeps
+    the original row numbers as index and is sorted in file order.
+    """
+
+    def __init__(self, sample_size: int = 100, head_rows: Optional[int] = None,
+                 tail_rows: Optional[int] = None, seed: Optional[int] = 0):
+        self.head_rows = max(1, sample_size // 5) if head_rows is None else head_rows
+        self.tail_rows = max(1, sample_size // 5) if tail_rows is None else tail_rows
+        self.reservoir_size = max(0, sample_size - self.head_rows - self.tail_rows)
+        self.rng = np.random.default_rng(seed)
+
+        self.rows_seen = 0
+        self.reservoir_seen = 0
+        self.head = None
+        self.tail = None
+        self.reservoir = None
+        self.slot_rows = np.empty(0, dtype=np.int64)
+
+    def update(self, chunk: pd.DataFrame):
+        chunk = chunk.reset_index(drop=True)
+        chunk.index = chunk.index + self.rows_seen
+        self.rows_seen += len(chunk)
+
+        # Head
+        head_count = len(self.head) if self.head is not None else 0
+        if head_count < self.head_rows:
+            take = chunk.iloc[:self.head_rows - head_count]
+            self.head = take if self.head is None else pd.concat([self.head, take])
+            chunk = chunk.iloc[len(take):]
+
+        # Tail (last tail_rows seen so far)
+        if self.tail_rows:
+            self.tail = chunk.iloc[-self.tail_rows:] if self.tail is None else \
+                pd.concat([self.tail, chunk.iloc[-self.tail_rows:]]).iloc[-self.tail_rows:]
+
+        if chunk.empty or not self.reservoir_size:
+            return
+        self._update_reservoir(chunk)
+
+    def _update_reservoir(self, chunk: pd.DataFrame):
+        # Fill free slots first
+        free = self.reservoir_size - len(self.slot_rows)
+        if free > 0:
+            fill = chunk.iloc[:free]
+            self.reservoir = fill if self.reservoir is None else pd.concat([self.reservoir, fill])
+            self.slot_rows = np.concatenate([self.slot_rows, fill.index.to_numpy()])
+            self.reservoir_seen += len(fill)
+            chunk = chunk.iloc[len(fill):]
+            if chunk.empty:
+                return
+
+        # Item number i replaces slot j if j < reservoir_size, j ~ U[0, i)
+        positions = np.arange(self.reservoir_seen + 1, self.reservoir_seen + len(chunk) + 1)
+        slots = self.rng.integers(0, positions)
+        self.reservoir_seen += len(chunk)
+
+        hits = np.flatnonzero(slots < self.reservoir_size)
+        if not len(hits):
+            return
+        # Later rows win when the same slot is hit several times in one chunk
+        winners = {}
+        for pos in hits:
+            winners[slots[pos]] = pos
+        replaced_slots = np.fromiter(winners.keys(), dtype=np.int64)
+        new_positions = np.fromiter(winners.values(), dtype=np.int64)
+
+        self.reservoir = pd.concat([
+            self.reservoir.drop(index=self.slot_rows[replaced_slots]),
+            chunk.iloc[new_positions]
+        ])
+        self.slot_rows[replaced_slots] = chunk.index.to_numpy()[new_positions]
+
+    def result(self) -> pd.DataFrame:
+        parts = [part for part in (self.head, self.reservoir, self.tail) if part is not None]
+        if not parts:
+            return pd.DataFrame()
+        sample = pd.concat(parts)
+        sample = sample[~sample.index.duplicated(keep='first')]
+        return sample.sort_index()
+
+
+def sample_chunks(chunks: Iterable[pd.DataFrame], sample_size: int = 100, **kwargs) -> pd.DataFrame:
+    """Representative sample from a stream of DataFrame chunks"""
+    sampler = RowSampler(sample_size, **kwargs)
+    for chunk in chunks:
+        sampler.update(chunk)
+    return sampler.result()
+
+
+def representative_sample(df: pd.DataFrame, sample_size: int = 100, **kwargs) -> pd.DataFrame:
+    """
+    Representative sample of an in-memory DataFrame (head + reservoir + tail).
+    Small frames (<= sample_size rows) are returned as-is.
+    """
+    if len(df) <= sample_size:
+        return df
+    return sample_chunks(
+        (df.iloc[start:start + SAMPLE_CHUNK_ROWS] for start in range(0, len(df), SAMPLE_CHUNK_ROWS)),
+        sample_size,
+        **kwargs
+    )
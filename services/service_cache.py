@@ -0,0 +1,142 @@
+# services/service_cache.py
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+from services.config import LISTING_CACHE_TTL_SECONDS, PREVIEW_CACHE_TTL_SECONDS
+
+
+class TTLCache:
+    """
+    Thread-safe in-process cache shared by all sessions: entries expire after ttl seconds,
+    at most max_entries are kept (least recently used dropped first).
+    Concurrent misses on the same key run the factory once.
+    """
+
+    def __init__(self, ttl: Optional[float] = None, max_entries: int = 256):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self._key_locks: Dict[Hashable, threading.Lock] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _lookup(self, key: Hashable, default: Any) -> Any:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None or (item[0] is not None and item[0] < time.time()):
+                self._data.pop(key, None)
+                return default
+            self._data.move_to_end(key)
+            return item[1]
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        missing = object()
+        value = self._lookup(key, missing)
+        if value is missing:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        ttl = self.ttl if ttl is None else ttl
+        with self._lock:
+            self._data[key] = (time.time() + ttl if ttl else None, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def get_or_set(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        missing = object()
+        value = self.get(key, missing)
+        if value is not missing:
+            return value
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            # Another thread may have filled it while we waited
+            value = self._lookup(key, missing)
+            if value is missing:
+                value = factory()
+                self.set(key, value)
+        with self._lock:
+            self._key_locks.pop(key, None)
+        return value
+
+    def invalidate(self, key: Optional[Hashable] = None, predicate: Optional[Callable[[Hashable], bool]] = None):
+        """Drop one key, keys matching predicate, or everything (no arguments)"""
+        with self._lock:
+            if key is not None:
+                self._data.pop(key, None)
+            elif predicate is not None:
+                for k in [k for k in self._data if predicate(k)]:
+                    del self._data[k]
+            else:
+                self._data.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {'entries': len(self._data), 'hits': self.hits, 'misses': self.misses}
+
+
+# Folder listings: (site_id, drive_id, folder_path) -> [file items]
+# Short TTL: items carry pre-authenticated download URLs that expire
+LISTING_CACHE = TTLCache(ttl=LISTING_CACHE_TTL_SECONDS, max_entries=128)
+
+# Fetch results per file version + parse options (ProfileCache key) -> (columns_info, df_preview, source_path)
+PREVIEW_CACHE = TTLCache(ttl=PREVIEW_CACHE_TTL_SECONDS, max_entries=32)
+
+# SharePoint clients: (site_id, drive_id) -> SharePointService (token refreshed by auth on expiry)
+SERVICE_CACHE = TTLCache(ttl=None, max_entries=8)
+
+
+def get_sharepoint_service(site_id: str, drive_id: str):
+    """Shared SharePointService per site/drive"""
+    from services.sharepoint_services import SharePointService
+
+    return SERVICE_CACHE.get_or_set((site_id, drive_id), lambda: SharePointService(site_id=site_id, drive_id=drive_id))
+
+
+def cached_folder_listing(site_id: str, drive_id: str, folder_path: str, loader: Callable[[], list],
+                          refresh: bool = False) -> list:
+    """Folder listing from cache, refresh=True reloads it and replaces the cached entry"""
+    key = (site_id, drive_id, folder_path.strip('/'))
+    if refresh:
+        listing = loader()
+        LISTING_CACHE.set(key, listing)
+        return listing
+    return LISTING_CACHE.get_or_set(key, loader)
+
+
+def invalidate_listings(folder_path: Optional[str] = None):
+    if folder_path is None:
+        LISTING_CACHE.invalidate()
+    else:
+        LISTING_CACHE.invalidate(predicate=lambda key: key[2] == folder_path.strip('/'))
+
+
+def invalidate_previews():
+    """
+    Drop in-memory fetch results (next fetch re-reads the on-disk profile cache).
+    On-disk entries are left alone: their full-file copies may be in use by other sessions,
+    the cache evicts them by size.
+    """
+    PREVIEW_CACHE.invalidate()
+
+
+def reset_sharepoint_clients():
+    """Drop cached clients and the Graph token (next call authenticates again)"""
+    from services.auth import auth
+
+    SERVICE_CACHE.invalidate()
+    auth.refresh()
+
+
+def cache_stats() -> Dict:
+    return {
+        'listings': LISTING_CACHE.stats(),
+        'previews': PREVIEW_CACHE.stats(),
+        'services': SERVICE_CACHE.stats(),
+    }
@@ -1,7 +1,7 @@
 # services/sharepoint_service.py
 import requests
 from io import BytesIO
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional
 from services.auth import auth
 from services.preprocessing import list_all_files
 import re
@@ -10,10 +10,31 @@ class SharePointService:
     def __init__(self, site_id: str, drive_id: str):
         self.site_id = site_id
         self.drive_id = drive_id
-        self.token = auth.get_graph_token()
-        self.headers = {"Authorization": f"Bearer {self.token}"}
+        auth.get_graph_token()
     
-    def get_file_metadata(self, FolderPath: str, FilePattern: str) -> Dict:
+    @property
+    def token(self) -> str:
+        # Resolved per request: instances are shared across sessions (services.service_cache)
+        return auth.get_graph_token()
+    
+    @property
+    def headers(self) -> Dict:
+        return {"Authorization": f"Bearer {self.token}"}
+    
+    def list_files(self, FolderPath: str, use_cache: bool = True) -> List[Dict]:
+        """
+        All files under FolderPath (recursive), cached per folder for LISTING_CACHE_TTL_SECONDS
+        use_cache=False lists again and refreshes the cached listing
+        """
+        from services.service_cache import cached_folder_listing
+        folder_url = f"https://graph.microsoft.com/v1.0/sites/{self.site_id}/drives/{self.drive_id}/root:/{FolderPath}:/children"
+        
+        def load():
+            return list_all_files(folder_url, FolderPath, self.headers, self.site_id, self.drive_id)
+        
+        return cached_folder_listing(self.site_id, self.drive_id, FolderPath, load, refresh=not use_cache)
+    
+    def get_file_metadata(self, FolderPath: str, FilePattern: str, use_cache: bool = True) -> Dict:
         """
         Get file metadata without downloading
         Returns: {
@@ -25,13 +46,14 @@ class SharePointService:
         }
         """
 
-        folder_url = f"https://graph.microsoft.com/v1.0/sites/{self.site_id}/drives/{self.drive_id}/root:/{FolderPath}:/children"
-        
-        all_files = list_all_files(folder_url, FolderPath, self.headers, 
-                                    self.site_id, self.drive_id)
+        all_files = self.list_files(FolderPath, use_cache=use_cache)
         
         matched = [f for f in all_files if re.fullmatch(FilePattern, f["name"])]
         
+        if not matched and use_cache:
+            # File may have been uploaded after the listing was cached
+            return self.get_file_metadata(FolderPath, FilePattern, use_cache=False)
+        
         if not matched:
             raise ValueError(f"No files matched pattern: {FilePattern}")
         
@@ -43,14 +65,35 @@ class SharePointService:
         
         return matched[0]
     
-    def download_file(self, download_url: str) -> BytesIO:
-        """Download file content as BytesIO"""
-        response = requests.get(download_url, headers=self.headers)
+    def download_file(self, download_url: str,
+                      progress_callback: Optional[Callable[[int, Optional[int]], None]] = None,
+                      chunk_size: int = 1024 * 1024) -> BytesIO:
+        """
+        Download file content as BytesIO
+        progress_callback(bytes_downloaded, total_bytes or None) is called after every chunk
+        (raise from the callback to abort the download)
+        """
+        if progress_callback is None:
+            response = requests.get(download_url, headers=self.headers)
+            
+            if response.status_code != 200:
+                raise Exception(f"Download failed: HTTP {response.status_code}")
+            
+            return BytesIO(response.content)
         
-        if response.status_code != 200:
-            raise Exception(f"Download failed: HTTP {response.status_code}")
+        with requests.get(download_url, headers=self.headers, stream=True) as response:
+            if response.status_code != 200:
+                raise Exception(f"Download failed: HTTP {response.status_code}")
+            
+            total = int(response.headers.get('Content-Length') or 0) or None
+            buffer = BytesIO()
+            progress_callback(0, total)
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                buffer.write(chunk)
+                progress_callback(buffer.tell(), total)
         
-        return BytesIO(response.content)
+        buffer.seek(0)
+        return buffer
     
     def create_backup(self, file_id: str, file_name: str, 
                      parent_folder_id: str, backup_FolderPath: str):
@@ -0,0 +1,159 @@
+# services/sketches.py
+"""
+Fixed-size sketches for profiling big columns.
+Memory of every sketch depends only on its parameters, not on the number of rows.
+"""
+from typing import Dict, List, Optional
+import numpy as np
+import pandas as pd
+
+
+def hash_values(values: pd.Series) -> np.ndarray:
+    """Vectorized 64-bit hash of non-null values"""
+    return pd.util.hash_pandas_object(values, index=False).to_numpy(dtype=np.uint64)
+
+
+class HyperLogLog:
+    """
+    HyperLogLog distinct counter with 2^precision registers (precision=14 -> 16 KB).
+    Relative standard error is 1.04 / sqrt(2^precision), ~0.81% for precision=14.
+    """
+
+    def __init__(self, precision: int = 14):
+        if not 4 <= precision <= 18:
+            raise ValueError(f"Invalid HyperLogLog precision: {precision}")
+        self.precision = precision
+        self.m = 1 << precision
+        self.registers = np.zeros(self.m, dtype=np.uint8)
+
+    @property
+    def relative_error(self) -> float:
+        return 1.04 / np.sqrt(self.m)
+
+    def update_hashes(self, hashes: np.ndarray):
+        if len(hashes) == 0:
+            return
+        hashes = hashes.astype(np.uint64, copy=False)
+        index = (hashes >> np.uint64(64 - self.precision)).astype(np.int64)
+        # Next 32 bits after the index bits (exact in float64 for log2)
+        remaining = ((hashes << np.uint64(self.precision)) >> np.uint64(32)).astype(np.float64)
+        rank = np.full(len(hashes), 33, dtype=np.uint8)
+        nonzero = remaining > 0
+        rank[nonzero] = (32 - np.floor(np.log2(remaining[nonzero]))).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def update(self, values: pd.Series):
+        self.update_hashes(hash_values(values))
+
+    def merge(self, other: "HyperLogLog"):
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches with different precision")
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def estimate(self) -> int:
+        alpha = 0.7213 / (1 + 1.079 / self.m)
+        raw = alpha * self.m ** 2 / np.sum(np.power(2.0, -self.registers.astype(np.float64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        # Small range correction (linear counting)
+        if raw <= 2.5 * self.m and zeros:
+            return int(round(self.m * np.log(self.m / zeros)))
+        return int(round(raw))
+
+
+class SpaceSaving:
+    """
+    Space-saving top-k counter with fixed capacity.
+    Each reported count overestimates the true count by at most its 'error',
+    which is bounded by total / capacity.
+    """
+
+    def __init__(self, capacity: int = 64):
+        self.capacity = capacity
+        self.counts: Dict = {}
+        self.errors: Dict = {}
+        self.total = 0
+        # Chunks are pre-aggregated and only their top `capacity` values are fed in,
+        # the largest dropped count is added to the error bound
+        self.truncation_error = 0
+
+    def _add(self, value, count: int, error: int = 0):
+        if value in self.counts:
+            self.counts[value] += count
+            self.errors[value] += error
+        elif len(self.counts) < self.capacity:
+            self.counts[value] = count
+            self.errors[value] = error
+        else:
+            min_value = min(self.counts, key=self.counts.get)
+            min_count = self.counts.pop(min_value)
+            self.errors.pop(min_value)
+            self.counts[value] = min_count + count
+            self.errors[value] = min_count + error
+
+    def update_counts(self, counts: pd.Series):
+        """Add pre-aggregated counts (value -> count), e.g. from value_counts() of a chunk"""
+        for value, count in counts.items():
+            self._add(value, int(count))
+            self.total += int(count)
+
+    def update(self, values: pd.Series):
+        counts = values.value_counts(sort=True, dropna=True)
+        self.update_counts(counts.iloc[:self.capacity])
+        if len(counts) > self.capacity:
+            self.total += int(counts.iloc[self.capacity:].sum())
+            self.truncation_error += int(counts.iloc[self.capacity])
+
+    def merge(self, other: "SpaceSaving"):
+        for value, count in other.counts.items():
+            self._add(value, count, other.errors[value])
+        self.total += other.total
+        self.truncation_error += other.truncation_error
+
+    @property
+    def max_error(self) -> int:
+        evicted = self.total // self.capacity if len(self.counts) >= self.capacity else 0
+        return evicted + self.truncation_error
+
+    def top(self, k: int = 10) -> List[Dict]:
+        items = sorted(self.counts.items(), key=lambda item: item[1], reverse=True)[:k]
+        return [{'value': value, 'count': count, 'error': self.errors[value]} for value, count in items]
+
+
+class Reservoir:
+    """Uniform random sample of fixed size over a stream (Algorithm R, vectorized per chunk)"""
+
+    def __init__(self, size: int = 5, seed: Optional[int] = 0):
+        self.size = size
+        self.seen = 0
+        self.items: List = []
+        self.rng = np.random.default_rng(seed)
+
+    def update(self, values: pd.Series):
+        free = self.size - len(self.items)
+        if free > 0:
+            self.items.extend(values.iloc[:free].tolist())
+            self.seen += min(free, len(values))
+            values = values.iloc[free:]
+        if values.empty:
+            return
+
+        # Item number i (1-based over the whole stream) replaces slot j if j < size, j ~ U[0, i)
+        positions = np.arange(self.seen + 1, self.seen + len(values) + 1)
+        slots = self.rng.integers(0, positions)
+        for idx in np.flatnonzero(slots < self.size):
+            self.items[slots[idx]] = values.iloc[idx]
+        self.seen += len(values)
+
+    def merge(self, other: "Reservoir"):
+        """Weighted merge: keep each item with probability proportional to its stream size"""
+        total = self.seen + other.seen
+        if not total:
+            return
+        mine, theirs = list(self.items), list(other.items)
+        merged = []
+        for _ in range(min(self.size, len(mine) + len(theirs))):
+            pick_mine = mine and (not theirs or self.rng.random() < self.seen / total)
+            source = mine if pick_mine else theirs
+            merged.append(source.pop(self.rng.integers(0, len(source))))
+        self.items = merged
+        self.seen = total
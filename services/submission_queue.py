@@ -0,0 +1,287 @@
+# services/submission_queue.py
+import os
+import json
+import time
+import socket
+import sqlite3
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+# HTTP statuses worth retrying (quota / server side)
+TRANSIENT_STATUSES = {408, 429, 500, 502, 503, 504}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS submissions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at REAL NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    row TEXT NOT NULL,
+    config_id INTEGER,
+    updated_range TEXT,
+    error TEXT,
+    finished_at REAL,
+    owner TEXT,
+    claimed_at REAL
+);
+CREATE INDEX IF NOT EXISTS ix_submissions_status ON submissions (status, next_attempt_at);
+"""
+
+
+def is_transient_error(error: Exception) -> bool:
+    """Quota / server / network errors that a later retry can fix"""
+    status = getattr(getattr(error, 'resp', None), 'status', None)
+    if status is not None:
+        return int(status) in TRANSIENT_STATUSES
+    return isinstance(error, (ConnectionError, TimeoutError, OSError))
+
+
+def _pid_alive(pid: int) -> bool:
+    if os.name == 'nt':
+        return True  # os.kill would terminate the process, rely on the lease
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class SubmissionQueue:
+    """
+    Durable outbox for ExcelConfig rows (SQLite), flushed by a background thread.
+
+    - enqueue() returns immediately with a submission id, status() reports
+      pending -> sending -> done (ExcelConfigId, range) / failed (error)
+    - pending rows are coalesced into one batched append (up to batch_size rows),
+      waiting flush_delay seconds after an enqueue so bursts share a call
+    - transient errors (quota, 5xx, network) retry with exponential backoff up to
+      max_attempts, other errors fail the batch right away
+    - rows left 'sending' by a crashed process are marked failed, not resent: the
+      append may have gone through and resending would duplicate the config.
+      The DB is shared by the app, API and CLI processes, so only rows whose owner
+      process is gone (same host) or whose claim is older than SENDING_LEASE_SECONDS
+      count as interrupted
+    """
+
+    STATUSES = ('pending', 'sending', 'done', 'failed')
+    SENDING_LEASE_SECONDS = 15 * 60
+
+    def __init__(self, allocator, db_path: str, batch_size: int = 50, max_attempts: int = 8,
+                 flush_delay: float = 2.0, base_backoff: float = 5.0, max_backoff: float = 300.0,
+                 registry=None):
+        self.allocator = allocator
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.flush_delay = flush_delay
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.registry = registry
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._flush_lock = threading.Lock()
+        self._thread = None
+        self.host = socket.gethostname()
+        self.owner = f"{self.host}:{os.getpid()}"
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        with self._db() as conn:
+            conn.executescript(SCHEMA)
+            # Outbox created before rows carried their owner
+            columns = {r['name'] for r in conn.execute('PRAGMA table_info(submissions)')}
+            for column, column_type in (('owner', 'TEXT'), ('claimed_at', 'REAL')):
+                if column not in columns:
+                    conn.execute(f'ALTER TABLE submissions ADD COLUMN {column} {column_type}')
+        self.recover_interrupted()
+
+    def _is_interrupted(self, owner: Optional[str], claimed_at: Optional[float], now: float) -> bool:
+        if owner is None or claimed_at is None:
+            return True
+        if claimed_at < now - self.SENDING_LEASE_SECONDS:
+            return True
+        host, _, pid = owner.rpartition(':')
+        return host == self.host and pid.isdigit() and not _pid_alive(int(pid))
+
+    def recover_interrupted(self) -> int:
+        """Mark 'sending' rows of dead processes (or expired claims) failed, returns count"""
+        now = time.time()
+        with self._db() as conn:
+            rows = conn.execute(
+                "SELECT id, owner, claimed_at FROM submissions WHERE status = 'sending'"
+            ).fetchall()
+            interrupted = [(now, r['id']) for r in rows if self._is_interrupted(r['owner'], r['claimed_at'], now)]
+            conn.executemany(
+                "UPDATE submissions SET status = 'failed', finished_at = ?, "
+                "error = 'Interrupted while sending, check the sheet before resubmitting' "
+                "WHERE id = ? AND status = 'sending'", interrupted
+            )
+        return len(interrupted)
+
+    @contextmanager
+    def _db(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            conn.execute('PRAGMA journal_mode=WAL')
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def enqueue(self, row: List) -> int:
+        """Queue one ExcelConfig row (row[0] = ExcelConfigId, allocated on send)"""
+        now = time.time()
+        with self._db() as conn:
+            submission_id = conn.execute(
+                "INSERT INTO submissions (created_at, status, next_attempt_at, row) VALUES (?, 'pending', ?, ?)",
+                (now, now, json.dumps(row, default=str))
+            ).lastrowid
+        self._wakeup.set()
+        return submission_id
+
+    def retry(self, submission_id: int) -> bool:
+        """Put a failed submission back in the queue"""
+        with self._db() as conn:
+            updated = conn.execute(
+                "UPDATE submissions SET status = 'pending', attempts = 0, next_attempt_at = ?, "
+                "error = NULL, finished_at = NULL WHERE id = ? AND status = 'failed'",
+                (time.time(), submission_id)
+            ).rowcount
+        self._wakeup.set()
+        return bool(updated)
+
+    def status(self, submission_id: int) -> Optional[Dict]:
+        with self._db() as conn:
+            row = conn.execute(
+                'SELECT id, status, attempts, next_attempt_at, config_id, updated_range, error, '
+                'created_at, finished_at FROM submissions WHERE id = ?', (submission_id,)
+            ).fetchone()
+        return dict(row) if row else None
+
+    def stats(self) -> Dict:
+        with self._db() as conn:
+            counts = dict(conn.execute('SELECT status, COUNT(*) FROM submissions GROUP BY status').fetchall())
+        return {status: counts.get(status, 0) for status in self.STATUSES}
+
+    def _claim_batch(self) -> List[sqlite3.Row]:
+        with self._db() as conn:
+            batch = conn.execute(
+                "SELECT id, attempts, row FROM submissions WHERE status = 'pending' AND next_attempt_at <= ? "
+                "ORDER BY id LIMIT ?", (time.time(), self.batch_size)
+            ).fetchall()
+            now = time.time()
+            conn.executemany(
+                "UPDATE submissions SET status = 'sending', owner = ?, claimed_at = ? WHERE id = ?",
+                [(self.owner, now, r['id']) for r in batch]
+            )
+        return batch
+
+    def flush(self) -> int:
+        """Send one batch of due rows, returns number of rows sent"""
+        with self._flush_lock:
+            batch = self._claim_batch()
+            if not batch:
+                return 0
+            rows = [json.loads(r['row']) for r in batch]
+            try:
+                config_ids, updated_range = self.allocator.append_rows(rows)
+            except Exception as e:
+                self._reschedule(batch, e)
+                return 0
+
+            now = time.time()
+            with self._db() as conn:
+                conn.executemany(
+                    "UPDATE submissions SET status = 'done', config_id = ?, updated_range = ?, "
+                    "attempts = attempts + 1, error = NULL, finished_at = ? WHERE id = ?",
+                    [(config_id, updated_range, now, r['id']) for config_id, r in zip(config_ids, batch)]
+                )
+            print(f"✅ Berhasil append {len(batch)} config(s)! Range: {updated_range}")
+
+            if self.registry is not None:
+                try:
+                    self.registry.record_appended(
+                        updated_range, [[config_id] + row[1:] for config_id, row in zip(config_ids, rows)]
+                    )
+                except Exception as e:
+                    print(f"  ⚠ Config registry update failed: {e}")
+            return len(batch)
+
+    def _reschedule(self, batch: List[sqlite3.Row], error: Exception):
+        transient = is_transient_error(error)
+        now = time.time()
+        updates = []
+        for r in batch:
+            attempts = r['attempts'] + 1
+            if transient and attempts < self.max_attempts:
+                delay = min(self.max_backoff, self.base_backoff * 2 ** (attempts - 1))
+                updates.append(('pending', attempts, now + delay, str(error), None, r['id']))
+            else:
+                updates.append(('failed', attempts, now, str(error), now, r['id']))
+        with self._db() as conn:
+            conn.executemany(
+                'UPDATE submissions SET status = ?, attempts = ?, next_attempt_at = ?, error = ?, '
+                'finished_at = ? WHERE id = ?', updates
+            )
+        print(f"  ⚠ Append of {len(batch)} config(s) failed ({'will retry' if transient else 'not retried'}): {error}")
+
+    def _next_due_in(self) -> Optional[float]:
+        with self._db() as conn:
+            row = conn.execute(
+                "SELECT MIN(next_attempt_at) AS due FROM submissions WHERE status = 'pending'"
+            ).fetchone()
+        return None if row['due'] is None else max(0.0, row['due'] - time.time())
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                due_in = self._next_due_in()
+                if due_in is None or due_in > 0:
+                    self._wakeup.wait(timeout=due_in)
+                    if self._wakeup.is_set():
+                        self._wakeup.clear()
+                        # Let a burst of submits land in the same batch
+                        self._stop.wait(self.flush_delay)
+                    continue
+                while self.flush():
+                    pass
+            except Exception as e:
+                print(f"  ⚠ Submission queue worker error: {e}")
+                self._stop.wait(self.base_backoff)
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='submission-queue', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join()
+
+
+@lru_cache(maxsize=1)
+def get_submission_queue() -> SubmissionQueue:
+    """Process-wide outbox, worker thread started on first use"""
+    from services.config import (
+        SUBMISSION_QUEUE_PATH, SUBMISSION_BATCH_SIZE, SUBMISSION_MAX_ATTEMPTS, SUBMISSION_FLUSH_SECONDS
+    )
+    from services.excel_config import get_config_id_allocator
+    from services.config_registry import get_config_registry
+
+    queue = SubmissionQueue(
+        get_config_id_allocator(),
+        db_path=SUBMISSION_QUEUE_PATH,
+        batch_size=SUBMISSION_BATCH_SIZE,
+        max_attempts=SUBMISSION_MAX_ATTEMPTS,
+        flush_delay=SUBMISSION_FLUSH_SECONDS,
+        registry=get_config_registry()
+    )
+    queue.start()
+    return queue
@@ -0,0 +1,270 @@
+# services/validation.py
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional
+import numpy as np
+import pandas as pd
+from pandas.tseries.api import guess_datetime_format
+
+VALIDATION_BATCH_ROWS = 200_000
+MAX_EXAMPLES = 5
+
+# Target type -> (min, max) for integer types
+INTEGER_RANGES = {
+    'int': (-2**31, 2**31 - 1),
+    'bigint': (-2**63, 2**63 - 1),
+}
+
+
+def _cast_failures(values: pd.Series, target_type: str) -> np.ndarray:
+    """
+    Vectorized trial cast of one column chunk.
+    Returns a boolean mask of non-null values that cannot be cast to target_type.
+    """
+    from services.profiling import VARCHAR_MAX_LENGTH
+
+    not_null = values.notna().to_numpy()
+
+    if target_type in INTEGER_RANGES or target_type == 'float':
+        if pd.api.types.is_bool_dtype(values):
+            return np.zeros(len(values), dtype=bool)
+        numbers = pd.to_numeric(values, errors='coerce').to_numpy(dtype='float64')
+        failed = np.isnan(numbers)
+        if target_type in INTEGER_RANGES:
+            low, high = INTEGER_RANGES[target_type]
+            with np.errstate(invalid='ignore'):
+                failed |= (np.mod(numbers, 1) != 0) | (numbers < low) | (numbers > high)
+        return failed & not_null
+
+    if target_type in ('date', 'datetime'):
+        if pd.api.types.is_datetime64_any_dtype(values):
+            return np.zeros(len(values), dtype=bool)
+        first_str = next((v for v in values[not_null].head(100) if isinstance(v, str)), None)
+        date_format = guess_datetime_format(first_str) if first_str else None
+        parsed = pd.to_datetime(values, format=date_format, errors='coerce')
+        if date_format:
+            # Retry values that do not follow the guessed format with per-element inference
+            retry = parsed.isna().to_numpy() & not_null
+            if retry.any():
+                parsed[retry] = pd.to_datetime(values[retry], format='mixed', errors='coerce')
+        return parsed.isna().to_numpy() & not_null
+
+    if target_type == 'varchar':
+        lengths = values.astype(str).str.len().to_numpy()
+        return (lengths > VARCHAR_MAX_LENGTH) & not_null
+
+    # 'string' and 'Default' accept everything
+    return np.zeros(len(values), dtype=bool)
+
+
+def _validate_batch(batch: pd.DataFrame, offset: int, type_mapping: Dict, max_examples: int) -> Dict:
+    result = {}
+    for col, target_type in type_mapping.items():
+        if col not in batch.columns:
+            continue
+        failed = _cast_failures(batch[col], target_type)
+        positions = np.flatnonzero(failed)
+        result[col] = {
+            'failed_count': int(len(positions)),
+            'examples': [
+                {'row': int(offset + pos), 'value': str(batch[col].iloc[pos])}
+                for pos in positions[:max_examples]
+            ],
+        }
+    return result
+
+
+def iter_parquet_batches(path: str, columns: Optional[List] = None,
+                         batch_rows: int = VALIDATION_BATCH_ROWS) -> Iterator[pd.DataFrame]:
+    """Read a Parquet file as DataFrame batches (only the requested columns)"""
+    import pyarrow.parquet as pq
+
+    parquet_file = pq.ParquetFile(path)
+    for batch in parquet_file.iter_batches(batch_size=batch_rows, columns=columns):
+        yield batch.to_pandas()
+
+
+def validate_type_mapping(source, type_mapping: Dict, batch_rows: int = VALIDATION_BATCH_ROWS,
+                          max_workers: Optional[int] = None, max_examples: int = MAX_EXAMPLES) -> Dict:
+    """
+    Run vectorized trial casts for every mapped column over the whole file.
+
+    source: DataFrame, or path to the Parquet copy of the full file written during fetch
+    (columns are stored as strings in Parquet, type_mapping keys are matched with str()).
+    Batches are validated in parallel on a thread pool (pandas/NumPy casts release the GIL).
+
+    Returns: {
+        'column_name': {
+            'target_type': str,
+            'checked_rows': int,
+            'failed_count': int,
+            'examples': [{'row': int, 'value': str}],  # first failing rows
+            'ok': bool
+        }
+    }
+    """
+    from services.config import PROFILE_WORKERS
+
+    type_mapping = {col: t for col, t in type_mapping.items() if t and t != 'Default'}
+    if not type_mapping:
+        return {}
+
+    if isinstance(source, pd.DataFrame):
+        mapping = {col: type_mapping[col] for col in source.columns if col in type_mapping}
+        batches = (
+            source.iloc[start:start + batch_rows]
+            for start in range(0, len(source), batch_rows)
+        )
+    else:
+        import pyarrow.parquet as pq
+
+        available = set(pq.ParquetFile(source).schema_arrow.names)
+        mapping = {str(col): t for col, t in type_mapping.items() if str(col) in available}
+        batches = iter_parquet_batches(source, columns=list(mapping), batch_rows=batch_rows)
+
+    report = {
+        col: {'target_type': t, 'checked_rows': 0, 'failed_count': 0, 'examples': [], 'ok': True}
+        for col, t in mapping.items()
+    }
+
+    def collect(batch_result: Dict):
+        for col, col_result in batch_result.items():
+            col_report = report[col]
+            col_report['failed_count'] += col_result['failed_count']
+            remaining = max_examples - len(col_report['examples'])
+            if remaining > 0:
+                col_report['examples'].extend(col_result['examples'][:remaining])
+
+    max_workers = PROFILE_WORKERS if max_workers is None else max(1, max_workers)
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='validate') as executor:
+        # At most 2 batches per worker in flight (bounded memory), collected in batch order
+        # so examples stay in row order
+        in_flight = deque()
+        offset = 0
+        for batch in batches:
+            in_flight.append(executor.submit(_validate_batch, batch, offset, mapping, max_examples))
+            offset += len(batch)
+            if len(in_flight) >= max_workers * 2:
+                collect(in_flight.popleft().result())
+        while in_flight:
+            collect(in_flight.popleft().result())
+
+    # Map back to original column labels
+    labels = {str(col): col for col in type_mapping}
+    result = {}
+    for col, col_report in report.items():
+        col_report['checked_rows'] = offset
+        col_report['ok'] = col_report['failed_count'] == 0
+        result[labels.get(str(col), col)] = col_report
+    return result
+
+
+def _iter_source_batches(source, columns: List, batch_rows: int) -> Iterator[pd.DataFrame]:
+    """Batches of the given columns from a DataFrame or the Parquet copy of the file"""
+    if isinstance(source, pd.DataFrame):
+        for start in range(0, len(source), batch_rows):
+            yield source.iloc[start:start + batch_rows][columns]
+    else:
+        for batch in iter_parquet_batches(source, columns=[str(col) for col in columns], batch_rows=batch_rows):
+            batch.columns = columns
+            yield batch
+
+
+def source_row_count(source) -> int:
+    """Row count of a DataFrame or Parquet file (Parquet: from footer metadata, no data read)"""
+    if isinstance(source, pd.DataFrame):
+        return len(source)
+    import pyarrow.parquet as pq
+    return pq.ParquetFile(source).metadata.num_rows
+
+
+def check_key_uniqueness(source, key_columns: List, batch_rows: int = VALIDATION_BATCH_ROWS,
+                         max_samples: int = MAX_EXAMPLES) -> Dict:
+    """
+    Check that key_columns uniquely identify rows (Delete-Insert), over the whole file.
+
+    Pass 1 hashes the composite key of every row with pd.util.hash_pandas_object
+    (8 bytes per row, key columns only, one batch at a time).
+    Pass 2 only runs when duplicates exist and collects sample duplicate keys.
+
+    Returns: {
+        'total_rows': int,
+        'duplicate_rows': int,      # rows beyond the first occurrence of each key
+        'duplicate_keys': int,      # distinct keys that occur more than once
+        'null_key_rows': int,       # rows with a null in any key column
+        'is_unique': bool,
+        'samples': [{'key': {col: value}, 'count': int, 'rows': [int]}]
+    }
+    """
+    key_columns = list(key_columns)
+    hashes = []
+    null_key_rows = 0
+    for batch in _iter_source_batches(source, key_columns, batch_rows):
+        null_key_rows += int(batch.isna().any(axis=1).sum())
+        hashes.append(pd.util.hash_pandas_object(batch, index=False).to_numpy(dtype=np.uint64))
+
+    all_hashes = np.concatenate(hashes) if hashes else np.empty(0, dtype=np.uint64)
+    del hashes
+    unique_hashes, counts = np.unique(all_hashes, return_counts=True)
+    dup_hashes = unique_hashes[counts > 1]
+    dup_counts = counts[counts > 1]
+
+    result = {
+        'total_rows': int(len(all_hashes)),
+        'duplicate_rows': int((dup_counts - 1).sum()),
+        'duplicate_keys': int(len(dup_hashes)),
+        'null_key_rows': null_key_rows,
+        'is_unique': len(dup_hashes) == 0,
+        'samples': [],
+    }
+    if result['is_unique']:
+        return result
+
+    # Pass 2: rows + values of the first max_samples duplicate keys (in file order)
+    sample_hashes = set()
+    samples: Dict = {}
+    offset = 0
+    dup_lookup = dict(zip(dup_hashes.tolist(), dup_counts.tolist()))
+    for batch in _iter_source_batches(source, key_columns, batch_rows):
+        batch_hashes = all_hashes[offset:offset + len(batch)]
+        for pos in np.flatnonzero(np.isin(batch_hashes, dup_hashes)):
+            key_hash = int(batch_hashes[pos])
+            if key_hash not in sample_hashes:
+                if len(sample_hashes) >= max_samples:
+                    continue
+                sample_hashes.add(key_hash)
+                samples[key_hash] = {
+                    'key': {col: str(batch[col].iloc[pos]) for col in key_columns},
+                    'count': int(dup_lookup[key_hash]),
+                    'rows': [],
+                }
+            if len(samples[key_hash]['rows']) < max_samples:
+                samples[key_hash]['rows'].append(int(offset + pos))
+        offset += len(batch)
+        if len(sample_hashes) >= max_samples and all(
+            len(s['rows']) >= min(s['count'], max_samples) for s in samples.values()
+        ):
+            break
+
+    result['samples'] = list(samples.values())
+    return result
+
+
+def rank_key_candidates(columns_info: Dict, total_rows: int, limit: int = 5) -> List[Dict]:
+    """
+    Rank columns as key candidates from profile stats (no extra pass over the data):
+    high uniqueness and no nulls first.
+    """
+    candidates = []
+    for col, info in columns_info.items():
+        if not total_rows or info['inferred_type'] == 'float':
+            continue
+        ratio = min(info['unique_count'] / total_rows, 1.0)
+        candidates.append({
+            'column': col,
+            'uniqueness_ratio': round(ratio, 4),
+            'null_count': info['null_count'],
+            'is_approx': bool(info.get('unique_count_is_approx')),
+        })
+    candidates.sort(key=lambda c: (c['null_count'] > 0, -c['uniqueness_ratio']))
+    return candidates[:limit]
@@ -0,0 +1,112 @@
+# services/workbook.py
+import uuid
+import threading
+from io import BytesIO
+from typing import List, Optional, Union
+import pandas as pd
+
+# Same engine order as read_excel_with_repair
+EXCEL_ENGINES = ('openpyxl', 'calamine', 'xlrd')
+
+
+class WorkbookSession:
+    """
+    One downloaded workbook, opened once (ZIP + shared strings decoded on open).
+
+    Switching sheets parses from the open handle, never re-downloads or re-opens the file.
+    Parsed sheets are not kept here: the caller keeps the compact raw grid (services.raw_grid).
+    If no engine can open the file, sheets are read with read_excel_with_repair.
+
+    With an executor (ParseExecutor) nothing is opened in this process: the workbook is
+    opened and kept open in an isolated worker process (ParseExecutor.run_workbook),
+    only the bytes are kept here (to re-open it if that worker is gone).
+    """
+
+    def __init__(self, file_bytes: BytesIO, file_name: str = "file.xlsx", executor=None):
+        self.data = file_bytes.getvalue()
+        self.file_name = file_name
+        self.executor = executor
+        self._lock = threading.Lock()
+        # Identifies the workbook opened in a parse worker
+        self.key = uuid.uuid4().hex
+        if executor is not None:
+            self.excel_file, self.engine = None, None
+            self._sheet_names = executor.run_workbook(self.key, self.data, file_name, 'sheet_names')
+        else:
+            self.excel_file, self.engine = self._open()
+            self._sheet_names = list(self.excel_file.sheet_names) if self.excel_file is not None else []
+
+    def __getstate__(self):
+        # Reader handles / locks are not picklable (session store spill): keep bytes only
+        state = self.__dict__.copy()
+        for name in ('_lock', 'excel_file', 'executor'):
+            state.pop(name)
+        state['uses_executor'] = self.executor is not None
+        return state
+
+    def __setstate__(self, state):
+        uses_executor = state.pop('uses_executor')
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+        if uses_executor:
+            from services.parse_executor import get_parse_executor
+            self.executor, self.excel_file = get_parse_executor(), None
+        else:
+            self.executor = None
+            self.excel_file = self._open((self.engine,))[0] if self.engine else None
+
+    def memory_bytes(self) -> int:
+        return len(self.data)
+
+    def _open(self, engines=EXCEL_ENGINES):
+        for engine in engines:
+            try:
+                excel_file = pd.ExcelFile(BytesIO(self.data), engine=engine)
+                print(f"    ✓ Workbook opened with: {engine}")
+                return excel_file, engine
+            except Exception as e:
+                print(f"    ✗ Workbook open with {engine}: {type(e).__name__}")
+        return None, None
+
+    @property
+    def sheet_names(self) -> List[str]:
+        return list(self._sheet_names)
+
+    def _resolve(self, sheet_name: Union[str, int, None]):
+        """Sheet index / None -> sheet name (cache key), unknown names are kept as-is"""
+        names = self.sheet_names
+        if sheet_name is None or sheet_name == "":
+            sheet_name = 0
+        if isinstance(sheet_name, int) and 0 <= sheet_name < len(names):
+            return names[sheet_name]
+        return sheet_name
+
+    def _read(self, excel_file, sheet_name, header: Optional[int], cancel_event=None) -> pd.DataFrame:
+        if self._sheet_names and isinstance(sheet_name, str) and sheet_name not in self._sheet_names:
+            raise ValueError(f"Worksheet named '{sheet_name}' not found in {self.file_name}")
+        if self.executor is not None:
+            return self.executor.run_workbook(self.key, self.data, self.file_name, 'parse', cancel_event=cancel_event,
+                                              sheet_name=sheet_name, header=header)
+        if excel_file is not None:
+            try:
+                return excel_file.parse(sheet_name=sheet_name, header=header)
+            except Exception as e:
+                print(f"    ✗ Sheet parse with {self.engine}: {type(e).__name__}")
+        from services.preprocessing import read_excel_with_repair
+        return read_excel_with_repair(BytesIO(self.data), sheet_name, header, self.file_name)
+
+    def parse(self, sheet_name: Union[str, int, None] = 0, header: Optional[int] = 0,
+              cancel_event=None) -> pd.DataFrame:
+        """
+        Parsed sheet, header=None returns the raw headerless grid
+        cancel_event: threading.Event, aborts a parse running in the executor
+        """
+        sheet_name = self._resolve(sheet_name)
+        # Reader handle is not thread-safe
+        with self._lock:
+            return self._read(self.excel_file, sheet_name, header, cancel_event)
+
+    def close(self):
+        with self._lock:
+            if self.excel_file is not None:
+                self.excel_file.close()
@@ -0,0 +1,117 @@
+# utils/import_budget.py
+"""
+Import-time budget for the Streamlit app's cold start.
+
+    python -m utils.import_budget [--budget-ms 150] [--runs 3]
+
+Imports the modules app/app.py imports at top level in a fresh interpreter (GOOGLE_TOKEN
+unset), in two phases:
+  1. third-party baseline (streamlit, pandas, ...): not ours, reported only
+  2. project modules (services.*, utils.*): must stay under --budget-ms
+and fails if a project import pulled in a heavy module that should only load on its
+code path (Google client libraries, Excel engines, requests).
+Exit code 0 = within budget, 1 = over budget or heavy module loaded.
+"""
+import os
+import ast
+import sys
+import json
+import argparse
+import subprocess
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_FILE = os.path.join(ROOT_DIR, 'app', 'app.py')
+PROJECT_PACKAGES = ('services', 'utils')
+
+# Must not be imported until their code path runs
+LAZY_MODULES = (
+    'googleapiclient', 'google.oauth2', 'google.auth',
+    'openpyxl', 'python_calamine', 'xlrd', 'requests',
+)
+
+DEFAULT_BUDGET_MS = 150
+
+_PROBE = """
+import sys, time, json, importlib
+result = {'baseline_ms': 0.0, 'project_ms': 0.0, 'modules': {}, 'skipped': []}
+for phase, names in (('baseline_ms', %(baseline)r), ('project_ms', %(project)r)):
+    before = set(sys.modules)
+    for name in names:
+        start = time.perf_counter()
+        try:
+            importlib.import_module(name)
+        except ImportError as e:
+            if phase == 'project_ms':
+                raise
+            result['skipped'].append(name)
+            continue
+        elapsed = (time.perf_counter() - start) * 1000
+        result[phase] += elapsed
+        result['modules'][name] = elapsed
+# Only modules pulled in by project imports (third-party packages may load requests etc. themselves)
+result['loaded'] = sorted(set(sys.modules) - before)
+print(json.dumps(result))
+"""
+
+
+def startup_imports(app_file: str = APP_FILE) -> list:
+    """Top-level module names imported by the app script, in order"""
+    with open(app_file, encoding='utf-8') as f:
+        tree = ast.parse(f.read())
+    names = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            names.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and node.level == 0:
+            names.append(node.module)
+    return list(dict.fromkeys(names))
+
+
+def measure(app_file: str = APP_FILE) -> dict:
+    """One cold-start measurement in a fresh interpreter"""
+    names = startup_imports(app_file)
+    project = [n for n in names if n.split('.')[0] in PROJECT_PACKAGES]
+    baseline = [n for n in names if n not in project]
+    env = {k: v for k, v in os.environ.items() if k != 'GOOGLE_TOKEN'}
+    env['PYTHONPATH'] = ROOT_DIR + os.pathsep + env.get('PYTHONPATH', '')
+    completed = subprocess.run(
+        [sys.executable, '-c', _PROBE % {'baseline': baseline, 'project': project}],
+        cwd=ROOT_DIR, env=env, capture_output=True, text=True
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Import failed:\n{completed.stderr}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--budget-ms', type=float, default=DEFAULT_BUDGET_MS,
+                        help="Max import time of project modules (best of --runs)")
+    parser.add_argument('--runs', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    results = [measure() for _ in range(max(args.runs, 1))]
+    best = min(results, key=lambda r: r['project_ms'])
+
+    print(f"Third-party baseline: {best['baseline_ms']:8.1f} ms" +
+          (f" (not installed: {', '.join(best['skipped'])})" if best['skipped'] else ""))
+    print(f"Project modules:      {best['project_ms']:8.1f} ms (budget {args.budget_ms:.0f} ms)")
+    for name, elapsed in sorted(best['modules'].items(), key=lambda item: -item[1]):
+        print(f"  {elapsed:8.1f} ms  {name}")
+
+    failed = False
+    if best['project_ms'] > args.budget_ms:
+        print(f"❌ Project imports over budget by {best['project_ms'] - args.budget_ms:.1f} ms")
+        failed = True
+    eager = sorted({m for m in best['loaded'] for lazy in LAZY_MODULES if m == lazy or m.startswith(lazy + '.')})
+    eager_roots = sorted({m for m in eager if not any(m.startswith(o + '.') for o in eager)})
+    if eager_roots:
+        print(f"❌ Loaded at startup (should be lazy): {', '.join(eager_roots)}")
+        failed = True
+    if not failed:
+        print("✅ Import budget OK")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,6 +1,8 @@
 from typing import Optional, Dict, Any
 import pandas as pd
 import streamlit as st
+from services.sampling import representative_sample
+from utils.session_store import get_session_store, current_session_id
 
 class SessionManager:
     """Centralized session state management"""
@@ -12,6 +14,9 @@ class SessionManager:
     FILE_METADATA = 'file_metadata'
     INPUT_PARAMS = 'input_params'
     IS_DATA_LOADED = 'is_data_loaded'
+
+    # Jumlah baris sample yang disimpan untuk file besar
+    SAMPLE_ROWS = 1000
     
     @staticmethod
     def init():
@@ -19,8 +24,6 @@ class SessionManager:
         defaults = {
             SessionManager.CURRENT_PAGE: 1,
             SessionManager.IS_DATA_LOADED: False,
-            SessionManager.RAW_DATA: None,
-            SessionManager.COLUMNS_INFO: {},
             SessionManager.FILE_METADATA: {},
             SessionManager.INPUT_PARAMS: {}
         }
@@ -33,17 +36,21 @@ class SessionManager:
     def save_page1_data(df: pd.DataFrame, columns_info: dict, 
                         file_metadata: dict, input_params: dict):
         """Save data from Page 1 processing"""
+        file_metadata = dict(file_metadata)
         # IMPORTANT: Untuk file besar, jangan save full DataFrame
         # Cukup save sample + row count
-        if len(df) > 1000:
-            st.session_state[SessionManager.RAW_DATA] = df.head(1000)  # Sample only
-            st.session_state[SessionManager.FILE_METADATA]['total_rows'] = len(df)
-            st.session_state[SessionManager.FILE_METADATA]['is_sampled'] = True
+        if len(df) > SessionManager.SAMPLE_ROWS:
+            # Sample only: head + tail + random rows from across the file
+            file_metadata['total_rows'] = len(df)
+            df = representative_sample(df, SessionManager.SAMPLE_ROWS)
+            file_metadata['is_sampled'] = True
         else:
-            st.session_state[SessionManager.RAW_DATA] = df
-            st.session_state[SessionManager.FILE_METADATA]['is_sampled'] = False
+            file_metadata['is_sampled'] = False
         
-        st.session_state[SessionManager.COLUMNS_INFO] = columns_info
+        # DataFrame + columns_info di process-wide session store (memory budget, spill ke disk)
+        store = get_session_store()
+        store.put(current_session_id(), SessionManager.RAW_DATA, df)
+        store.put(current_session_id(), SessionManager.COLUMNS_INFO, columns_info)
         st.session_state[SessionManager.FILE_METADATA] = file_metadata
         st.session_state[SessionManager.INPUT_PARAMS] = input_params
         st.session_state[SessionManager.IS_DATA_LOADED] = True
@@ -51,12 +58,12 @@ class SessionManager:
     @staticmethod
     def get_df() -> Optional[pd.DataFrame]:
         """Get stored DataFrame"""
-        return st.session_state.get(SessionManager.RAW_DATA)
+        return get_session_store().get(current_session_id(), SessionManager.RAW_DATA)
     
     @staticmethod
     def get_columns_info() -> dict:
         """Get columns metadata"""
-        return st.session_state.get(SessionManager.COLUMNS_INFO, {})
+        return get_session_store().get(current_session_id(), SessionManager.COLUMNS_INFO, {})
     
     @staticmethod
     def is_ready_for_page2() -> bool:
@@ -74,4 +81,5 @@ class SessionManager:
         """Clear all session data"""
         for key in list(st.session_state.keys()):
             del st.session_state[key]
+        get_session_store().delete(current_session_id())
         SessionManager.init()
\ No newline at end of file
@@ -0,0 +1,333 @@
+# utils/session_store.py
+import os
+import sys
+import stat
+import time
+import uuid
+import atexit
+import pickle
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+import pandas as pd
+
+
+def estimate_size(value: Any) -> int:
+    """Approximate in-memory size in bytes (deep for DataFrames, Arrow tables, containers)"""
+    if value is None:
+        return 0
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=True))
+    if hasattr(value, 'memory_bytes'):
+        return int(value.memory_bytes())
+    if hasattr(value, 'nbytes') and not isinstance(value, (bytes, bytearray)):
+        return int(value.nbytes)  # pyarrow Table / numpy array
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple, set)):
+        return sys.getsizeof(value) + sum(estimate_size(v) for v in value)
+    return sys.getsizeof(value)
+
+
+def _private_spill_dir(parent_dir: str) -> str:
+    """
+    Per-process spill dir (mkdtemp: 0700, unpredictable name) under parent_dir.
+    parent_dir must not let other users swap our dir: owned by us and not group/other
+    writable, or sticky (like /tmp).
+    """
+    os.makedirs(parent_dir, mode=0o700, exist_ok=True)
+    st = os.stat(parent_dir)
+    if hasattr(os, 'getuid'):
+        private = st.st_uid == os.getuid() and not st.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+        if not private and not st.st_mode & stat.S_ISVTX:
+            raise RuntimeError(f"Session spill parent dir {parent_dir} is writable by other users")
+    spill_dir = tempfile.mkdtemp(prefix='excel_ingestion_session_spill-', dir=parent_dir)
+    atexit.register(shutil.rmtree, spill_dir, True)
+    return spill_dir
+
+
+def _arrow_table(df: pd.DataFrame):
+    """DataFrame -> Arrow table when the round trip is exact, else None (object columns must be text)"""
+    import pyarrow as pa
+
+    frame = df.copy(deep=False)
+    frame.columns = [str(i) for i in range(frame.shape[1])]
+    try:
+        table = pa.Table.from_pandas(frame, preserve_index=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+        return None
+    for position in range(frame.shape[1]):
+        if frame.dtypes.iloc[position] == object and not pa.types.is_string(table.schema.field(str(position)).type):
+            return None
+    return table
+
+
+def _write_spill(path: str, value: Any) -> str:
+    """Write value to a spill file: DataFrames as Arrow IPC, other values pickled. Returns the format"""
+    if isinstance(value, pd.DataFrame):
+        table = _arrow_table(value)
+        if table is not None:
+            import pyarrow as pa
+
+            with pa.OSFile(path, 'wb') as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+            return 'arrow'
+    with open(path, 'wb') as f:
+        pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+    return 'pickle'
+
+
+def _read_spill(path: str, fmt: str, columns=None) -> Any:
+    if fmt == 'arrow':
+        import pyarrow as pa
+
+        with pa.OSFile(path, 'rb') as source:
+            df = pa.ipc.open_file(source).read_all().to_pandas()
+        df.columns = columns
+        return df
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+
+class _Entry:
+    __slots__ = ('value', 'size', 'path', 'fmt', 'columns', 'spilling', 'last_access')
+
+    def __init__(self, value, size: int):
+        self.value = value
+        self.size = size
+        self.path = None  # spill file when not resident
+        self.fmt = None
+        self.columns = value.columns if isinstance(value, pd.DataFrame) else None
+        self.spilling = False  # spill file being written (outside the store lock)
+        self.last_access = time.time()
+
+
+class SessionDataStore:
+    """
+    Process-wide store for large per-session payloads (preview, columns_info, raw grid,
+    opened workbook). Sessions only keep the session id, values live here.
+
+    - resident bytes are capped at budget_bytes: least recently used payloads (of any
+      session) are written to a private per-process spill dir (DataFrames as Arrow IPC)
+      and loaded back transparently on next access
+    - spill / load file I/O runs outside the store lock, only bookkeeping is locked
+    - sessions idle longer than idle_seconds are dropped entirely (abandoned tabs)
+    - metrics(): resident vs spilled bytes, spill / load counters
+    Stored values are treated as immutable: put() again after changing one.
+    """
+
+    def __init__(self, budget_bytes: int, spill_dir: str, idle_seconds: int = 2 * 3600):
+        self.budget_bytes = budget_bytes
+        self.spill_dir = _private_spill_dir(spill_dir)
+        self.idle_seconds = idle_seconds
+        self._entries: "OrderedDict[tuple, _Entry]" = OrderedDict()  # LRU order, oldest first
+        self._session_access: Dict[str, float] = {}
+        self._lock = threading.RLock()
+        self.resident_bytes = 0
+        self.spilled_bytes = 0
+        self.spills = 0
+        self.loads = 0
+        self.dropped_sessions = 0
+
+    def _touch(self, session_id: str):
+        self._session_access[session_id] = time.time()
+
+    def put(self, session_id: str, name: str, value: Any):
+        """Store value (None deletes), then enforce the budget"""
+        if value is None:
+            self.delete(session_id, name)
+            return
+        key = (session_id, name)
+        # Deep size of DataFrames is computed outside the store lock
+        entry = _Entry(value, estimate_size(value))
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = entry
+            self.resident_bytes += entry.size
+            self._touch(session_id)
+            victims = self._pick_victims(keep=key)
+        self._spill(victims)
+        self.drop_idle()
+
+    def get(self, session_id: str, name: str, default: Any = None) -> Any:
+        key = (session_id, name)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            self._touch(session_id)
+            entry.last_access = time.time()
+            self._entries.move_to_end(key)
+            if entry.value is not None:
+                return entry.value
+            path, fmt = entry.path, entry.fmt
+
+        try:
+            value = _read_spill(path, fmt, entry.columns)
+        except Exception as e:
+            with self._lock:
+                if self._entries.get(key) is entry and entry.value is None:
+                    print(f"  ⚠ Session store spill file lost for {name}: {type(e).__name__}")
+                    self._remove(key)
+                    return default
+                # Loaded by another thread meanwhile (its spill file already removed)
+                return entry.value if self._entries.get(key) is entry else default
+
+        with self._lock:
+            if self._entries.get(key) is not entry:
+                return default  # deleted / replaced meanwhile
+            if entry.value is None and entry.path == path:
+                entry.value = value
+                entry.path = None
+                self.spilled_bytes -= entry.size
+                self.resident_bytes += entry.size
+                self.loads += 1
+                self._unlink(path)
+            victims = self._pick_victims(keep=key)
+            value = entry.value
+        self._spill(victims)
+        return value
+
+    def _pick_victims(self, keep: Optional[tuple] = None) -> List:
+        """
+        Choose least recently used resident entries to spill until resident bytes fit the
+        budget (called under the lock, entries are marked so no other thread picks them)
+        """
+        excess = self.resident_bytes - self.budget_bytes
+        excess -= sum(entry.size for entry in self._entries.values() if entry.spilling)
+        victims = []
+        for key, entry in self._entries.items():
+            if excess <= 0:
+                break
+            if key == keep or entry.value is None or entry.spilling:
+                continue
+            entry.spilling = True
+            victims.append((key, entry))
+            excess -= entry.size
+        return victims
+
+    def _spill(self, victims: List):
+        """Write the victims' spill files (outside the lock), then release their values"""
+        for key, entry in victims:
+            path = os.path.join(self.spill_dir, uuid.uuid4().hex)
+            try:
+                fmt = _write_spill(path, entry.value)
+            except Exception as e:
+                # Not picklable / disk full: keep it resident
+                print(f"  ⚠ Session store spill failed for {key[1]}: {type(e).__name__}")
+                self._unlink(path)
+                with self._lock:
+                    entry.spilling = False
+                continue
+            with self._lock:
+                entry.spilling = False
+                if self._entries.get(key) is not entry:
+                    self._unlink(path)  # deleted / replaced while writing
+                    continue
+                entry.value = None
+                entry.path = path
+                entry.fmt = fmt
+                self.resident_bytes -= entry.size
+                self.spilled_bytes += entry.size
+                self.spills += 1
+
+    @staticmethod
+    def _unlink(path: str):
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+    def _remove(self, key: tuple):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        if entry.value is None:
+            self.spilled_bytes -= entry.size
+            self._unlink(entry.path)
+        else:
+            self.resident_bytes -= entry.size
+
+    def delete(self, session_id: str, name: Optional[str] = None):
+        """Delete one payload, or all payloads of the session (name=None)"""
+        with self._lock:
+            keys = [(session_id, name)] if name is not None else \
+                [key for key in self._entries if key[0] == session_id]
+            for key in keys:
+                self._remove(key)
+            if name is None:
+                self._session_access.pop(session_id, None)
+
+    def touch(self, session_id: str):
+        """Mark the session as active (call once per script run)"""
+        with self._lock:
+            self._touch(session_id)
+
+    def drop_idle(self, idle_seconds: Optional[int] = None):
+        """Drop payloads of sessions not accessed for idle_seconds"""
+        cutoff = time.time() - (self.idle_seconds if idle_seconds is None else idle_seconds)
+        with self._lock:
+            idle = [sid for sid, last in self._session_access.items() if last < cutoff]
+            for session_id in idle:
+                self.delete(session_id)
+                self.dropped_sessions += 1
+
+    def metrics(self) -> Dict:
+        with self._lock:
+            spilled_entries = sum(1 for entry in self._entries.values() if entry.value is None)
+            return {
+                'budget_bytes': self.budget_bytes,
+                'resident_bytes': self.resident_bytes,
+                'spilled_bytes': self.spilled_bytes,
+                'entries': len(self._entries),
+                'resident_entries': len(self._entries) - spilled_entries,
+                'spilled_entries': spilled_entries,
+                'sessions': len(self._session_access),
+                'spills': self.spills,
+                'loads': self.loads,
+                'dropped_sessions': self.dropped_sessions,
+            }
+
+
+@lru_cache(maxsize=1)
+def get_session_store() -> SessionDataStore:
+    """Process-wide store shared by all Streamlit sessions"""
+    from services.config import SESSION_STORE_BUDGET_MB, SESSION_STORE_SPILL_DIR, SESSION_IDLE_MINUTES
+
+    return SessionDataStore(
+        budget_bytes=SESSION_STORE_BUDGET_MB * 1024 * 1024,
+        spill_dir=SESSION_STORE_SPILL_DIR,
+        idle_seconds=SESSION_IDLE_MINUTES * 60
+    )
+
+
+def current_session_id() -> str:
+    """Id of the Streamlit session running this script"""
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx is not None else 'local'
+
+
+class SessionData:
+    """
+    Attribute access to the current session's payloads in the store, e.g.
+    session_data.df_preview = df / session_data.df_preview (None if not set)
+    """
+
+    def __getattr__(self, name: str):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return get_session_store().get(current_session_id(), name)
+
+    def __setattr__(self, name: str, value):
+        get_session_store().put(current_session_id(), name, value)
+
+    def clear(self):
+        get_session_store().delete(current_session_id())